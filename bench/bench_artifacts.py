@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+bench_artifacts.py
+
+Compara los tres formatos de un juego compilado: el .brik fuente, el
+.json de compiler.py y el artefacto binario .brikc (--format bin).
+Reporta tamaño en disco y tiempo de carga de la tabla de símbolos:
+
+    brik   -> load_symbols_from_brik sin caché (lexer + parser)
+    json   -> json.load del .json (AST + símbolos)
+    bin    -> load_symbols_from_compiled leyendo el archivo completo
+    mmap   -> load_symbols_from_compiled con use_mmap=True
+
+Uso:
+    python bench/bench_artifacts.py
+"""
+from __future__ import print_function
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import compiler
+import runtime
+from bench.common import best_time, fmt_bytes
+from bench.synth import make_spec
+
+
+def _compile_quiet(path, fmt):
+    """compile_brik_to_json sin su salida por consola."""
+    saved = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        return compiler.compile_brik_to_json(path, fmt)
+    finally:
+        sys.stdout.close()
+        sys.stdout = saved
+
+
+def bench_file(label, path):
+    json_path = _compile_quiet(path, "json")
+    bin_path = _compile_quiet(path, "bin")
+
+    def load_json():
+        with open(json_path) as f:
+            return json.load(f)["symbols"]
+
+    repeat = 3 if os.path.getsize(path) > 1 << 20 else 20
+    times = [
+        best_time(lambda: runtime.load_symbols_from_brik(path, use_cache=False), repeat),
+        best_time(load_json, repeat),
+        best_time(lambda: runtime.load_symbols_from_compiled(bin_path), repeat),
+        best_time(lambda: runtime.load_symbols_from_compiled(bin_path, use_mmap=True), repeat),
+    ]
+    print("%-20s tamaño: brik %9s | json %9s | brikc %9s" % (
+        label, fmt_bytes(os.path.getsize(path)),
+        fmt_bytes(os.path.getsize(json_path)), fmt_bytes(os.path.getsize(bin_path))))
+    print("%-20s carga:  brik %7.2f ms | json %7.2f ms | bin %7.2f ms | mmap %7.2f ms" % (
+        "", times[0] * 1000, times[1] * 1000, times[2] * 1000, times[3] * 1000))
+
+
+def main():
+    tmp = tempfile.mkdtemp()
+    try:
+        print("=" * 76)
+        print("Artefactos compilados: .brik vs .json vs .brikc")
+        print("=" * 76)
+
+        # Se copian los specs para no sobrescribir specs/*.json
+        specs_dir = os.path.join(ROOT, "specs")
+        for name in sorted(os.listdir(specs_dir)):
+            if name.endswith('.brik'):
+                copy = os.path.join(tmp, name)
+                shutil.copy(os.path.join(specs_dir, name), copy)
+                bench_file(name, copy)
+
+        big = os.path.join(tmp, "synth.brik")
+        with open(big, 'w') as f:
+            f.write(make_spec(pieces=5000))
+        bench_file("synth 5000 piezas", big)
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
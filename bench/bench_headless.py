@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+bench_headless.py
+
+Simula partidas de Snake y Tetris con headless.HeadlessEngine (sin Tk,
+reloj virtual) y mide cuántos frames por segundo puede ejecutar el
+juego completo: update + render sobre la grilla retenida. Las teclas
+salen de un generador con semilla fija, así cada corrida juega
+exactamente la misma partida y el tiempo es comparable entre versiones.
+
+Como bench_pipeline.py, los resultados se pueden guardar y comparar con
+una corrida anterior para detectar regresiones de rendimiento.
+
+Uso:
+    python bench/bench_headless.py [opciones]
+
+Opciones:
+    --frames N         frames por partida (defecto 5000)
+    --repeat N         corridas por juego; se toma la mejor (defecto 5)
+    --save ARCHIVO     guarda los resultados en JSON
+    --compare ARCHIVO  compara con resultados guardados antes
+    --threshold PCT    % de aumento de tiempo considerado regresión (defecto 10)
+"""
+from __future__ import print_function
+
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from headless import HeadlessEngine
+from main import make_engine_from_symbols
+from runtime import load_symbols_from_brik
+from games.snake_game import SnakeGame
+from games.tetris_game import TetrisGame
+
+GAMES = (
+    ("snake", SnakeGame, ["Up", "Left", "Down", "Right"]),
+    ("tetris", TetrisGame, ["Left", "Right", "Up", "Down", "space"]),
+)
+
+
+def play(symbols, game_cls, keys, frames):
+    """
+    Juega 'frames' frames con teclas pseudoaleatorias. Devuelve el motor
+    y los segundos que tomaron los frames (sin crear motor ni juego).
+    """
+    random.seed(1)
+    engine = make_engine_from_symbols(symbols, HeadlessEngine)
+    game = game_cls(engine, symbols)
+    if hasattr(game, "_rng"):
+        game._rng.seed(1)
+        game.reset()
+    engine.set_game(game)
+
+    rng = random.Random(2)
+    t0 = timeit.default_timer()
+    for _ in range(frames):
+        if rng.random() < 0.15:
+            engine.press(rng.choice(keys))
+        if getattr(game, "game_over", False):
+            game.reset()
+        engine.step()
+    return engine, timeit.default_timer() - t0
+
+
+def parse_args(args):
+    options = {"frames": 5000, "repeat": 5, "save": None, "compare": None,
+               "threshold": 10.0}
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if i + 1 >= len(args):
+            raise SystemExit("ERROR: falta el valor de %s" % arg)
+        value = args[i + 1]
+        if arg == "--frames":
+            options["frames"] = int(value)
+        elif arg == "--repeat":
+            options["repeat"] = int(value)
+        elif arg == "--save":
+            options["save"] = value
+        elif arg == "--compare":
+            options["compare"] = value
+        elif arg == "--threshold":
+            options["threshold"] = float(value)
+        else:
+            raise SystemExit("ERROR: opción desconocida %r" % arg)
+        i += 2
+    return options
+
+
+def compare(old, new, threshold):
+    """Imprime la variación de tiempo por juego; devuelve cuántas regresiones hubo."""
+    print()
+    print("Comparación con la corrida guardada (umbral %+.0f%%):" % threshold)
+    if old.get("frames") != new["frames"]:
+        print("  AVISO: la corrida guardada usó %s frames (ahora %d): la partida "
+              "jugada no es la misma" % (old.get("frames"), new["frames"]))
+    regressions = 0
+    for name in sorted(new["results"]):
+        before = old.get("results", {}).get(name)
+        if not before:
+            continue
+        after = new["results"][name]
+        change = (after["us_per_frame"] / before["us_per_frame"] - 1.0) * 100.0
+        flag = ""
+        if change > threshold:
+            flag = "  <-- REGRESIÓN"
+            regressions += 1
+        print("  %-8s %8.1f us/frame -> %8.1f us/frame  %+7.1f%%%s" % (
+            name, before["us_per_frame"], after["us_per_frame"], change, flag))
+    print("Regresiones: %d" % regressions)
+    return regressions
+
+
+def main():
+    options = parse_args(sys.argv[1:])
+    frames = options["frames"]
+
+    print("=" * 76)
+    print("Simulación headless (%d frames por partida, mejor de %d)" % (
+        frames, options["repeat"]))
+    print("=" * 76)
+
+    run = {"python": platform.python_version(), "frames": frames, "results": {}}
+    for name, game_cls, keys in GAMES:
+        symbols = load_symbols_from_brik(os.path.join(ROOT, "specs", name + ".brik"))
+        seconds = None
+        for _ in range(options["repeat"]):
+            engine, elapsed = play(symbols, game_cls, keys, frames)
+            if seconds is None or elapsed < seconds:
+                seconds = elapsed
+        stats = engine.render_stats
+        result = {
+            "us_per_frame": seconds * 1e6 / frames,
+            "frames_per_s": frames / seconds,
+            "realtime_x": engine.now_ms / 1000.0 / seconds,
+            "cells_updated": stats["cells_updated"],
+            "items_created": stats["items_created"],
+        }
+        run["results"][name] = result
+        print("%-7s %8.1f us/frame | %9.0f frames/s | %7.0fx tiempo real | "
+              "celdas %6d | ítems creados %6d" % (
+                  name, result["us_per_frame"], result["frames_per_s"],
+                  result["realtime_x"], result["cells_updated"],
+                  result["items_created"]))
+
+    if options["save"]:
+        with open(options["save"], 'w') as f:
+            json.dump(run, f, indent=2, sort_keys=True)
+        print()
+        print("Resultados guardados en %s" % options["save"])
+
+    if options["compare"]:
+        with open(options["compare"]) as f:
+            old = json.load(f)
+        if compare(old, run, options["threshold"]):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+bench_lexer.py
+
+Compara el lexer clásico (carácter a carácter) con el escáner rápido
+basado en patrón maestro, sobre los specs reales y sobre archivos
+sintéticos grandes. Antes de medir verifica que ambos produzcan
+exactamente la misma secuencia de tokens.
+
+El escáner rápido gana en los specs reales (archivos chicos); en los
+sintéticos grandes ambos están dominados por la creación de Token y el
+resultado varía entre corridas alrededor de x1.
+
+Uso:
+    python bench/bench_lexer.py
+    python bench/bench_lexer.py --sizes 100,1000,10000
+"""
+from __future__ import print_function
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dsl.lexer import tokenize
+from bench.common import best_time
+from bench.synth import make_spec
+
+
+def _same_tokens(a, b):
+    if len(a) != len(b):
+        return False
+    for x, y in zip(a, b):
+        if (x.type, x.value, x.line, x.col) != (y.type, y.value, y.line, y.col):
+            return False
+    return True
+
+
+def bench_text(label, text, repeat=5):
+    classic = tokenize(text, mode='classic')
+    fast = tokenize(text, mode='fast')
+    if not _same_tokens(classic, fast):
+        raise AssertionError("Los escáneres difieren en %s" % label)
+
+    t_classic = best_time(lambda: tokenize(text, mode='classic'), repeat)
+    t_fast = best_time(lambda: tokenize(text, mode='fast'), repeat)
+
+    mb = len(text) / (1024.0 * 1024.0)
+    print("%-22s %9d B %8d tok | classic %8.2f MB/s | fast %8.2f MB/s | x%.2f" % (
+        label, len(text), len(classic),
+        mb / t_classic, mb / t_fast, t_classic / t_fast))
+
+
+def main():
+    sizes = [100, 1000, 10000]
+    args = sys.argv[1:]
+    if len(args) == 2 and args[0] == '--sizes':
+        sizes = [int(s) for s in args[1].split(',')]
+
+    print("=" * 90)
+    print("Lexer: classic vs fast")
+    print("=" * 90)
+
+    specs_dir = os.path.join(ROOT, "specs")
+    for name in sorted(os.listdir(specs_dir)):
+        if name.endswith('.brik'):
+            with open(os.path.join(specs_dir, name), 'r') as f:
+                bench_text(name, f.read(), repeat=20)
+
+    for n in sizes:
+        bench_text("synth %d piezas" % n, make_spec(pieces=n), repeat=3)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+bench_packed.py
+
+Mide parse + carga de un level.grid grande con el camino clásico (lista
+de listas de ints) y con el camino compacto que usa runtime
+(TokenBuffer + IterativeParser + PackedMatrix): tiempo y memoria pico.
+La "carga" recorre las celdas no vacías como _build_walls_from_grid.
+
+Uso:
+    python bench/bench_packed.py            # grilla de 500x500
+    python bench/bench_packed.py 1000
+"""
+from __future__ import print_function
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dsl.brik_parser import parse_text
+from dsl.symbols import build_symbol_table
+from dsl.packed import iter_nonzero
+from bench.common import best_time, peak_memory, fmt_bytes
+from bench.synth import make_level
+
+
+def load(text, **options):
+    symbols = build_symbol_table(parse_text(text, **options))
+    walls = set(iter_nonzero(symbols['level.grid']))
+    return symbols, walls
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    text = make_level(size, size)
+
+    print("=" * 78)
+    print("level.grid %dx%d (%s): lista de listas vs PackedMatrix" % (
+        size, size, fmt_bytes(len(text))))
+    print("=" * 78)
+
+    variants = [
+        ("listas", {}),
+        ("packed", dict(mode='buffer', iterative=True, packed=True)),
+    ]
+    for label, options in variants:
+        t = best_time(lambda: load(text, **options), repeat=3)
+        (symbols, _), peak = peak_memory(lambda: load(text, **options))
+        print("%-7s parse+carga %7.3f s | pico %10s | level.grid: %r" % (
+            label, t, fmt_bytes(peak), type(symbols['level.grid']).__name__))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+bench_parser.py
+
+Compara Parser (recursivo) con IterativeParser (pila explícita) sobre
+los specs reales, un archivo sintético con muchas matrices y un archivo
+con anidamiento profundo que supera el límite de recursión.
+
+Uso:
+    python bench/bench_parser.py
+"""
+from __future__ import print_function
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dsl.lexer import tokenize
+from dsl.brik_parser import Parser, IterativeParser
+from bench.common import best_time
+from bench.synth import make_spec
+
+
+def bench_tokens(label, tokens, repeat):
+    t_rec = best_time(lambda: Parser(tokens).parse_file(), repeat)
+    t_it = best_time(lambda: IterativeParser(tokens).parse_file(), repeat)
+    print("%-24s %8d tok | recursivo %8.2f ms | iterativo %8.2f ms | x%.2f" % (
+        label, len(tokens), t_rec * 1000, t_it * 1000, t_rec / t_it))
+
+
+def deep_spec(depth):
+    return ('game "deep" { ' + 'a { ' * depth + 'm = ' + '[' * depth + '1' +
+            ']' * depth + ';' + ' }' * depth + ' }')
+
+
+def main():
+    print("=" * 84)
+    print("Parser recursivo vs iterativo (tokens ya generados con mode='fast')")
+    print("=" * 84)
+
+    specs_dir = os.path.join(ROOT, "specs")
+    for name in sorted(os.listdir(specs_dir)):
+        if name.endswith('.brik'):
+            with open(os.path.join(specs_dir, name), 'r') as f:
+                bench_tokens(name, tokenize(f.read(), mode='fast'), repeat=50)
+
+    for n in (100, 2000):
+        bench_tokens("synth %d piezas" % n, tokenize(make_spec(pieces=n), mode='fast'), 5)
+
+    depth = sys.getrecursionlimit() * 2
+    tokens = tokenize(deep_spec(depth), mode='fast')
+    try:
+        Parser(tokens).parse_file()
+        rec = "OK"
+    except RuntimeError:            # RecursionError en Python 3
+        rec = "límite de recursión"
+    IterativeParser(tokens).parse_file()
+    print("profundidad %d: recursivo -> %s | iterativo -> OK" % (depth, rec))
+
+
+if __name__ == "__main__":
+    main()
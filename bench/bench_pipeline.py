@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+bench_pipeline.py
+
+Mide por separado cada etapa de la compilación a .json:
+
+    lex      dsl.lexer.tokenize
+    parse    Parser / IterativeParser sobre los tokens ya generados
+    symbols  dsl.symbols.build_symbol_table
+    json     json.dump del mismo diccionario que escribe compiler.py
+
+sobre archivos sintéticos de distintas formas (ver bench/synth.py
+SHAPES: muchas secciones, anidamiento profundo, matrices enormes,
+strings largos, piezas estilo Tetris). Reporta tokens/s, MB/s y
+memoria pico por etapa. Los resultados se pueden guardar en JSON y
+comparar con una corrida anterior para detectar regresiones.
+
+Uso:
+    python bench/bench_pipeline.py [opciones]
+
+Opciones:
+    --shape NOMBRE     forma a medir (repetible; por defecto todas)
+    --scale N          multiplica el tamaño de cada forma (defecto 1)
+    --mode MODO        lexer: classic (defecto, el de compiler.py), fast, buffer
+    --iterative        usa IterativeParser
+    --repeat N         corridas por etapa; se toma la mejor (defecto 3)
+    --save ARCHIVO     guarda los resultados en JSON
+    --compare ARCHIVO  compara con resultados guardados antes
+    --threshold PCT    % de aumento de tiempo considerado regresión (defecto 10)
+"""
+from __future__ import print_function
+
+import json
+import os
+import platform
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dsl.lexer import tokenize
+from dsl.brik_parser import Parser, IterativeParser
+from dsl.symbols import build_symbol_table
+from bench.common import best_time, peak_memory, fmt_bytes
+from bench.synth import SHAPES
+
+STAGES = ("lex", "parse", "symbols", "json")
+MIN_DELTA_MS = 0.5
+
+
+def bench_shape(name, text, mode, iterative, repeat):
+    """Mide las cuatro etapas sobre 'text' y devuelve el dict de resultados."""
+    parser_cls = IterativeParser if iterative else Parser
+    tokens = tokenize(text, mode)
+    ast = parser_cls(tokens).parse_file()
+    symbols = build_symbol_table(ast)
+    compiled_data = {"source_file": name + ".brik", "ast": ast, "symbols": symbols}
+
+    fd, json_path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+
+    def write_json():
+        with open(json_path, 'w') as f:
+            json.dump(compiled_data, f, indent=2, ensure_ascii=False)
+
+    funcs = {
+        "lex": lambda: tokenize(text, mode),
+        "parse": lambda: parser_cls(tokens).parse_file(),
+        "symbols": lambda: build_symbol_table(ast),
+        "json": write_json,
+    }
+    n_bytes = len(text)
+    n_tokens = len(tokens)
+    stages = {}
+    try:
+        for stage in STAGES:
+            seconds = best_time(funcs[stage], repeat)
+            peak = peak_memory(funcs[stage])[1]
+            stages[stage] = {
+                "ms": seconds * 1000.0,
+                "tokens_per_s": n_tokens / seconds,
+                "mb_per_s": n_bytes / seconds / (1024.0 * 1024.0),
+                "peak_bytes": peak,
+            }
+        json_bytes = os.path.getsize(json_path)
+    finally:
+        os.remove(json_path)
+    return {"bytes": n_bytes, "tokens": n_tokens, "json_bytes": json_bytes,
+            "stages": stages}
+
+
+def print_shape(name, result):
+    print("%s: %s fuente, %d tokens, %s json" % (
+        name, fmt_bytes(result["bytes"]), result["tokens"], fmt_bytes(result["json_bytes"])))
+    for stage in STAGES:
+        r = result["stages"][stage]
+        print("  %-8s %10.2f ms | %10.0f tok/s | %7.2f MB/s | pico %9s" % (
+            stage, r["ms"], r["tokens_per_s"], r["mb_per_s"], fmt_bytes(r["peak_bytes"])))
+
+
+def compare(old, new, threshold):
+    """Imprime la variación de tiempo por etapa; devuelve cuántas regresiones hubo."""
+    print()
+    print("Comparación con la corrida guardada (umbral %+.0f%%):" % threshold)
+    regressions = 0
+    for name in sorted(new["results"]):
+        if name not in old.get("results", {}):
+            continue
+        for stage in STAGES:
+            before = old["results"][name]["stages"].get(stage)
+            if not before:
+                continue
+            after = new["results"][name]["stages"][stage]
+            change = (after["ms"] / before["ms"] - 1.0) * 100.0
+            flag = ""
+            # Etapas de fracciones de ms son puro ruido: se exige además
+            # una diferencia absoluta mínima
+            if change > threshold and after["ms"] - before["ms"] > MIN_DELTA_MS:
+                flag = "  <-- REGRESIÓN"
+                regressions += 1
+            print("  %-10s %-8s %10.2f ms -> %10.2f ms  %+7.1f%%%s" % (
+                name, stage, before["ms"], after["ms"], change, flag))
+    print("Regresiones: %d" % regressions)
+    return regressions
+
+
+def parse_args(args):
+    options = {"shapes": [], "scale": 1, "mode": "classic", "iterative": False,
+               "repeat": 3, "save": None, "compare": None, "threshold": 10.0}
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "--iterative":
+            options["iterative"] = True
+            i += 1
+            continue
+        if i + 1 >= len(args):
+            raise SystemExit("ERROR: falta el valor de %s" % arg)
+        value = args[i + 1]
+        if arg == "--shape":
+            if value not in SHAPES:
+                raise SystemExit("ERROR: forma desconocida %r (disponibles: %s)" % (
+                    value, ", ".join(sorted(SHAPES))))
+            options["shapes"].append(value)
+        elif arg == "--scale":
+            options["scale"] = int(value)
+        elif arg == "--mode":
+            options["mode"] = value
+        elif arg == "--repeat":
+            options["repeat"] = int(value)
+        elif arg == "--save":
+            options["save"] = value
+        elif arg == "--compare":
+            options["compare"] = value
+        elif arg == "--threshold":
+            options["threshold"] = float(value)
+        else:
+            raise SystemExit("ERROR: opción desconocida %r" % arg)
+        i += 2
+    if not options["shapes"]:
+        options["shapes"] = sorted(SHAPES)
+    return options
+
+
+def main():
+    options = parse_args(sys.argv[1:])
+
+    print("=" * 76)
+    print("Pipeline del DSL por etapas (lexer %s, parser %s, escala %d)" % (
+        options["mode"], "iterativo" if options["iterative"] else "recursivo",
+        options["scale"]))
+    print("=" * 76)
+
+    run = {
+        "python": platform.python_version(),
+        "mode": options["mode"],
+        "iterative": options["iterative"],
+        "scale": options["scale"],
+        "results": {},
+    }
+    for name in options["shapes"]:
+        text = SHAPES[name](options["scale"])
+        result = bench_shape(name, text, options["mode"], options["iterative"],
+                             options["repeat"])
+        run["results"][name] = result
+        print_shape(name, result)
+
+    if options["save"]:
+        with open(options["save"], 'w') as f:
+            json.dump(run, f, indent=2, sort_keys=True)
+        print()
+        print("Resultados guardados en %s" % options["save"])
+
+    if options["compare"]:
+        with open(options["compare"]) as f:
+            old = json.load(f)
+        if compare(old, run, options["threshold"]):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
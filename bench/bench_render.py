@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+bench_render.py
+
+Compara seis formas de dibujar del GameEngine corriendo Snake y Tetris
+reales durante N frames:
+
+    anterior  borrar todo y crear un rectángulo por ladrillo en cada frame
+    ant+lote  igual, pero con los comandos del frame en un solo eval de Tcl
+    retenido  grilla retenida de render.py (un ítem por celda, itemconfig
+              solo de las celdas que cambian), redibujando todo el juego
+    capas     grilla retenida y solo las capas que el juego invalidó
+    lote      capas + TclBatch (un eval de Tcl por frame)
+    imagen    capas + ImageGrid (la grilla es una sola PhotoImage)
+
+Reporta por frame: tiempo, porcentaje de frames que dibujaron algo
+(los juegos por capas solo redibujan lo invalidado), llamadas de Python
+a Tcl, comandos de canvas ejecutados, ítems de Tk creados/borrados y
+celdas actualizadas, y el tiempo de crear el motor (la grilla de
+canvas crea un rectángulo por celda). Con --board WxH se fuerza un
+tablero grande (sin el nivel del .brik). Si no hay display (DISPLAY vacío, servidor, CI) los
+canvas son comandos de un intérprete Tcl sin Tk que solo cuentan sus
+invocaciones: se mide el cruce Python -> Tcl real pero no el dibujo.
+
+Uso:
+    python bench/bench_render.py [frames] [--board WxH]
+"""
+from __future__ import print_function
+
+import os
+import random
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from engine import GameEngine, tk
+from main import make_engine_from_symbols
+from runtime import load_symbols_from_brik
+from games.snake_game import SnakeGame
+from games.tetris_game import TetrisGame
+
+
+class CountingTk(object):
+    """Envuelve el intérprete de un widget y cuenta las llamadas a Tcl."""
+
+    def __init__(self, tkapp):
+        self._tkapp = tkapp
+        self.calls = 0
+
+    def call(self, *args):
+        self.calls += 1
+        return self._tkapp.call(*args)
+
+    def eval(self, script):
+        self.calls += 1
+        return self._tkapp.eval(script)
+
+    def __getattr__(self, name):
+        return getattr(self._tkapp, name)
+
+
+class StubCanvas(tk.Canvas):
+    """
+    Canvas de Tkinter cuyo comando de Tcl es un proc que solo cuenta sus
+    invocaciones (y devuelve ids crecientes para los create).
+    """
+
+    def __init__(self, interp, path):
+        self.tk = interp.tk
+        self._w = path
+        interp.eval("set ::ncmd 0; proc %s {args} {incr ::ncmd}" % path)
+        # Imágenes (ImageGrid): cada photo es otro proc que cuenta
+        interp.eval(
+            "proc image {op args} {"
+            " if {$op eq {create}} {"
+            "  set name [lindex $args 1];"
+            "  proc $name {args} {incr ::ncmd};"
+            "  return $name } }")
+
+
+class CountingEngine(GameEngine):
+    """
+    GameEngine que cuenta las llamadas a Tcl de sus canvas. Sin display
+    usa StubCanvas sobre un intérprete Tcl sin Tk.
+    """
+
+    def _build_window(self):
+        try:
+            GameEngine._build_window(self)
+        except tk.TclError:
+            interp = tk.Tcl()
+            self.root = None
+            self.game_canvas = StubCanvas(interp, ".game")
+            self.info_canvas = None
+            if self.info_width_px > 0:
+                self.info_canvas = StubCanvas(interp, ".info")
+            self.font_title = self.font_label = self.font_value = self.font_hint = None
+        # Ambos canvas comparten el intérprete: un solo contador
+        counter = CountingTk(self.game_canvas.tk)
+        self.game_canvas.tk = counter
+        if self.info_canvas is not None:
+            self.info_canvas.tk = counter
+        self.tcl = counter
+
+    def tcl_commands(self):
+        """Comandos de canvas ejecutados por Tcl (solo con StubCanvas)."""
+        if self.root is not None:
+            return None
+        return int(self.tcl.eval("set ::ncmd"))
+
+
+KEYS = {
+    "snake": ["Up", "Left", "Down", "Right"],
+    "tetris": ["Left", "Right", "Up", "Down", "Left", "Up"],
+}
+
+
+MODES = (
+    # nombre, grilla retenida, redibujar todas las capas, lote Tcl, backend
+    ("anterior", False, True, False, "canvas"),
+    ("ant+lote", False, True, True, "canvas"),
+    ("retenido", True, True, False, "canvas"),
+    ("capas", True, False, False, "canvas"),
+    ("lote", True, False, True, "canvas"),
+    ("imagen", True, False, True, "image"),
+)
+
+
+def load_symbols(name, board):
+    symbols = load_symbols_from_brik(os.path.join(ROOT, "specs", name + ".brik"))
+    if board is not None:
+        symbols = dict(symbols)
+        symbols["board.width"], symbols["board.height"] = board
+        symbols.pop("level.grid", None)
+    return symbols
+
+
+def run(name, game_cls, frames, retained, redraw_all, batch, backend, board=None):
+    symbols = load_symbols(name, board)
+    t_init = timeit.default_timer()
+    engine = make_engine_from_symbols(symbols, CountingEngine, retained_grid=retained,
+                                      batch_tcl=batch, backend=backend)
+    t_init = timeit.default_timer() - t_init
+    real = engine.root is not None
+
+    random.seed(1)
+    game = game_cls(engine, symbols)
+    if hasattr(game, "_rng"):
+        # El generador se sembró al construir el juego: reiniciar para
+        # que todos los modos vean la misma secuencia de piezas
+        game._rng.seed(1)
+        game.reset()
+    engine.set_game(game)
+
+    keys = KEYS[name]
+    # No contar la creación de la grilla ni la ventana
+    calls0 = engine.tcl.calls
+    commands0 = engine.tcl_commands()
+    t0 = timeit.default_timer()
+    for i in range(frames):
+        if i % 7 == 0:
+            game.on_key(keys[(i // 7) % len(keys)])
+        if getattr(game, "game_over", False):
+            game.reset()
+        if redraw_all:
+            engine.invalidate()
+        engine.run_frame(50)
+        if real:
+            engine.root.update_idletasks()
+    elapsed = timeit.default_timer() - t0
+
+    stats = dict(engine.render_stats)
+    stats["init_ms"] = t_init * 1000
+    stats["tcl_calls"] = engine.tcl.calls - calls0
+    stats["tcl_commands"] = None
+    if not real:
+        stats["tcl_commands"] = engine.tcl_commands() - commands0
+    if real:
+        engine.root.destroy()
+    return stats, elapsed, real
+
+
+def main():
+    args = sys.argv[1:]
+    board = None
+    if "--board" in args:
+        i = args.index("--board")
+        if i + 1 >= len(args):
+            raise SystemExit("ERROR: falta el valor de --board (p. ej. 200x200)")
+        board = tuple(int(v) for v in args[i + 1].lower().split("x"))
+        del args[i:i + 2]
+    frames = int(args[0]) if args else 400
+
+    print("=" * 124)
+    print("Render por frame: recrear vs grilla retenida vs capas vs lote Tcl vs imagen (%d frames%s)" % (
+        frames, ", tablero %dx%d" % board if board else ""))
+    print("=" * 124)
+    for name, game_cls in (("snake", SnakeGame), ("tetris", TetrisGame)):
+        for mode, retained, redraw_all, batch, backend in MODES:
+            stats, elapsed, real = run(name, game_cls, frames, retained, redraw_all,
+                                       batch, backend, board)
+            n = float(frames)
+            if stats["tcl_commands"] is None:
+                commands = "     -"
+            else:
+                commands = "%6.1f" % (stats["tcl_commands"] / n)
+            print("%-7s %-9s %s | inicio %8.1f ms | %7.3f ms/frame | dibujados %5.1f%% | "
+                  "llamadas Tcl %6.1f | comandos %s | creados %6.1f | borrados %6.1f | "
+                  "celdas %5.1f" % (
+                      name, mode,
+                      "Tk " if real else "Tcl",
+                      stats["init_ms"],
+                      elapsed * 1000 / n,
+                      stats["frames"] * 100 / n,
+                      stats["tcl_calls"] / n,
+                      commands,
+                      stats["items_created"] / n,
+                      stats["items_deleted"] / n,
+                      stats["cells_updated"] / n))
+
+
+if __name__ == "__main__":
+    main()
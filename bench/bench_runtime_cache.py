@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+bench_runtime_cache.py
+
+Mide runtime.load_symbols_from_brik en frío (sin entrada en el caché:
+analiza el .brik y escribe el caché) y en caliente (tabla leída del
+caché), sobre los specs reales y un .brik sintético grande. Usa una
+carpeta de caché temporal para no tocar specs/.brikcache.
+
+Uso:
+    python bench/bench_runtime_cache.py
+"""
+from __future__ import print_function
+
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import runtime
+from bench.common import best_time, fmt_bytes
+from bench.synth import make_spec
+
+
+def bench_file(label, path, cache_dir):
+    def cold():
+        cache_file = runtime.cache_path_for(path, cache_dir)
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
+        runtime.load_symbols_from_brik(path, cache_dir=cache_dir)
+
+    def warm():
+        runtime.load_symbols_from_brik(path, cache_dir=cache_dir)
+
+    repeat = 3 if os.path.getsize(path) > 1 << 20 else 20
+    t_cold = best_time(cold, repeat)
+    t_warm = best_time(warm, repeat)
+    print("%-20s %10s | frío %9.2f ms | caliente %9.2f ms | x%.1f" % (
+        label, fmt_bytes(os.path.getsize(path)),
+        t_cold * 1000, t_warm * 1000, t_cold / t_warm))
+
+
+def main():
+    tmp = tempfile.mkdtemp()
+    try:
+        print("=" * 76)
+        print("load_symbols_from_brik: caché frío vs caliente")
+        print("=" * 76)
+
+        runtime.reset_cache_stats()
+        specs_dir = os.path.join(ROOT, "specs")
+        for name in sorted(os.listdir(specs_dir)):
+            if name.endswith('.brik'):
+                bench_file(name, os.path.join(specs_dir, name), tmp)
+
+        big = os.path.join(tmp, "synth.brik")
+        with open(big, 'w') as f:
+            f.write(make_spec(pieces=5000))
+        bench_file("synth 5000 piezas", big, tmp)
+
+        print("contadores:", runtime.cache_stats())
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
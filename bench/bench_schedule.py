@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+bench_schedule.py
+
+Compara el loop de tick fijo (el motor se despierta cada tick_ms) con el
+loop por eventos (se despierta cuando vence game.next_due_ms() o llega
+una tecla) sobre headless.HeadlessEngine, en tiempo virtual.
+
+Cada partida dura --seconds segundos: juega con teclas pseudoaleatorias,
+pausa a la mitad durante un tercio del tiempo y sigue. Reporta por
+modo y fase (jugando / en pausa) cuántas veces por segundo se despierta
+el motor, cuántos frames dibujan algo, y el retraso entre que vence un
+paso del juego y el frame que lo muestra. En tiempo virtual ese retraso
+es 0 por construcción en el loop por eventos; en una ventana real es lo
+que tarda root.after en despertar (el panel de info lo muestra).
+
+Uso:
+    python bench/bench_schedule.py [--seconds N]
+"""
+from __future__ import print_function
+
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from headless import HeadlessEngine
+from main import make_engine_from_symbols
+from perf import RollingStats
+from runtime import load_symbols_from_brik
+from games.snake_game import SnakeGame
+from games.tetris_game import TetrisGame
+
+GAMES = (
+    ("snake", SnakeGame, ["Up", "Left", "Down", "Right"]),
+    ("tetris", TetrisGame, ["Left", "Right", "Up"]),
+)
+
+
+class Phase(object):
+    def __init__(self):
+        self.ms = 0
+        self.wakeups = 0
+        self.drawn = 0
+        self.lag = RollingStats(size=100000)
+
+
+def play(symbols, game_cls, keys, seconds, event_driven):
+    random.seed(1)
+    engine = make_engine_from_symbols(symbols, HeadlessEngine, event_driven=event_driven)
+    game = game_cls(engine, symbols)
+    if hasattr(game, "_rng"):
+        game._rng.seed(1)
+        game.reset()
+    engine.set_game(game)
+
+    total = seconds * 1000
+    pause_from, pause_to = total // 3, 2 * total // 3
+    rng = random.Random(2)
+    phases = {"jugando": Phase(), "pausa": Phase()}
+
+    # Eventos: teclas cada 300-900 ms y la pausa
+    events = []
+    t = 0
+    while t < total:
+        t += rng.randint(300, 900)
+        if not pause_from <= t < pause_to:
+            events.append((t, rng.choice(keys)))
+    events.extend([(pause_from, "p"), (pause_to, "p")])
+    events.sort()
+    events.append((total, None))
+
+    for when, key in events:
+        # Hasta 'when' el motor corre solo: un frame por tick o, por
+        # eventos, uno por cada vencimiento de next_due_ms()
+        while engine.now_ms < when:
+            phase = phases["pausa" if pause_from <= engine.now_ms < pause_to else "jugando"]
+            due = game.next_due_ms()
+            due_at = None if due is None else engine._last_frame_ms + due
+            frames = engine.frame
+            drawn = engine.render_stats["frames"]
+            before = engine.now_ms
+            if event_driven:
+                target = when if due_at is None else max(before, min(when, due_at))
+                engine.advance(target - before)
+            else:
+                engine.step(min(engine.tick_ms, when - before))
+            phase.ms += engine.now_ms - before
+            phase.wakeups += engine.frame - frames
+            phase.drawn += engine.render_stats["frames"] - drawn
+            if due_at is not None and engine.frame > frames and \
+                    engine._last_frame_ms >= due_at:
+                phase.lag.add(engine._last_frame_ms - due_at)
+        if key is not None:
+            phase = phases["pausa" if pause_from <= engine.now_ms < pause_to else "jugando"]
+            frames = engine.frame
+            engine.press(key)
+            phase.wakeups += engine.frame - frames
+        if getattr(game, "game_over", False):
+            game.reset()
+    return phases
+
+
+def main():
+    args = sys.argv[1:]
+    seconds = 60
+    if "--seconds" in args:
+        seconds = int(args[args.index("--seconds") + 1])
+
+    print("=" * 96)
+    print("Tick fijo vs loop por eventos (%d s de juego virtual, pausa en el tercio central)" % seconds)
+    print("=" * 96)
+    for name, game_cls, keys in GAMES:
+        symbols = load_symbols_from_brik(os.path.join(ROOT, "specs", name + ".brik"))
+        for mode, event_driven in (("fijo", False), ("eventos", True)):
+            phases = play(symbols, game_cls, keys, seconds, event_driven)
+            for phase_name in ("jugando", "pausa"):
+                ph = phases[phase_name]
+                secs = ph.ms / 1000.0 or 1.0
+                p50, p99 = ph.lag.percentiles(50, 99)
+                lag = "      -" if p50 is None else "%5.1f / %5.1f ms" % (p50, p99)
+                print("%-7s %-8s %-8s | despertares %6.1f/s | dibujados %5.1f/s | "
+                      "retraso paso->frame p50/p99 %s" % (
+                          name, mode, phase_name, ph.wakeups / secs, ph.drawn / secs, lag))
+
+
+if __name__ == "__main__":
+    main()
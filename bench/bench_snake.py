@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""
+bench_snake.py
+
+Pasos por segundo de SnakeGame._step con serpientes muy largas.
+
+En un tablero grande sin obstáculos ni portales la serpiente recorre un
+ciclo que pasa por todas las celdas interiores (filas en zigzag y
+vuelta por la primera columna), así nunca choca. Para cada largo:
+
+    crecer   pasos desde el largo inicial hasta el largo pedido
+             (crecimiento pendiente, la cola no se mueve)
+    avanzar  N pasos con el largo fijo (entra la cabeza, sale la cola)
+    celda    elegir una celda libre al azar (donde aparece la comida)
+
+Cada largo se mide con tres versiones del paso:
+
+    sets     cuerpo de tuplas (x, y) y consultas en los sets de paredes,
+             portales y cuerpo (TupleSetSnake, aquí)
+    grilla   cuerpo de índices y una lectura de la grilla de celdas, con
+             el vecino calculado en cada paso (GridSnake, aquí)
+    tabla    SnakeGame: el vecino sale de la tabla de movimiento
+
+También se informa cuánto tarda armar la tabla de movimiento del tablero.
+
+No se dibuja: solo se mide la lógica del paso.
+
+Uso:
+    python bench/bench_snake.py [opciones]
+
+Opciones:
+    --board WxH      tamaño del tablero (defecto 202x202: 200x200 interior)
+    --lengths L,...  largos a medir (defecto 100,1000,10000,30000,39000)
+    --steps N        pasos con largo fijo (defecto 20000)
+"""
+from __future__ import print_function
+
+import os
+import random
+import sys
+import timeit
+from collections import deque
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from headless import HeadlessEngine
+from main import make_engine_from_symbols
+from runtime import load_symbols_from_brik
+from games.snake_game import (SnakeGame, FreeCells, CELL_EMPTY, CELL_WALL,
+                               CELL_BODY, CELL_KIND, CELL_PORTAL)
+
+
+class TupleSetSnake(SnakeGame):
+    """
+    SnakeGame con el paso de antes de la grilla de ocupación: el cuerpo es
+    una deque de tuplas (x, y) y cada paso consulta portals, walls y un set
+    con el cuerpo. Solo para comparar en este bench.
+    """
+
+    def __init__(self, engine, symbols):
+        SnakeGame.__init__(self, engine, symbols)
+        self._copy_state()
+
+    def _copy_state(self):
+        self.t_snake = deque(self.snake_cells())
+        self.t_snake_set = set(self.t_snake)
+        w = self.board_w
+        self.t_floor = set((i % w, i // w) for i in self._floor)
+        self.t_free = FreeCells((i % w, i // w) for i in self._free._cells)
+
+    def head(self):
+        return self.t_snake[0]
+
+    def length(self):
+        return len(self.t_snake)
+
+    def _step(self):
+        self.current_dir = self.pending_dir
+
+        head_x, head_y = self.t_snake[0]
+        dx, dy = self.current_dir
+        nx = head_x + dx
+        ny = head_y + dy
+        if self.wrap:
+            nx %= self.board_w
+            ny %= self.board_h
+        out_of_bounds = not (0 <= nx < self.board_w and 0 <= ny < self.board_h)
+        new_head = (nx, ny)
+        if new_head in self.portals:
+            new_head = self.portals[new_head]
+        if out_of_bounds:
+            if self.rule_out_of_bounds == 'end':
+                self.game_over = True
+            return
+        if new_head in self.walls:
+            if self.rule_wall_collision == 'end':
+                self.game_over = True
+            return
+        if new_head in self.t_snake_set:
+            if self.rule_self_collision == 'end':
+                self.game_over = True
+            return
+
+        self.t_snake.appendleft(new_head)
+        self.t_snake_set.add(new_head)
+        self.t_free.discard(new_head)
+        self.invalidate("dynamic")
+        if self._growth_pending > 0:
+            self._growth_pending -= 1
+        else:
+            tail = self.t_snake.pop()
+            self.t_snake_set.remove(tail)
+            if tail in self.t_floor:
+                self.t_free.add(tail)
+
+    def _random_empty_cell(self):
+        return self.t_free.choice()
+
+
+class TableSnake(SnakeGame):
+    """SnakeGame tal cual, con los mismos accesos que TupleSetSnake."""
+
+    def _copy_state(self):
+        pass
+
+    def length(self):
+        return len(self.body)
+
+
+class GridSnake(TableSnake):
+    """
+    SnakeGame con el paso de antes de la tabla de movimiento: suma la
+    dirección, aplica el wrap, revisa los bordes y busca el portal en
+    cada paso. Solo para comparar en este bench.
+    """
+
+    def _copy_state(self):
+        w = self.board_w
+        self.portal_to = dict(((ay * w + ax), (by * w + bx))
+                              for (ax, ay), (bx, by) in self.portals.items())
+
+    def _step(self):
+        self.current_dir = self.pending_dir
+
+        w = self.board_w
+        head = self.body[0]
+        dx, dy = self.current_dir
+        nx = head % w + dx
+        ny = head // w + dy
+        if self.wrap:
+            nx %= w
+            ny %= self.board_h
+        if not (0 <= nx < w and 0 <= ny < self.board_h):
+            if self.rule_out_of_bounds == 'end':
+                self.game_over = True
+            return
+
+        cells = self.cells
+        idx = ny * w + nx
+        cell = cells[idx]
+        if cell & CELL_PORTAL:
+            idx = self.portal_to[idx]
+            cell = cells[idx]
+        kind = cell & CELL_KIND
+        if kind == CELL_WALL:
+            if self.rule_wall_collision == 'end':
+                self.game_over = True
+            return
+        if kind == CELL_BODY:
+            if self.rule_self_collision == 'end':
+                self.game_over = True
+            return
+
+        self.body.appendleft(idx)
+        cells[idx] = (cell & CELL_PORTAL) | CELL_BODY
+        self._free.discard(idx)
+        self.invalidate("dynamic")
+        if self._growth_pending > 0:
+            self._growth_pending -= 1
+        else:
+            tail = self.body.pop()
+            cells[tail] &= CELL_PORTAL
+            if tail in self._floor:
+                self._free.add(tail)
+
+
+VERSIONS = (("sets", TupleSetSnake), ("grilla", GridSnake), ("tabla", TableSnake))
+
+
+def make_game(board, game_cls=TableSnake):
+    symbols = dict(load_symbols_from_brik(os.path.join(ROOT, "specs", "snake.brik")))
+    symbols["board.width"], symbols["board.height"] = board
+    symbols["board.wrap"] = False
+    symbols["snake.spawn"] = "center"
+    symbols["portals.random"] = False
+    for key in ("level.grid", "portals.p1_from", "portals.p1_to",
+                "portals.p2_from", "portals.p2_to"):
+        symbols.pop(key, None)
+    engine = make_engine_from_symbols(symbols, HeadlessEngine)
+    random.seed(1)
+    game = game_cls(engine, symbols)
+    # Sin manzanas: el largo lo controla el bench
+    for idx in game.apples:
+        game.cells[idx] = CELL_EMPTY
+        game._free.add(idx)
+    game.apples.clear()
+    game._respawns = []
+    game._copy_state()
+    return game
+
+
+def cycle_direction(game):
+    """
+    Dirección que sigue el ciclo por el interior del tablero: filas pares
+    hacia la derecha, impares hacia la izquierda (hasta la columna 1) y
+    la columna 0 de vuelta hacia arriba.
+    """
+    x, y = game.head()
+    ix = x - 1
+    iy = y - 1
+    inner_w = game.board_w - 2
+    inner_h = game.board_h - 2
+    if ix == 0:
+        return (1, 0) if iy == 0 else (0, -1)
+    if iy % 2 == 0:
+        return (1, 0) if ix < inner_w - 1 else (0, 1)
+    if ix > 1 or iy == inner_h - 1:
+        return (-1, 0)
+    return (0, 1)
+
+
+def steps(game, count):
+    for _ in range(count):
+        game.pending_dir = cycle_direction(game)
+        game._step()
+    if game.game_over:
+        raise SystemExit("ERROR: la serpiente chocó (¿tablero con alto impar?)")
+
+
+def main():
+    args = sys.argv[1:]
+    board = (202, 202)
+    lengths = [100, 1000, 10000, 30000, 39000]
+    count = 20000
+    i = 0
+    while i < len(args):
+        if i + 1 >= len(args):
+            raise SystemExit("ERROR: falta el valor de %s" % args[i])
+        value = args[i + 1]
+        if args[i] == "--board":
+            board = tuple(int(v) for v in value.lower().split("x"))
+        elif args[i] == "--lengths":
+            lengths = [int(v) for v in value.split(",")]
+        elif args[i] == "--steps":
+            count = int(value)
+        else:
+            raise SystemExit("ERROR: opción desconocida %r" % args[i])
+        i += 2
+    if (board[1] - 2) % 2:
+        raise SystemExit("ERROR: el interior del tablero necesita un alto par")
+    inner = (board[0] - 2) * (board[1] - 2)
+
+    print("=" * 96)
+    print("Snake: pasos por segundo con serpientes largas, sets vs grilla vs tabla (tablero %dx%d)" % board)
+    print("=" * 96)
+    game = make_game(board)
+    t0 = timeit.default_timer()
+    game._build_level()
+    print("tabla de movimiento: %d entradas, armada en %.1f ms" % (
+        len(game._next), (timeit.default_timer() - t0) * 1000))
+    for length in lengths:
+        if length >= inner:
+            print("largo %6d: no entra en el tablero (%d celdas)" % (length, inner))
+            continue
+        for name, game_cls in VERSIONS:
+            game = make_game(board, game_cls)
+            grown = length - game.length()
+            game._growth_pending = grown
+            t0 = timeit.default_timer()
+            steps(game, grown)
+            grow = timeit.default_timer() - t0
+
+            t0 = timeit.default_timer()
+            steps(game, count)
+            run = timeit.default_timer() - t0
+
+            t0 = timeit.default_timer()
+            for _ in range(1000):
+                game._random_empty_cell()
+            pick = (timeit.default_timer() - t0) * 1000
+            print("largo %6d (%5.1f%% lleno) %-6s | crecer %8.0f pasos/s | avanzar %8.0f pasos/s "
+                  "(%5.2f us/paso) | celda %5.2f us" % (
+                      game.length(), game.length() * 100.0 / inner, name,
+                      grown / grow if grown > 0 else 0,
+                      count / run, run * 1e6 / count, pick))
+
+
+if __name__ == "__main__":
+    main()
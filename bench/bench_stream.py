@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+bench_stream.py
+
+Compara parse_text (archivo completo en memoria + lista de tokens + AST)
+con parse_stream (lectura por bloques + eventos) sobre un .brik sintético
+grande: tiempo total, tiempo hasta el primer evento/resultado y memoria
+pico (tracemalloc en Python 3; en Python 2.7, RSS máximo de un proceso
+hijo, ver bench/common.py).
+
+Uso:
+    python bench/bench_stream.py            # 5000 piezas
+    python bench/bench_stream.py 20000
+"""
+from __future__ import print_function
+
+import os
+import sys
+import tempfile
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dsl.brik_parser import parse_text, parse_stream, ParseHandler
+from bench.common import peak_memory, fmt_bytes
+from bench.synth import make_spec
+
+
+class _CountingHandler(ParseHandler):
+    """Cuenta eventos y anota cuándo llegó el primero."""
+
+    def __init__(self, t0):
+        self.t0 = t0
+        self.first_event_s = None
+        self.events = 0
+
+    def _event(self):
+        if self.first_event_s is None:
+            self.first_event_s = timeit.default_timer() - self.t0
+        self.events += 1
+
+    def on_section_start(self, name):
+        self._event()
+
+    def on_assign(self, name, value):
+        self._event()
+
+    def on_section_end(self, name):
+        self._event()
+
+
+def run_full(path):
+    t0 = timeit.default_timer()
+    with open(path, 'r') as f:
+        ast = parse_text(f.read())
+    # Con parse_text no hay nada utilizable hasta tener el AST completo.
+    return timeit.default_timer() - t0, len(ast)
+
+
+def run_stream(path):
+    t0 = timeit.default_timer()
+    handler = _CountingHandler(t0)
+    with open(path, 'r') as f:
+        parse_stream(f, handler)
+    return timeit.default_timer() - t0, handler.first_event_s, handler.events
+
+
+def main():
+    pieces = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    fd, path = tempfile.mkstemp(suffix='.brik')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(make_spec(pieces=pieces))
+        size = os.path.getsize(path)
+
+        print("=" * 72)
+        print("parse_text vs parse_stream - %s (%d piezas)" % (fmt_bytes(size), pieces))
+        print("=" * 72)
+
+        _, peak_full = peak_memory(lambda: run_full(path))
+        t_full_plain, _ = run_full(path)
+        print("parse_text   total %7.3f s | primer resultado %7.3f s | pico %s" % (
+            t_full_plain, t_full_plain, fmt_bytes(peak_full)))
+
+        (_, _, events), peak_stream = peak_memory(lambda: run_stream(path))
+        t_stream, first, _ = run_stream(path)
+        print("parse_stream total %7.3f s | primer evento    %7.3f s | pico %s | %d eventos" % (
+            t_stream, first, fmt_bytes(peak_stream), events))
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+bench_tokens.py
+
+Compara la lista de Token (tokenize mode='fast') con el TokenBuffer
+compacto (mode='buffer'): tiempo de tokenización, memoria pico y el
+parse completo sobre cada representación.
+
+Uso:
+    python bench/bench_tokens.py            # 2000 piezas (~370k tokens)
+    python bench/bench_tokens.py 10000
+"""
+from __future__ import print_function
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dsl.lexer import tokenize
+from dsl.brik_parser import parse_text
+from bench.common import best_time, peak_memory, fmt_bytes
+from bench.synth import make_spec
+
+
+def main():
+    pieces = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    text = make_spec(pieces=pieces)
+    ntok = len(tokenize(text, mode='buffer'))
+
+    print("=" * 78)
+    print("Tokens: lista de Token vs TokenBuffer - %s, %d tokens" % (
+        fmt_bytes(len(text)), ntok))
+    print("=" * 78)
+
+    for mode in ('fast', 'buffer'):
+        t_lex = best_time(lambda: tokenize(text, mode=mode), repeat=3)
+        _, peak_lex = peak_memory(lambda: tokenize(text, mode=mode))
+        t_parse = best_time(lambda: parse_text(text, mode=mode), repeat=3)
+        _, peak_parse = peak_memory(lambda: parse_text(text, mode=mode))
+        print("%-7s tokenize %6.3f s pico %10s | parse_text %6.3f s pico %10s" % (
+            mode, t_lex, fmt_bytes(peak_lex), t_parse, fmt_bytes(peak_parse)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+common.py
+
+Utilidades compartidas por los benchmarks de bench/.
+"""
+from __future__ import print_function
+
+import gc
+import os
+import sys
+import timeit
+
+try:
+    import tracemalloc      # Python 3.4+
+except ImportError:
+    tracemalloc = None      # Python 2.7: pico de RSS en un proceso hijo
+
+try:
+    import resource         # Unix
+except ImportError:
+    resource = None
+
+
+def best_time(func, repeat=5):
+    """Mejor tiempo (en segundos) de 'repeat' ejecuciones de func()."""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def _maxrss_bytes():
+    """Pico de RSS del proceso (ru_maxrss: KB en Linux, bytes en macOS)."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _child_peak(func):
+    """
+    Corre func() en un proceso hijo (fork) y devuelve cuánto creció su
+    pico de RSS, o None si no se puede medir. Es aproximado: la memoria
+    que el hijo hereda ya reservada no cuenta como pico nuevo.
+    """
+    if resource is None or not hasattr(os, "fork"):
+        return None
+    gc.collect()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.close(read_fd)
+            before = _maxrss_bytes()
+            func()
+            os.write(write_fd, str(_maxrss_bytes() - before).encode("ascii"))
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    data = b""
+    while True:
+        chunk = os.read(read_fd, 64)
+        if not chunk:
+            break
+        data += chunk
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+    return int(data) if data else None
+
+
+def peak_memory(func):
+    """
+    Ejecuta func() y devuelve (resultado, pico_bytes). Con tracemalloc
+    (Python 3) el pico es el de las asignaciones de func(); sin él
+    (Python 2.7) func() se repite en un proceso hijo y el pico es lo que
+    creció su RSS máximo (ver _child_peak). None si no se puede medir.
+    """
+    if tracemalloc is None:
+        return func(), _child_peak(func)
+    tracemalloc.start()
+    try:
+        result = func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def fmt_bytes(n):
+    if n is None:
+        return "n/a"
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024.0 or unit == "GB":
+            return "%.1f %s" % (n, unit)
+        n /= 1024.0
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+synth.py
+
+Generador de archivos .brik sintéticos para benchmarks.
+
+Produce texto válido según la gramática de bnf/*.bnf, con la misma
+mezcla de contenido que los specs reales (secciones con asignaciones,
+colores, strings, comentarios y matrices 0/1 como las rotaciones de
+Tetris), pero de tamaño configurable.
+
+Uso:
+    python bench/synth.py 5000 > /tmp/big.brik
+"""
+from __future__ import print_function
+
+import random
+
+
+def make_spec(pieces=100, matrix_size=4, rotations=4, seed=1234):
+    """
+    Devuelve el texto de un .brik con 'pieces' piezas, cada una con
+    'rotations' matrices cuadradas de 'matrix_size' x 'matrix_size'.
+    """
+    rng = random.Random(seed)
+    out = []
+    out.append('synth version 1.0\n\n')
+    out.append('// Archivo generado por bench/synth.py\n')
+    out.append('game "synth" {\n')
+    out.append('    board {\n')
+    out.append('        width = 20;       // Ancho del tablero\n')
+    out.append('        height = 24;\n')
+    out.append('        wrap = false;\n')
+    out.append('        colors {\n')
+    out.append('            background = #000000;\n')
+    out.append('            walls = #555555;\n')
+    out.append('        }\n')
+    out.append('    }\n\n')
+    out.append('    pieces {\n')
+    for p in range(pieces):
+        out.append('        // Pieza %d\n' % p)
+        out.append('        piece_%d {\n' % p)
+        out.append('            color = "#%06X";\n' % rng.randint(0, 0xFFFFFF))
+        out.append('            weight = %d.%d;\n' % (rng.randint(0, 9), rng.randint(0, 99)))
+        out.append('            rotations = [\n')
+        mats = []
+        for _ in range(rotations):
+            rows = []
+            for _ in range(matrix_size):
+                row = ','.join(str(rng.randint(0, 1)) for _ in range(matrix_size))
+                rows.append('                    [%s]' % row)
+            mats.append('                [\n%s\n                ]' % ',\n'.join(rows))
+        out.append(',\n'.join(mats))
+        out.append('\n            ];\n')
+        out.append('        }\n')
+    out.append('    }\n')
+    out.append('}\n')
+    return ''.join(out)
+
+
+def make_level(width=200, height=200, wall_ratio=0.1, seed=1234):
+    """
+    Devuelve un .brik estilo Snake con un level.grid de width x height
+    (1 = pared, con marco exterior completo).
+    """
+    rng = random.Random(seed)
+    out = []
+    out.append('snake version 1.0\n\n')
+    out.append('game "synth_level" {\n')
+    out.append('    board {\n')
+    out.append('        width = %d;\n' % width)
+    out.append('        height = %d;\n' % height)
+    out.append('    }\n\n')
+    out.append('    level {\n')
+    out.append('        grid = [\n')
+    rows = []
+    for y in range(height):
+        cells = []
+        for x in range(width):
+            border = x == 0 or y == 0 or x == width - 1 or y == height - 1
+            cells.append('1' if border or rng.random() < wall_ratio else '0')
+        rows.append('            [%s]' % ','.join(cells))
+    out.append(',\n'.join(rows))
+    out.append('\n        ];\n')
+    out.append('    }\n')
+    out.append('}\n')
+    return ''.join(out)
+
+
+def make_shaped_spec(sections=10, assigns=5, depth=1, matrix_rows=0,
+                     matrix_cols=0, strings=0, string_len=32, seed=1234):
+    """
+    Devuelve un .brik de forma configurable para medir etapas por
+    separado:
+
+      - sections:   cantidad de secciones hermanas bajo game { }
+      - assigns:    asignaciones escalares (int, float, bool, color)
+                    en la sección más interna de cada una
+      - depth:      niveles de anidamiento de cada sección (a { b { ... } })
+      - matrix_rows x matrix_cols: si ambos > 0, cada sección lleva una
+                    matriz 0..9 de ese tamaño
+      - strings / string_len: strings de ese largo por sección
+    """
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz '
+    out = []
+    out.append('synth version 1.0\n\n')
+    out.append('// Archivo generado por bench/synth.py (make_shaped_spec)\n')
+    out.append('game "shaped" {\n')
+    for s in range(sections):
+        pad = '    '
+        for d in range(depth):
+            out.append('%ss%d_%d {\n' % (pad, s, d))
+            pad += '    '
+        for a in range(assigns):
+            kind = a % 4
+            if kind == 0:
+                value = str(rng.randint(0, 100000))
+            elif kind == 1:
+                value = '%d.%d' % (rng.randint(0, 99), rng.randint(0, 99))
+            elif kind == 2:
+                value = 'true' if rng.random() < 0.5 else 'false'
+            else:
+                value = '#%06X' % rng.randint(0, 0xFFFFFF)
+            out.append('%sv%d = %s;\n' % (pad, a, value))
+        for t in range(strings):
+            text = ''.join(rng.choice(letters) for _ in range(string_len))
+            out.append('%stext%d = "%s";\n' % (pad, t, text))
+        if matrix_rows > 0 and matrix_cols > 0:
+            out.append('%sgrid = [\n' % pad)
+            rows = []
+            for _ in range(matrix_rows):
+                row = ','.join(str(rng.randint(0, 9)) for _ in range(matrix_cols))
+                rows.append('%s    [%s]' % (pad, row))
+            out.append(',\n'.join(rows))
+            out.append('\n%s];\n' % pad)
+        for d in range(depth):
+            pad = pad[:-4]
+            out.append('%s}\n' % pad)
+    out.append('}\n')
+    return ''.join(out)
+
+
+# Formas predefinidas para bench/bench_pipeline.py; 'scale' multiplica
+# la dimensión que caracteriza a cada una.
+SHAPES = {
+    "sections": lambda scale: make_shaped_spec(sections=2000 * scale, assigns=6),
+    "deep":     lambda scale: make_shaped_spec(sections=20 * scale, assigns=2, depth=100),
+    "matrix":   lambda scale: make_shaped_spec(sections=1, assigns=0,
+                                               matrix_rows=400 * scale, matrix_cols=400),
+    "strings":  lambda scale: make_shaped_spec(sections=200 * scale, assigns=0,
+                                               strings=20, string_len=400),
+    "pieces":   lambda scale: make_spec(pieces=500 * scale),
+}
+
+
+if __name__ == '__main__':
+    import sys
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    sys.stdout.write(make_spec(pieces=n))
@@ -2,20 +2,40 @@
 """
 compiler.py
 
-Compilador de archivos .brik a formato .json
+Compilador de archivos .brik a formato .json (o binario .brikc)
 
 Uso:
     python compiler.py specs/snake.brik
     python compiler.py specs/tetris.brik
     python compiler.py --all
+    python compiler.py --format bin specs/snake.brik
+    python compiler.py --all -j 4 [--force]
+    python compiler.py --watch specs/
 
-Genera archivos .json en la misma carpeta que el .brik
+Genera archivos .json (o .brikc con --format bin) en la misma carpeta
+que el .brik
 """
 from __future__ import print_function
 
 import sys
 import os
 import json
+import hashlib
+import multiprocessing
+import time
+import timeit
+from collections import OrderedDict
+
+try:
+    from cStringIO import StringIO   # Python 2.7
+except ImportError:
+    from io import StringIO
+
+try:
+    # Opcional: con inotify_simple (Linux) --watch no necesita sondear
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = None
 
 # Agregar el directorio actual al path para imports correctos
 if os.path.dirname(__file__):
@@ -23,59 +43,210 @@ if os.path.dirname(__file__):
 
 from dsl.brik_parser import parse_file
 from dsl.symbols import build_symbol_table
+from dsl import artifact
+
+# Formatos de salida soportados -> extensión del archivo generado
+OUTPUT_FORMATS = {
+    "json": ".json",
+    "bin": ".brikc",
+}
+
+
+def output_path_for(brik_path, fmt="json"):
+    """Ruta del archivo que genera compile_brik_to_json para ese formato."""
+    return os.path.splitext(brik_path)[0] + OUTPUT_FORMATS[fmt]
+
+
+# Datos de cada compilación que dependen de la máquina (mtime del fuente,
+# tiempo de compilación): van a <carpeta>/.brikcache/<artefacto>.build y
+# no al artefacto, que solo cambia si cambia el fuente.
+BUILD_DIRNAME = ".brikcache"
 
 
-def compile_brik_to_json(brik_path):
+def source_stamp(brik_path):
     """
-    Compila un archivo .brik a .json
-    
-    Args:
-        brik_path: Ruta al archivo .brik
-    
-    Returns:
-        Ruta del archivo .json generado
+    Sello del .brik: tamaño, mtime y sha1 del contenido. El artefacto
+    guarda solo el sha1 (source_sha1); el sello completo va al archivo
+    de build (ver build_info_path). compile_all los compara para saltar
+    archivos al día.
+    """
+    st = os.stat(brik_path)
+    with open(brik_path, 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    return {"size": st.st_size, "mtime": st.st_mtime, "sha1": digest}
+
+
+def build_info_path(out_path):
+    """Archivo de build (sello completo y ms de compilación) de un artefacto."""
+    return os.path.join(os.path.dirname(out_path) or ".", BUILD_DIRNAME,
+                        os.path.basename(out_path) + ".build")
+
+
+def read_artifact_info(out_path, fmt="json"):
+    """
+    Devuelve el sha1 del fuente guardado en un artefacto ya generado, o
+    None si no existe o no lo tiene.
+    """
+    if not os.path.exists(out_path):
+        return None
+    try:
+        if fmt == "bin":
+            with open(out_path, 'rb') as f:
+                data = artifact.read_meta(f)
+        else:
+            with open(out_path) as f:
+                data = json.load(f)
+    except (IOError, OSError, ValueError, artifact.ArtifactError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    return data.get("source_sha1")
+
+
+def read_build_info(out_path):
+    """Contenido del archivo de build de out_path, o {} si no hay."""
+    try:
+        with open(build_info_path(out_path)) as f:
+            info = json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+    return info if isinstance(info, dict) else {}
+
+
+def _write_build_info(out_path, stamp, compile_ms):
+    """Guarda el archivo de build; si falla solo se pierde el atajo."""
+    path = build_info_path(out_path)
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            json.dump({"source_stamp": stamp, "compile_ms": compile_ms}, f)
+    except (IOError, OSError):
+        pass
+
+
+def is_up_to_date(brik_path, fmt="json"):
+    """
+    Indica si el artefacto de brik_path corresponde al fuente actual.
+    Devuelve (al_día, ms de la última compilación o None). Si el archivo
+    de build tiene el mismo tamaño y mtime del fuente (y el mismo sha1
+    que el artefacto) no se lee el fuente; si no (p. ej. un checkout
+    nuevo o un "touch") decide el sha1 del fuente.
+    """
+    out_path = output_path_for(brik_path, fmt)
+    digest = read_artifact_info(out_path, fmt)
+    if digest is None:
+        return False, None
+    info = read_build_info(out_path)
+    stamp = info.get("source_stamp")
+    compile_ms = info.get("compile_ms")
+    st = os.stat(brik_path)
+    if (isinstance(stamp, dict) and stamp.get("sha1") == digest and
+            stamp.get("size") == st.st_size and stamp.get("mtime") == st.st_mtime):
+        return True, compile_ms
+    return digest == source_stamp(brik_path)["sha1"], compile_ms
+
+
+def _compile(brik_path, fmt):
+    """
+    Compila brik_path y devuelve (ruta generada, ms de compilación), o
+    (None, None) si falló. Los mensajes salen por stdout.
     """
     if not os.path.exists(brik_path):
         print("ERROR: Archivo no encontrado: %s" % brik_path)
-        return None
+        return None, None
     
     print("Compilando: %s" % brik_path)
     
     try:
-        # Parsear el archivo .brik
-        ast = parse_file(brik_path)
-        
-        # Construir tabla de símbolos
-        symbols = build_symbol_table(ast)
-        
-        # Crear estructura completa para JSON (incluye AST y símbolos)
-        compiled_data = {
-            "source_file": os.path.basename(brik_path),
-            "ast": ast,
-            "symbols": symbols
-        }
-        
-        # Determinar nombre del archivo de salida
-        base_name = os.path.splitext(brik_path)[0]
-        json_path = base_name + ".json"
-        
-        # Escribir JSON
-        with open(json_path, 'w') as f:
-            json.dump(compiled_data, f, indent=2, ensure_ascii=False)
+        out_path = output_path_for(brik_path, fmt)
+        stamp = source_stamp(brik_path)
+        t0 = timeit.default_timer()
+
+        if fmt == "bin":
+            # Solo símbolos; las matrices numéricas como PackedMatrix
+            ast = parse_file(brik_path, mode='buffer', iterative=True, packed=True)
+            symbols = build_symbol_table(ast)
+            compile_ms = round((timeit.default_timer() - t0) * 1000.0, 3)
+            with open(out_path, 'wb') as f:
+                artifact.dump_symbols(symbols, f, {
+                    "source_file": os.path.basename(brik_path),
+                    "source_sha1": stamp["sha1"],
+                })
+        else:
+            # Parsear el archivo .brik
+            ast = parse_file(brik_path)
+            
+            # Construir tabla de símbolos
+            symbols = build_symbol_table(ast)
+            compile_ms = round((timeit.default_timer() - t0) * 1000.0, 3)
+            
+            # Crear estructura completa para JSON (incluye AST y símbolos)
+            # (sin datos de la máquina: el .json solo cambia si cambia el
+            # fuente; ver BUILD_DIRNAME)
+            compiled_data = OrderedDict([
+                ("source_file", os.path.basename(brik_path)),
+                ("source_sha1", stamp["sha1"]),
+                ("ast", ast),
+                ("symbols", symbols),
+            ])
+            
+            # Escribir JSON
+            with open(out_path, 'w') as f:
+                json.dump(compiled_data, f, indent=2, ensure_ascii=False,
+                          separators=(',', ': '))
         
-        print("  -> Generado: %s" % json_path)
-        print("  -> Tamaño: %d bytes" % os.path.getsize(json_path))
+        _write_build_info(out_path, stamp, compile_ms)
+
+        print("  -> Generado: %s" % out_path)
+        print("  -> Tamaño: %d bytes" % os.path.getsize(out_path))
+        print("  -> Tiempo: %.1f ms" % compile_ms)
         
-        return json_path
+        return out_path, compile_ms
         
     except Exception as e:
         print("ERROR al compilar %s: %s" % (brik_path, str(e)))
-        return None
+        return None, None
+
+
+def compile_brik_to_json(brik_path, fmt="json"):
+    """
+    Compila un archivo .brik a .json
+    
+    Args:
+        brik_path: Ruta al archivo .brik
+        fmt: "json" (AST + símbolos, legible) o "bin" (artefacto .brikc
+             compacto: solo símbolos y matrices empaquetadas, ver
+             dsl/artifact.py)
+    
+    Returns:
+        Ruta del archivo generado
+    """
+    return _compile(brik_path, fmt)[0]
+
+
+def _compile_worker(job):
+    """
+    Tarea de un proceso del pool de compile_all: compila capturando la
+    salida para que el proceso principal la imprima en orden.
+    """
+    brik_path, fmt = job
+    saved = sys.stdout
+    sys.stdout = buf = StringIO()
+    try:
+        out_path, compile_ms = _compile(brik_path, fmt)
+    finally:
+        sys.stdout = saved
+    return out_path, compile_ms, buf.getvalue()
 
 
-def compile_all():
+def compile_all(fmt="json", force=False, jobs=1):
     """
     Compila todos los archivos .brik en la carpeta specs/
+
+    Es incremental: se saltan los .brik cuyo artefacto ya corresponde al
+    fuente (ver is_up_to_date), salvo con force=True. Con jobs > 1 los
+    archivos a reconstruir se reparten en un pool de procesos.
     """
     specs_dir = "specs"
     
@@ -83,7 +254,7 @@ def compile_all():
         print("ERROR: No se encuentra la carpeta %s" % specs_dir)
         return
     
-    brik_files = [f for f in os.listdir(specs_dir) if f.endswith('.brik')]
+    brik_files = sorted(f for f in os.listdir(specs_dir) if f.endswith('.brik'))
     
     if not brik_files:
         print("No se encontraron archivos .brik en %s" % specs_dir)
@@ -93,54 +264,271 @@ def compile_all():
     print("Compilando archivos .brik")
     print("=" * 60)
     
-    compiled_count = 0
+    t_start = timeit.default_timer()
+    stale = []
+    skipped_ms = 0.0
     for brik_file in brik_files:
         brik_path = os.path.join(specs_dir, brik_file)
-        json_path = compile_brik_to_json(brik_path)
-        if json_path:
-            compiled_count += 1
+        if not force:
+            fresh, compile_ms = is_up_to_date(brik_path, fmt)
+            if fresh:
+                print("Sin cambios: %s" % brik_path)
+                skipped_ms += compile_ms or 0.0
+                continue
+        stale.append(brik_path)
+    skipped = len(brik_files) - len(stale)
+    if skipped:
         print()
+
+    jobs = max(1, min(jobs, len(stale)))
+    compiled_count = 0
+    rebuilt_ms = 0.0
+    if jobs > 1:
+        pool = multiprocessing.Pool(jobs)
+        try:
+            # imap conserva el orden: la salida queda igual que en serie
+            results = pool.imap(_compile_worker, [(p, fmt) for p in stale])
+            for out_path, compile_ms, text in results:
+                sys.stdout.write(text)
+                if out_path:
+                    compiled_count += 1
+                    rebuilt_ms += compile_ms
+                print()
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for brik_path in stale:
+            out_path, compile_ms = _compile(brik_path, fmt)
+            if out_path:
+                compiled_count += 1
+                rebuilt_ms += compile_ms
+            print()
+    wall_ms = (timeit.default_timer() - t_start) * 1000.0
     
     print("=" * 60)
-    print("Compilación completada: %d/%d archivos" % (compiled_count, len(brik_files)))
+    print("Compilación completada: %d/%d archivos" % (compiled_count + skipped, len(brik_files)))
+    print("  Reconstruidos: %d | Sin cambios: %d | Errores: %d" % (
+        compiled_count, skipped, len(stale) - compiled_count))
+    print("  Tiempo total: %.1f ms | compilación sumada: %.1f ms (%d proceso%s)" % (
+        wall_ms, rebuilt_ms, jobs, "" if jobs == 1 else "s"))
+    # Lo ahorrado por los saltos sale del tiempo guardado en cada artefacto
+    print("  Ahorrado por archivos sin cambios: %.1f ms" % skipped_ms)
     print("=" * 60)
 
 
+# ----------------------------------------------------------------------
+# Modo watch: recompila los .brik de una carpeta a medida que cambian
+# ----------------------------------------------------------------------
+
+WATCH_INTERVAL = 0.25    # segundos entre revisiones (sondeo)
+WATCH_DEBOUNCE = 0.30    # segundos sin cambios antes de recompilar
+
+
+class _PollWatcher(object):
+    """
+    Detecta cambios comparando (tamaño, mtime) de cada .brik en cada
+    revisión. Funciona en cualquier sistema.
+    """
+    name = "sondeo"
+
+    def __init__(self, specs_dir):
+        self.specs_dir = specs_dir
+        self.seen = self._scan()
+
+    def _scan(self):
+        state = {}
+        for name in os.listdir(self.specs_dir):
+            if name.endswith('.brik'):
+                path = os.path.join(self.specs_dir, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue    # borrado entre listdir y stat
+                state[path] = (st.st_size, st.st_mtime)
+        return state
+
+    def wait(self, timeout):
+        """Espera hasta 'timeout' segundos y devuelve los .brik modificados."""
+        time.sleep(timeout)
+        state = self._scan()
+        changed = set(p for p, info in state.items() if self.seen.get(p) != info)
+        self.seen = state
+        return changed
+
+    def close(self):
+        pass
+
+
+class _InotifyWatcher(object):
+    """Igual que _PollWatcher pero despierta con eventos de inotify."""
+    name = "inotify"
+
+    def __init__(self, specs_dir):
+        self.specs_dir = specs_dir
+        self.inotify = INotify()
+        self.inotify.add_watch(specs_dir, inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO)
+
+    def wait(self, timeout):
+        changed = set()
+        for event in self.inotify.read(timeout=int(timeout * 1000)):
+            if event.name.endswith('.brik'):
+                changed.add(os.path.join(self.specs_dir, event.name))
+        return changed
+
+    def close(self):
+        self.inotify.close()
+
+
+def watch(specs_dir, fmt="json", interval=WATCH_INTERVAL, debounce=WATCH_DEBOUNCE):
+    """
+    Vigila specs_dir y recompila con compile_brik_to_json cada .brik que
+    cambie. Los guardados en ráfaga (editores que escriben varias veces)
+    se agrupan: un archivo se recompila cuando pasan 'debounce' segundos
+    sin cambios nuevos. Si el contenido es idéntico al último compilado
+    (mismo sha1) no se recompila. Termina con Ctrl+C.
+    """
+    if not os.path.isdir(specs_dir):
+        print("ERROR: No se encuentra la carpeta %s" % specs_dir)
+        return
+
+    watcher = _InotifyWatcher(specs_dir) if INotify is not None else _PollWatcher(specs_dir)
+
+    # Estado en memoria: sha1 del último contenido compilado de cada .brik
+    compiled = {}
+    for name in sorted(os.listdir(specs_dir)):
+        if not name.endswith('.brik'):
+            continue
+        path = os.path.join(specs_dir, name)
+        fresh = is_up_to_date(path, fmt)[0]
+        if not fresh and not compile_brik_to_json(path, fmt):
+            continue
+        compiled[path] = source_stamp(path)["sha1"]
+
+    print("Vigilando %s (%s, %d archivos). Ctrl+C para salir." % (
+        specs_dir, watcher.name, len(compiled)))
+
+    pending = {}    # ruta -> (primer cambio, último cambio)
+    try:
+        while True:
+            timeout = debounce if pending else interval
+            now = timeit.default_timer()
+            for path in watcher.wait(timeout):
+                first = pending.get(path, (now, now))[0]
+                pending[path] = (first, timeit.default_timer())
+
+            now = timeit.default_timer()
+            for path in sorted(pending):
+                first, last = pending[path]
+                if now - last < debounce:
+                    continue
+                del pending[path]
+                if not os.path.exists(path):
+                    compiled.pop(path, None)
+                    continue
+                digest = source_stamp(path)["sha1"]
+                if compiled.get(path) == digest:
+                    continue
+                out_path, compile_ms = _compile(path, fmt)
+                if out_path:
+                    compiled[path] = digest
+                    print("  -> Latencia: %.1f ms desde el primer cambio" % (
+                        (timeit.default_timer() - first) * 1000.0))
+    except KeyboardInterrupt:
+        print()
+        print("Watch terminado.")
+    finally:
+        watcher.close()
+
+
 def show_usage():
     """
     Muestra información de uso del compilador
     """
     print("Uso:")
-    print("  python compiler.py <archivo.brik>     - Compila un archivo específico")
-    print("  python compiler.py --all              - Compila todos los .brik en specs/")
-    print("  python compiler.py --help             - Muestra esta ayuda")
+    print("  python compiler.py [opciones] <archivo.brik> - Compila un archivo específico")
+    print("  python compiler.py [opciones] --all          - Compila todos los .brik en specs/")
+    print("  python compiler.py [opciones] --watch <dir>  - Recompila los .brik de <dir> al guardarlos")
+    print("  python compiler.py --help                    - Muestra esta ayuda")
+    print()
+    print("Opciones:")
+    print("  --format json|bin   json (por defecto): AST + símbolos legibles")
+    print("                      bin: artefacto .brikc compacto (solo símbolos)")
+    print("  -j N                con --all: compila en N procesos (0 = todos los CPUs)")
+    print("  --force             con --all: recompila aunque el artefacto esté al día")
     print()
     print("Ejemplos:")
     print("  python compiler.py specs/snake.brik")
     print("  python compiler.py specs/tetris.brik")
     print("  python compiler.py --all")
+    print("  python compiler.py --format bin --all")
+    print("  python compiler.py --all -j 4")
+    print("  python compiler.py --watch specs/")
 
 
 def main():
     """
     Punto de entrada principal del compilador
     """
-    if len(sys.argv) < 2:
+    args = sys.argv[1:]
+    if not args:
         show_usage()
         sys.exit(1)
-    
-    arg = sys.argv[1]
-    
-    if arg in ("--help", "-h"):
+
+    if args[0] in ("--help", "-h"):
         show_usage()
         sys.exit(0)
-    
-    if arg == "--all":
-        compile_all()
+
+    fmt = "json"
+    force = False
+    jobs = 1
+    watch_dir = None
+    target = None
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "--force":
+            force = True
+            i += 1
+            continue
+        if arg == "-j":
+            if i + 1 >= len(args) or not args[i + 1].isdigit():
+                print("ERROR: -j espera un número de procesos")
+                sys.exit(1)
+            jobs = int(args[i + 1]) or multiprocessing.cpu_count()
+            i += 2
+            continue
+        if arg == "--watch":
+            if i + 1 >= len(args):
+                print("ERROR: --watch espera una carpeta")
+                sys.exit(1)
+            watch_dir = args[i + 1]
+            i += 2
+            continue
+        if arg == "--format":
+            if i + 1 >= len(args) or args[i + 1] not in OUTPUT_FORMATS:
+                print("ERROR: --format espera uno de: %s" % ", ".join(sorted(OUTPUT_FORMATS)))
+                sys.exit(1)
+            fmt = args[i + 1]
+            i += 2
+            continue
+        target = arg
+        i += 1
+
+    if watch_dir is not None:
+        watch(watch_dir, fmt)
+        return
+
+    if target is None:
+        show_usage()
+        sys.exit(1)
+
+    if target == "--all":
+        compile_all(fmt, force=force, jobs=jobs)
     else:
         # Compilar archivo específico
-        brik_path = arg
-        compile_brik_to_json(brik_path)
+        brik_path = target
+        compile_brik_to_json(brik_path, fmt)
 
 
 if __name__ == "__main__":
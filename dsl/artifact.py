@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+artifact.py
+
+Formato binario compacto para tablas de símbolos compiladas (.brikc).
+
+A diferencia del .json de compiler.py guarda SOLO la tabla de símbolos
+(sin el AST) y las matrices numéricas como bloques de bytes, así que
+cargarlo es leer una cabecera y recorrer las entradas con struct.
+
+Todos los enteros son little-endian:
+
+    cabecera  'BRKC' | u16 versión | u16 reservado
+              u32 largo_meta | meta (JSON utf-8: source_file, ...)
+              u32 cantidad de entradas
+    entrada   u16 largo_clave | clave utf-8 | valor
+    valor     u8 tag + datos:
+                T_TRUE / T_FALSE   (sin datos)
+                T_INT              i64
+                T_FLOAT            f64
+                T_STR              u32 largo | utf-8
+                T_LIST             u32 n | n valores
+                T_MATRIX           u32 filas | u32 columnas | u8 ancho
+                                   (1 = u8, 8 = i64) | filas*columnas celdas
+"""
+from __future__ import print_function
+
+import json
+import struct
+import sys
+from array import array
+
+try:
+    from dsl.packed import PackedMatrix
+except ImportError:
+    from packed import PackedMatrix
+
+MAGIC = b'BRKC'
+VERSION = 1
+
+T_TRUE = 1
+T_FALSE = 2
+T_INT = 3
+T_FLOAT = 4
+T_STR = 5
+T_LIST = 6
+T_MATRIX = 7
+
+_HEADER = struct.Struct('<4sHHI')
+_U8 = struct.Struct('<B')
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_I64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+_MATRIX = struct.Struct('<IIB')
+
+_PY2 = sys.version_info[0] == 2
+_LITTLE = sys.byteorder == 'little'
+
+try:
+    _INT_TYPES = (int, long)        # Python 2.7
+except NameError:
+    _INT_TYPES = (int,)
+_TEXT_TYPES = (bytes, type(u''))
+
+
+class ArtifactError(Exception):
+    pass
+
+
+def _encode_text(s):
+    if isinstance(s, bytes):
+        return s            # Python 2: str ya está en utf-8
+    return s.encode('utf-8')
+
+
+def _decode_text(b):
+    if _PY2:
+        return bytes(b)     # mantenemos str (bytes) como el resto del código
+    return bytes(b).decode('utf-8')
+
+
+def _array_bytes(arr):
+    if not _LITTLE:
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tostring() if _PY2 else arr.tobytes()
+
+
+# ----------------------------------------------------------------------
+# Escritura
+# ----------------------------------------------------------------------
+
+def _write_value(out, value):
+    if value is True:
+        out.append(_U8.pack(T_TRUE))
+    elif value is False:
+        out.append(_U8.pack(T_FALSE))
+    elif isinstance(value, PackedMatrix):
+        if value.data.typecode == 'B':
+            width = 1
+            raw = _array_bytes(value.data)
+        else:
+            width = 8
+            raw = struct.pack('<%dq' % len(value.data), *value.data)
+        out.append(_U8.pack(T_MATRIX))
+        out.append(_MATRIX.pack(value.rows, value.cols, width))
+        out.append(raw)
+    elif isinstance(value, float):
+        out.append(_U8.pack(T_FLOAT))
+        out.append(_F64.pack(value))
+    elif isinstance(value, _INT_TYPES):
+        out.append(_U8.pack(T_INT))
+        out.append(_I64.pack(value))
+    elif isinstance(value, list):
+        out.append(_U8.pack(T_LIST))
+        out.append(_U32.pack(len(value)))
+        for item in value:
+            _write_value(out, item)
+    elif isinstance(value, _TEXT_TYPES):
+        data = _encode_text(value)
+        out.append(_U8.pack(T_STR))
+        out.append(_U32.pack(len(data)))
+        out.append(data)
+    else:
+        raise ArtifactError("Tipo no soportado en la tabla de símbolos: %r" % (value,))
+
+
+def dump_symbols(symbols, fileobj, meta=None):
+    """
+    Escribe 'symbols' (dict plano clave -> valor) en 'fileobj' (binario).
+    'meta' es un dict pequeño serializable a JSON que se guarda en la
+    cabecera (por ejemplo {"source_file": "snake.brik"}).
+    """
+    meta_bytes = json.dumps(meta or {}, sort_keys=True).encode('utf-8')
+    out = [_HEADER.pack(MAGIC, VERSION, 0, len(meta_bytes)), meta_bytes,
+           _U32.pack(len(symbols))]
+    for key in sorted(symbols):
+        data = _encode_text(key)
+        out.append(_U16.pack(len(data)))
+        out.append(data)
+        _write_value(out, symbols[key])
+    fileobj.write(b''.join(out))
+
+
+# ----------------------------------------------------------------------
+# Lectura
+# ----------------------------------------------------------------------
+
+def read_header(data):
+    """
+    Valida la cabecera de 'data' (bytes o mmap) y devuelve
+    (meta, offset de la cantidad de entradas).
+    """
+    if len(data) < _HEADER.size:
+        raise ArtifactError("Archivo demasiado corto para ser un .brikc")
+    magic, version, _, meta_len = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ArtifactError("No es un artefacto .brikc (magic %r)" % (magic,))
+    if version != VERSION:
+        raise ArtifactError("Versión de .brikc no soportada: %d" % version)
+    off = _HEADER.size
+    raw = _take(data, off, meta_len)
+    try:
+        meta = json.loads(raw.decode('utf-8'))
+    except ValueError as e:
+        # UnicodeDecodeError y los errores de json son ValueError
+        raise ArtifactError("Meta del .brikc corrupto: %s" % e)
+    return meta, off + meta_len
+
+
+def read_meta(fileobj):
+    """
+    Lee solo la cabecera y el meta de un .brikc abierto en modo binario,
+    sin tocar las entradas (compiler.py lo usa para saber si el artefacto
+    está al día).
+    """
+    head = fileobj.read(_HEADER.size)
+    if len(head) < _HEADER.size:
+        raise ArtifactError("Archivo demasiado corto para ser un .brikc")
+    meta_len = _HEADER.unpack(head)[3]
+    return read_header(head + fileobj.read(meta_len))[0]
+
+
+def _take(data, off, n):
+    """data[off:off + n] como bytes; ArtifactError si el archivo es más corto."""
+    if off + n > len(data):
+        raise ArtifactError("Artefacto truncado: faltan %d bytes en el offset %d"
+                            % (off + n - len(data), off))
+    return bytes(data[off:off + n])
+
+
+def _check_count(data, off, count):
+    """Cada entrada ocupa al menos un byte: una cantidad mayor es corrupción."""
+    if count > len(data) - off:
+        raise ArtifactError("Cantidad %d imposible en el offset %d" % (count, off - 4))
+
+
+def _read_value(data, off):
+    tag = data[off:off + 1]
+    tag = ord(tag)
+    off += 1
+    if tag == T_INT:
+        return _I64.unpack_from(data, off)[0], off + 8
+    if tag == T_STR:
+        n = _U32.unpack_from(data, off)[0]
+        off += 4
+        return _decode_text(_take(data, off, n)), off + n
+    if tag == T_MATRIX:
+        rows, cols, width = _MATRIX.unpack_from(data, off)
+        off += _MATRIX.size
+        if width not in (1, 8):
+            raise ArtifactError("Ancho de matriz inválido %d en el offset %d" % (width, off - 1))
+        n = rows * cols
+        raw = _take(data, off, n * width)
+        if width == 1:
+            values = array('B')
+            if _PY2:
+                values.fromstring(raw)
+            else:
+                values.frombytes(raw)
+        else:
+            values = array('l', struct.unpack('<%dq' % n, raw))
+        return PackedMatrix(rows, cols, values), off + n * width
+    if tag == T_LIST:
+        n = _U32.unpack_from(data, off)[0]
+        off += 4
+        _check_count(data, off, n)
+        items = []
+        for _ in range(n):
+            item, off = _read_value(data, off)
+            items.append(item)
+        return items, off
+    if tag == T_TRUE:
+        return True, off
+    if tag == T_FALSE:
+        return False, off
+    if tag == T_FLOAT:
+        return _F64.unpack_from(data, off)[0], off + 8
+    raise ArtifactError("Tag desconocido %d en el offset %d" % (tag, off - 1))
+
+
+def load_symbols(data):
+    """
+    Decodifica un artefacto completo. 'data' puede ser bytes o un mmap
+    (solo se usan slices y struct.unpack_from). Devuelve (meta, symbols).
+    """
+    meta, off = read_header(data)
+    symbols = {}
+    try:
+        count = _U32.unpack_from(data, off)[0]
+        off += 4
+        _check_count(data, off, count)
+        for _ in range(count):
+            n = _U16.unpack_from(data, off)[0]
+            off += 2
+            key = _decode_text(_take(data, off, n))
+            off += n
+            symbols[key], off = _read_value(data, off)
+    except (struct.error, TypeError, ValueError) as e:
+        # ValueError: utf-8 inválido en una clave o un texto
+        raise ArtifactError("Artefacto truncado o corrupto: %s" % e)
+    return meta, symbols
@@ -1,12 +1,16 @@
 # -*- coding: utf-8 -*-
 from __future__ import print_function
 
+from collections import deque
+
 try:
     # Intento import relativo (Python 2.7 desde fuera del módulo)
     from dsl import lexer
+    from dsl.packed import scan_matrix
 except ImportError:
     # Fallback a import directo (Python 2.7 desde dentro del módulo)
     import lexer
+    from packed import scan_matrix
 
 class ParseError(Exception):
     def __init__(self, message, token):
@@ -22,8 +26,16 @@ class ParseError(Exception):
         )
 
 class Parser(object):
-    def __init__(self, tokens):
+    # Con packed=True las listas de listas rectangulares de enteros se
+    # devuelven como packed.PackedMatrix (ver _parse_list).
+    packed = False
+
+    def __init__(self, tokens, packed=False):
+        # 'tokens' puede ser una lista de Token o un lexer.TokenBuffer:
+        # solo se usa indexación y len().
         self.tokens = tokens
+        self.packed = packed
+        self._ntokens = len(tokens)
         self.pos = 0
         self.current = tokens[0]
 
@@ -32,7 +44,7 @@ class Parser(object):
     def _advance(self):
         tok = self.current
         self.pos += 1
-        if self.pos < len(self.tokens):
+        if self.pos < self._ntokens:
             self.current = self.tokens[self.pos]
         else:
             self.current = self.tokens[-1]
@@ -54,7 +66,7 @@ class Parser(object):
 
     def _peek_type(self, offset):
         idx = self.pos + offset
-        if 0 <= idx < len(self.tokens):
+        if 0 <= idx < self._ntokens:
             return self.tokens[idx].type
         return 'EOF'
 
@@ -77,13 +89,13 @@ class Parser(object):
             # Si quieres ser estricto:
             # if ver_kw.value != 'version':
             #     raise ParseError("Expected 'version' keyword", ver_kw)
-            result['kind'] = kind_tok.value
-            result['version'] = self._convert_number(ver_tok.value)
+            self._assign(result, 'kind', kind_tok.value)
+            self._assign(result, 'version', self._convert_number(ver_tok.value))
 
         # game "nombre" { ... }
         self._expect_ident('game')
         name_tok = self._expect('STRING')
-        result['name'] = name_tok.value
+        self._assign(result, 'name', name_tok.value)
 
         self._expect('{')
         self._parse_section_body(result)
@@ -110,19 +122,31 @@ class Parser(object):
                 self._advance()
                 value = self._parse_expr()
                 self._expect(';')
-                container[name] = value
+                self._assign(container, name, value)
 
             elif self.current.type == '{':
                 # Subsección
                 self._advance()
-                sub = {}
+                sub = self._open_section(container, name)
                 self._parse_section_body(sub)
                 self._expect('}')
-                container[name] = sub
+                self._close_section(container, name, sub)
 
             else:
                 raise ParseError('Expected "=" or "{" after identifier', self.current)
 
+    # Qué hacer con cada asignación/subsección reconocida. Parser arma el
+    # diccionario anidado; EventParser los redefine para emitir eventos.
+
+    def _assign(self, container, name, value):
+        container[name] = value
+
+    def _open_section(self, container, name):
+        return {}
+
+    def _close_section(self, container, name, sub):
+        container[name] = sub
+
     # ---------- Expresiones ----------
 
     def _parse_expr(self):
@@ -163,6 +187,8 @@ class Parser(object):
 
     def _parse_list(self):
         # current == '['
+        if self.packed and self._try_packed():
+            return self._packed_result
         self._expect('[')
         items = []
         if self.current.type != ']':
@@ -173,6 +199,20 @@ class Parser(object):
         self._expect(']')
         return items
 
+    def _try_packed(self):
+        """
+        Camino rápido para matrices numéricas (current == '['). Si la lista
+        es una matriz rectangular de enteros la consume, deja el
+        PackedMatrix en self._packed_result y devuelve True.
+        """
+        found = scan_matrix(self.tokens, self.pos)
+        if found is None:
+            return False
+        self._packed_result, pos = found
+        self.pos = pos
+        self.current = self.tokens[pos]
+        return True
+
     def _convert_number(self, text):
         if '.' in text:
             try:
@@ -185,21 +225,271 @@ class Parser(object):
             return text
 
 
+# ---------- Parser sin recursión (pila explícita) ----------
+
+class IterativeParser(Parser):
+    """
+    Misma gramática, mismos resultados y mismos ParseError que Parser,
+    pero sin recursión: las subsecciones y las listas anidadas se manejan
+    con pilas explícitas. Acepta cualquier profundidad de anidamiento
+    (no depende del límite de recursión de Python) y evita varios frames
+    por elemento en las matrices grandes.
+    """
+
+    def _parse_section_body(self, container):
+        # Cada entrada: (diccionario en construcción, su nombre en el padre)
+        stack = [(container, None)]
+        while True:
+            tok = self.current
+            ttype = tok.type
+
+            if ttype == '}' or ttype == 'EOF':
+                if len(stack) == 1:
+                    # El '}' del nivel raíz lo consume parse_file
+                    return
+                sub, name = stack.pop()
+                self._expect('}')
+                self._close_section(stack[-1][0], name, sub)
+                continue
+
+            if ttype != 'IDENT':
+                raise ParseError("Expected identifier in section body", tok)
+            self._advance()
+            name = tok.value
+
+            if self.current.type == '=':
+                # Asignación
+                self._advance()
+                value = self._parse_expr()
+                self._expect(';')
+                self._assign(stack[-1][0], name, value)
+
+            elif self.current.type == '{':
+                # Subsección: se apila y se sigue en el mismo bucle
+                self._advance()
+                stack.append((self._open_section(stack[-1][0], name), name))
+
+            else:
+                raise ParseError('Expected "=" or "{" after identifier', self.current)
+
+    def _parse_list(self):
+        """
+        list ::= '[' ( expr ( ',' expr )* )? ']'
+
+        Recorre los tokens con variables locales (pos/cur) y resuelve en
+        línea los casos frecuentes ('[', ']', ',' y NUMBER); para el resto
+        sincroniza self.pos/self.current y delega en _parse_expr, que
+        nunca recibe un '[' y por lo tanto no recursa.
+        """
+        if self.packed and self._try_packed():
+            return self._packed_result
+        self._expect('[')
+        tokens = self.tokens
+        last = self._ntokens - 1
+        packed = self.packed
+        pos = self.pos
+        cur = self.current
+
+        stack = []            # listas padre pendientes de cerrar
+        items = []
+        need_item = cur.type != ']'
+
+        while True:
+            if need_item:
+                ttype = cur.type
+                if ttype == '[':
+                    found = packed and scan_matrix(tokens, pos)
+                    if not found:
+                        # Abre una lista anidada
+                        pos += 1
+                        cur = tokens[pos] if pos <= last else tokens[-1]
+                        stack.append(items)
+                        items = []
+                        need_item = cur.type != ']'
+                        continue
+                    matrix, pos = found
+                    cur = tokens[pos]
+                    items.append(matrix)
+                elif ttype == 'NUMBER':
+                    items.append(self._convert_number(cur.value))
+                    pos += 1
+                    cur = tokens[pos] if pos <= last else tokens[-1]
+                else:
+                    self.pos = pos
+                    self.current = cur
+                    items.append(self._parse_expr())
+                    pos = self.pos
+                    cur = self.current
+
+                if cur.type == ',':
+                    pos += 1
+                    cur = tokens[pos] if pos <= last else tokens[-1]
+                    continue
+
+            # Cierre de la lista actual
+            if cur.type != ']':
+                self.pos = pos
+                self.current = cur
+                self._expect(']')
+            pos += 1
+            cur = tokens[pos] if pos <= last else tokens[-1]
+            if not stack:
+                self.pos = pos
+                self.current = cur
+                return items
+            parent = stack.pop()
+            parent.append(items)
+            items = parent
+
+            # Tras cerrar una lista anidada, el padre sigue con ',' o ']'
+            if cur.type == ',':
+                pos += 1
+                cur = tokens[pos] if pos <= last else tokens[-1]
+                need_item = True
+            else:
+                need_item = False
+
+
+# ---------- Parser por eventos (estilo SAX) ----------
+
+class ParseHandler(object):
+    """
+    Receptor de eventos de EventParser. Los métodos por defecto no hacen
+    nada; basta con redefinir los que interesen.
+
+    La cabecera y el nombre del juego llegan como asignaciones del nivel
+    raíz ('kind', 'version', 'name'), igual que las claves que pone
+    Parser.parse_file en el diccionario resultado.
+    """
+
+    def on_section_start(self, name):
+        pass
+
+    def on_assign(self, name, value):
+        pass
+
+    def on_section_end(self, name):
+        pass
+
+
+class DictBuilder(ParseHandler):
+    """
+    Handler que reconstruye el mismo diccionario que parse_text().
+    Útil para verificar que ambos caminos son equivalentes.
+    """
+
+    def __init__(self):
+        self.result = {}
+        self._stack = [self.result]
+
+    def on_section_start(self, name):
+        self._stack.append({})
+
+    def on_assign(self, name, value):
+        self._stack[-1][name] = value
+
+    def on_section_end(self, name):
+        sub = self._stack.pop()
+        self._stack[-1][name] = sub
+
+
+class EventParser(Parser):
+    """
+    Misma gramática que Parser, pero en lugar de construir el diccionario
+    completo emite eventos a un ParseHandler a medida que avanza.
+
+    'tokens' puede ser cualquier iterable de Token terminado en EOF (por
+    ejemplo lexer.iter_tokens(f)); solo se guardan los pocos tokens de
+    lookahead que necesita la cabecera, así que la memoria no depende del
+    tamaño del archivo (salvo el valor de cada asignación individual).
+    """
+
+    def __init__(self, tokens, handler):
+        self.handler = handler
+        self._iter = iter(tokens)
+        self._lookahead = deque()
+        self._last = None
+        self.pos = 0
+        self.current = self._pull()
+
+    def _pull(self):
+        if self._lookahead:
+            return self._lookahead.popleft()
+        for tok in self._iter:
+            self._last = tok
+            return tok
+        # Pasado el final seguimos devolviendo el último token (EOF),
+        # igual que Parser._advance.
+        return self._last
+
+    def _advance(self):
+        tok = self.current
+        self.pos += 1
+        self.current = self._pull()
+        return tok
+
+    def _peek_type(self, offset):
+        if offset == 0:
+            return self.current.type
+        while len(self._lookahead) < offset:
+            tok = next(self._iter, None)
+            if tok is None:
+                return 'EOF'
+            self._last = tok
+            self._lookahead.append(tok)
+        return self._lookahead[offset - 1].type
+
+    def _assign(self, container, name, value):
+        self.handler.on_assign(name, value)
+
+    def _open_section(self, container, name):
+        self.handler.on_section_start(name)
+        return None
+
+    def _close_section(self, container, name, sub):
+        self.handler.on_section_end(name)
+
+    def parse(self):
+        """Recorre todo el archivo emitiendo eventos al handler."""
+        Parser.parse_file(self)
+        return self.handler
+
+
 # ---------- Funciones de conveniencia ----------
 
-def parse_text(text):
-    tokens = lexer.tokenize(text)
-    p = Parser(tokens)
+def parse_text(text, mode='classic', iterative=False, packed=False):
+    """
+    Analiza el texto de un .brik y devuelve el diccionario anidado.
+    'mode' elige el lexer (ver lexer.tokenize): 'classic', 'fast' o
+    'buffer' (el Parser recorre directamente el TokenBuffer).
+    Con iterative=True se usa IterativeParser (sin recursión).
+    Con packed=True las matrices numéricas se devuelven como PackedMatrix.
+    """
+    tokens = lexer.tokenize(text, mode)
+    if iterative:
+        p = IterativeParser(tokens, packed)
+    else:
+        p = Parser(tokens, packed)
     return p.parse_file()
 
 
-def parse_file(path):
+def parse_stream(fileobj, handler, chunk_size=65536):
+    """
+    Analiza un archivo abierto por bloques y emite eventos a 'handler'
+    (ver ParseHandler), sin cargar el archivo ni el AST completos.
+    """
+    tokens = lexer.iter_tokens(fileobj, chunk_size)
+    return EventParser(tokens, handler).parse()
+
+
+def parse_file(path, **options):
+    """Lee 'path' y lo analiza con parse_text(text, **options)."""
     f = open(path, 'r')
     try:
         text = f.read()
     finally:
         f.close()
-    return parse_text(text)
+    return parse_text(text, **options)
 
 
 if __name__ == '__main__':
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 from __future__ import print_function
 
+import re
+from array import array
+
 class Token(object):
     __slots__ = ('type', 'value', 'line', 'col')
 
@@ -18,10 +21,33 @@ class LexError(Exception):
     pass
 
 
-def tokenize(text):
+def tokenize(text, mode='classic'):
     """
     Convierte el contenido de un archivo .brik en una lista de tokens.
 
+    mode:
+        - 'classic': escáner carácter a carácter (sin regex), la
+          implementación de referencia.
+        - 'fast': escáner basado en un patrón maestro precompilado
+          (ver tokenize_fast). Produce exactamente los mismos tokens.
+          Solo gana en archivos chicos (los specs); en los grandes domina
+          crear un Token por lexema y rinde como 'classic'.
+        - 'buffer': mismo escáner, pero devuelve un TokenBuffer compacto
+          (columnas array('i')) que se indexa como la lista de tokens.
+    """
+    if mode == 'fast':
+        return tokenize_fast(text)
+    if mode == 'buffer':
+        return tokenize_buffer(text)
+    if mode != 'classic':
+        raise ValueError("Modo de lexer desconocido: %r" % (mode,))
+    return _tokenize_classic(text)
+
+
+def _tokenize_classic(text):
+    """
+    Implementación de referencia: recorre el texto carácter a carácter.
+
     No usa regex ni librerías externas para mantener el código pequeño
     y fácilmente portable a Python 2.7.
     """
@@ -134,6 +160,273 @@ def tokenize(text):
     return tokens
 
 
+# ----------------------------------------------------------------------
+# Escáner rápido: un patrón maestro precompilado + tabla de despacho por
+# clase de carácter. El motor de regex (en C) separa todos los lexemas de
+# una vez y el tipo de token se decide con un solo lookup en _CHAR_KIND
+# sobre el primer carácter, en lugar de avanzar carácter a carácter.
+# ----------------------------------------------------------------------
+
+# Cada match es (espacios_previos, lexema). La última alternativa captura
+# cualquier carácter inválido para poder reportarlo con su posición.
+_MASTER_RE = re.compile(r"""
+    ([ \t\r]*)
+    (   [{}\[\]=;,\n]
+      | [0-9]+(?:\.[0-9]*)?
+      | [A-Za-z_][A-Za-z0-9_]*
+      | "[^"\n]*"
+      | \#[0-9a-fA-F]*
+      | //[^\n]*
+      | [^ \t\r]
+    )
+""", re.VERBOSE)
+
+# Primer carácter -> tipo de token, para los lexemas que se copian tal cual.
+_CHAR_KIND = {}
+for _ch in '{}[]=;,':
+    _CHAR_KIND[_ch] = _ch
+for _ch in '0123456789':
+    _CHAR_KIND[_ch] = 'NUMBER'
+for _ch in 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_':
+    _CHAR_KIND[_ch] = 'IDENT'
+del _ch
+
+
+def _scan_fast(text, tokens, line=1):
+    """
+    Agrega a 'tokens' los tokens de 'text' (sin EOF) y devuelve la
+    última línea alcanzada.
+
+    'line' permite escanear un fragmento que empieza en otra línea; el
+    fragmento debe empezar al inicio de una línea.
+    """
+    append = tokens.append
+    kind_of = _CHAR_KIND.get
+    col = 1
+    for ws, lex in _MASTER_RE.findall(text):
+        col += len(ws)
+        kind = kind_of(lex[0])
+        if kind is not None:
+            append(Token(kind, lex, line, col))
+            col += len(lex)
+            continue
+
+        ch = lex[0]
+        if ch == '\n':
+            line += 1
+            col = 1
+        elif ch == '"':
+            if len(lex) == 1:
+                raise LexError("Unterminated string at line %d" % line)
+            append(Token('STRING', lex[1:-1], line, col))
+            col += len(lex)
+        elif ch == '#':
+            if len(lex) == 1:
+                raise LexError("Invalid color literal at line %d, col %d" % (line, col))
+            append(Token('COLOR', lex, line, col))
+            col += len(lex)
+        elif lex[:2] == '//':
+            col += len(lex)
+        else:
+            raise LexError("Unexpected character %r at line %d, col %d"
+                           % (ch, line, col))
+    return line
+
+
+def tokenize_fast(text):
+    """
+    Igual que tokenize(text, mode='classic') pero usando el patrón maestro.
+
+    Identificadores y números se reconocen en ASCII, tal como los define
+    la gramática (bnf/*.bnf).
+    """
+    tokens = []
+    line = _scan_fast(text, tokens)
+    # El EOF queda en la columna siguiente al último carácter de la
+    # última línea, igual que en el escáner clásico.
+    tokens.append(Token('EOF', '', line, len(text) - text.rfind('\n')))
+    return tokens
+
+
+def iter_tokens(fileobj, chunk_size=65536):
+    """
+    Generador de tokens que lee 'fileobj' por bloques de 'chunk_size'.
+
+    Ningún token cruza un salto de línea (los strings no pueden
+    contenerlo y los comentarios terminan en él), así que cada bloque se
+    corta en su último salto de línea y el resto se arrastra al siguiente.
+    La memoria usada queda acotada por chunk_size más la línea más larga
+    del archivo.
+    Termina con el mismo token EOF que tokenize().
+    """
+    line = 1
+    pending = ''
+    tokens = []
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        pending += chunk
+        cut = pending.rfind('\n')
+        if cut < 0:
+            continue
+        line = _scan_fast(pending[:cut + 1], tokens, line)
+        pending = pending[cut + 1:]
+        for tok in tokens:
+            yield tok
+        del tokens[:]
+
+    line = _scan_fast(pending, tokens, line)
+    for tok in tokens:
+        yield tok
+    yield Token('EOF', '', line, len(pending) + 1)
+
+
+# ----------------------------------------------------------------------
+# Representación compacta: columnas paralelas array('i') sobre el texto
+# ----------------------------------------------------------------------
+
+# Códigos de tipo de token guardados en TokenBuffer.types
+TOKEN_TYPES = ('IDENT', 'NUMBER', 'STRING', 'COLOR',
+               '{', '}', '[', ']', '=', ';', ',', 'EOF')
+_TYPE_CODE = dict((name, code) for code, name in enumerate(TOKEN_TYPES))
+_STRING = _TYPE_CODE['STRING']
+_COLOR = _TYPE_CODE['COLOR']
+_EOF = _TYPE_CODE['EOF']
+
+_CHAR_CODE = dict((ch, _TYPE_CODE[kind]) for ch, kind in _CHAR_KIND.items())
+
+
+class TokenBuffer(object):
+    """
+    Secuencia de tokens guardada en columnas paralelas array('i'):
+    tipo (código en TOKEN_TYPES), inicio y fin del lexema en el texto
+    original y número de línea. No crea un objeto por token: el valor se
+    recorta del texto y la columna se calcula con el índice de inicios de
+    línea solo cuando se piden.
+
+    buf[i] devuelve un Token equivalente al de tokenize(), de modo que
+    Parser puede recorrer el buffer igual que una lista de tokens.
+    """
+    __slots__ = ('text', 'types', 'starts', 'ends', 'lines', 'line_starts')
+
+    def __init__(self, text):
+        self.text = text
+        self.types = array('i')
+        self.starts = array('i')
+        self.ends = array('i')
+        self.lines = array('i')
+        self.line_starts = array('i', [0])   # offset de inicio de cada línea
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self.types)
+        code = self.types[i]
+        start = self.starts[i]
+        line = self.lines[i]
+        if code == _STRING:
+            value = self.text[start + 1:self.ends[i] - 1]
+        else:
+            value = self.text[start:self.ends[i]]
+        return Token(TOKEN_TYPES[code], value, line,
+                     start - self.line_starts[line - 1] + 1)
+
+    def __iter__(self):
+        for i in range(len(self.types)):
+            yield self[i]
+
+    def type(self, i):
+        return TOKEN_TYPES[self.types[i]]
+
+    def value(self, i):
+        code = self.types[i]
+        if code == _STRING:
+            return self.text[self.starts[i] + 1:self.ends[i] - 1]
+        return self.text[self.starts[i]:self.ends[i]]
+
+    def col(self, i):
+        return self.starts[i] - self.line_starts[self.lines[i] - 1] + 1
+
+
+# Tamaño aproximado (en caracteres) de cada bloque que escanea tokenize_buffer
+_BUFFER_BLOCK = 1 << 16
+
+
+def tokenize_buffer(text):
+    """
+    Escanea 'text' con el patrón maestro y devuelve un TokenBuffer.
+    Lanza los mismos LexError que tokenize().
+    """
+    buf = TokenBuffer(text)
+    add_type = buf.types.append
+    add_start = buf.starts.append
+    add_end = buf.ends.append
+    add_line = buf.lines.append
+    code_of = _CHAR_CODE.get
+    add_line_start = buf.line_starts.append
+    findall = _MASTER_RE.findall
+    line = 1
+    line_start = 0
+    pos = 0
+    # findall por bloques cortados en un salto de línea: evita tanto el
+    # costo por match de finditer como materializar de una vez la lista
+    # con todos los lexemas, que es justo lo que el buffer quiere evitar.
+    n = len(text)
+    block = 0
+    while block < n:
+        cut = text.rfind('\n', block, block + _BUFFER_BLOCK)
+        cut = n if cut < 0 or block + _BUFFER_BLOCK >= n else cut + 1
+        for ws, lex in findall(text, block, cut):
+            pos += len(ws)
+            code = code_of(lex[0])
+            if code is not None:
+                add_type(code)
+                add_start(pos)
+                pos += len(lex)
+                add_end(pos)
+                add_line(line)
+                continue
+            ch = lex[0]
+            if ch == '\n':
+                pos += 1
+                line += 1
+                line_start = pos
+                add_line_start(pos)
+                continue
+            elif ch == '"':
+                if len(lex) == 1:
+                    raise LexError("Unterminated string at line %d" % line)
+                code = _STRING
+            elif ch == '#':
+                if len(lex) == 1:
+                    raise LexError("Invalid color literal at line %d, col %d"
+                                   % (line, pos - line_start + 1))
+                code = _COLOR
+            elif lex[:2] == '//':
+                pos += len(lex)
+                continue
+            else:
+                raise LexError("Unexpected character %r at line %d, col %d"
+                               % (ch, line, pos - line_start + 1))
+            add_type(code)
+            add_start(pos)
+            pos += len(lex)
+            add_end(pos)
+            add_line(line)
+        # Espacios al final del bloque que findall no devolvió
+        pos = cut
+        block = cut
+
+    add_type(_EOF)
+    add_start(n)
+    add_end(n)
+    add_line(line)
+    return buf
+
+
 if __name__ == '__main__':
     import sys
     if len(sys.argv) != 2:
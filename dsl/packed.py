@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+packed.py
+
+Matrices numéricas compactas para el parser del DSL.
+
+La mayor parte de los bytes de los specs son matrices 0/1 (rotaciones
+de piezas de Tetris, level.grid de Snake). Con Parser(..., packed=True)
+toda lista de listas rectangular de enteros se devuelve como un
+PackedMatrix: un único array con los valores fila por fila más su forma,
+en lugar de una lista de listas de ints.
+"""
+from __future__ import print_function
+
+import re
+from array import array
+
+try:
+    from dsl.lexer import TokenBuffer, TOKEN_TYPES
+except ImportError:
+    from lexer import TokenBuffer, TOKEN_TYPES
+
+
+class PackedMatrix(object):
+    """
+    Matriz rows x cols guardada en un array plano (fila por fila).
+
+    Se comporta como una lista de filas: len(m), m[y][x], for row in m.
+    Cada fila es un array (slice de los datos), no una lista.
+    """
+    __slots__ = ('rows', 'cols', 'data')
+
+    def __init__(self, rows, cols, data):
+        self.rows = rows
+        self.cols = cols
+        self.data = data
+
+    @property
+    def shape(self):
+        return (self.rows, self.cols)
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, y):
+        if y < 0:
+            y += self.rows
+        if not 0 <= y < self.rows:
+            raise IndexError("PackedMatrix row index out of range")
+        start = y * self.cols
+        return self.data[start:start + self.cols]
+
+    def __iter__(self):
+        for y in range(self.rows):
+            yield self[y]
+
+    def get(self, x, y):
+        return self.data[y * self.cols + x]
+
+    def iter_nonzero(self):
+        """Genera (x, y) de cada celda distinta de 0, fila por fila."""
+        cols = self.cols
+        for i, v in enumerate(self.data):
+            if v:
+                yield (i % cols, i // cols)
+
+    def tolist(self):
+        return [list(row) for row in self]
+
+    def __eq__(self, other):
+        if isinstance(other, PackedMatrix):
+            return (self.rows == other.rows and self.cols == other.cols and
+                    list(self.data) == list(other.data))
+        if isinstance(other, list):
+            return self.tolist() == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return (self.rows, self.cols, self.data)
+
+    def __setstate__(self, state):
+        self.rows, self.cols, self.data = state
+
+    def __repr__(self):
+        return "PackedMatrix(%d, %d, %r)" % (self.rows, self.cols, self.data.typecode)
+
+
+def _pack(rows, cols, values):
+    """Elige el typecode más chico posible para los valores."""
+    if values and 0 <= min(values) and max(values) <= 255:
+        return PackedMatrix(rows, cols, array('B', values))
+    return PackedMatrix(rows, cols, values)
+
+
+def scan_matrix(tokens, pos):
+    """
+    Intenta leer una matriz rectangular de enteros empezando en
+    tokens[pos] (que debe ser '['): '[' fila (',' fila)* ']', con
+    fila ::= '[' NUMBER (',' NUMBER)* ']'.
+
+    Devuelve (PackedMatrix, posición siguiente) o None si la lista no
+    tiene esa forma (floats, filas de distinto largo, anidamiento más
+    profundo, errores de sintaxis...). En ese caso no consume nada y el
+    parser sigue por el camino general, que reporta los errores.
+    """
+    if isinstance(tokens, TokenBuffer):
+        return _scan_matrix_buffer(tokens, pos)
+
+    values = array('l')
+    add = values.append
+    rows = 0
+    cols = -1
+    i = pos + 1
+    try:
+        while True:
+            if tokens[i].type != '[':
+                return None
+            i += 1
+            count = 0
+            while True:
+                tok = tokens[i]
+                if tok.type != 'NUMBER':
+                    return None
+                add(int(tok.value))
+                count += 1
+                ttype = tokens[i + 1].type
+                i += 2
+                if ttype == ']':
+                    break
+                if ttype != ',':
+                    return None
+            if cols < 0:
+                cols = count
+            elif count != cols:
+                return None
+            rows += 1
+            ttype = tokens[i].type
+            i += 1
+            if ttype == ']':
+                return _pack(rows, cols, values), i
+            if ttype != ',':
+                return None
+    except (ValueError, OverflowError):
+        # '1.5', '1.' o enteros que no caben en un long
+        return None
+
+
+_LBRACK = TOKEN_TYPES.index('[')
+_RBRACK = TOKEN_TYPES.index(']')
+_COMMA = TOKEN_TYPES.index(',')
+_NUMBER = TOKEN_TYPES.index('NUMBER')
+
+
+# Texto entre '[' y ']' de una fila de enteros: "1, 0,1" (con espacios y
+# saltos de línea, sin comentarios ni decimales).
+_ROW_RE = re.compile(r'[0-9]+(?:[ \t\r\n]*,[ \t\r\n]*[0-9]+)*\Z')
+
+
+def _scan_matrix_buffer(buf, pos):
+    """
+    Igual que scan_matrix pero leyendo directamente las columnas del
+    TokenBuffer: ninguna celda se convierte en objeto Token.
+
+    La primera fila se valida token por token para conocer el número de
+    columnas; en las siguientes basta con mirar que el ']' esté donde
+    corresponde y validar el texto de la fila con _ROW_RE, sin recorrer
+    sus tokens en Python. Los valores de cada fila se convierten de una
+    vez partiendo el texto por comas (int() ignora los espacios).
+    """
+    types = buf.types
+    starts = buf.starts
+    ends = buf.ends
+    text = buf.text
+    last = len(types) - 1
+    row_match = _ROW_RE.match
+    values = array('l')
+    extend = values.extend
+    rows = 0
+    cols = -1
+    i = pos + 1
+    try:
+        while True:
+            if types[i] != _LBRACK:
+                return None
+            i += 1
+            if cols < 0:
+                j = i
+                while True:
+                    if types[j] != _NUMBER:
+                        return None
+                    code = types[j + 1]
+                    if code == _RBRACK:
+                        j += 1
+                        break
+                    if code != _COMMA:
+                        return None
+                    j += 2
+                cols = (j - i + 1) // 2
+            else:
+                j = i + 2 * cols - 1
+                if j > last or types[j] != _RBRACK or types[i] != _NUMBER:
+                    return None
+            row_text = text[starts[i]:ends[j - 1]]
+            if row_match(row_text) is None:
+                return None
+            extend(map(int, row_text.split(',')))
+            rows += 1
+            i = j + 1
+            code = types[i]
+            i += 1
+            if code == _RBRACK:
+                if len(values) != rows * cols:
+                    return None
+                return _pack(rows, cols, values), i
+            if code != _COMMA:
+                return None
+    except (ValueError, OverflowError):
+        return None
+
+
+# ----------------------------------------------------------------------
+# Helpers para consumidores que aceptan listas de listas o PackedMatrix
+# ----------------------------------------------------------------------
+
+def matrix_shape(matrix):
+    """(filas, columnas) de la matriz; columnas = largo de la primera fila."""
+    if isinstance(matrix, PackedMatrix):
+        return matrix.shape
+    if not matrix:
+        return (0, 0)
+    return (len(matrix), len(matrix[0]))
+
+
+def iter_nonzero(matrix):
+    """Genera (x, y) de cada celda distinta de 0, fila por fila."""
+    if isinstance(matrix, PackedMatrix):
+        return matrix.iter_nonzero()
+    return ((x, y)
+            for y, row in enumerate(matrix)
+            for x, val in enumerate(row)
+            if val)
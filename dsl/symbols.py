@@ -7,18 +7,24 @@ def build_symbol_table(ast):
     Aplana el diccionario anidado (AST) en una tabla de símbolos:
     - claves tipo "board.width", "controls.right_mov"
     - valores: números, strings, bools, listas, etc.
+
+    Recorre el árbol con una pila explícita para no depender del límite
+    de recursión en secciones muy anidadas (ver IterativeParser).
     """
     table = {}
 
-    def visit(prefix, node):
+    stack = [([], ast)]
+    while stack:
+        prefix, node = stack.pop()
         # Si es un diccionario, seguimos bajando
         if isinstance(node, dict):
-            for key, value in node.items():
-                visit(prefix + [key], value)
+            # Al revés: la pila los saca en el orden del AST, como la
+            # versión recursiva
+            for key, value in reversed(list(node.items())):
+                stack.append((prefix + [key], value))
         else:
             # Hoja: construimos el nombre con puntos
             name = '.'.join(prefix)
             table[name] = node
 
-    visit([], ast)
     return table
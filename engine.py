@@ -1,7 +1,42 @@
 # -*- coding: utf-8 -*-
-import Tkinter as tk
-import tkFont
-import time
+from __future__ import print_function
+
+import math
+
+try:
+    import Tkinter as tk          # Python 2.7
+    import tkFont
+except ImportError:
+    try:
+        import tkinter as tk      # Python 3
+        from tkinter import font as tkFont
+    except ImportError:
+        # Sin Tk (servidor, CI): solo se puede usar headless.HeadlessEngine
+        tk = None
+        tkFont = None
+
+from perf import now_ms, RollingStats, FrameProfiler
+from render import (CanvasGrid, ImageGrid, TclBatch, BatchedCanvas,
+                    LAYERS, CELLS_LAYER, LAYER_TAG)
+
+# Backends de la grilla retenida (ver render.py). "auto" usa la imagen
+# desde IMAGE_BACKEND_MIN_CELLS celdas, donde un rectángulo de canvas por
+# celda ya es demasiado para Tk.
+BACKENDS = ("canvas", "image", "auto")
+IMAGE_BACKEND_MIN_CELLS = 4096
+
+# Tag del texto de tiempos (periodo de frame p50/p99) del panel de info
+TIMING_TAG = "timing_hud"
+
+# Textos fijos del panel de info (set_info_text): todos llevan
+# INFO_WIDGET_TAG, que clear() no borra, y WIDGET_TAG con su clave
+INFO_WIDGET_TAG = "info_widget"
+WIDGET_TAG = "widget_%s"
+
+# Tecla que muestra/oculta el perfil por fases en ese texto (no llega
+# al juego) y su fuente, de ancho fijo para alinear las columnas
+PROFILE_KEY = "F3"
+PROFILE_FONT = "Courier 9"
 
 
 class GameEngine(object):
@@ -11,7 +46,17 @@ class GameEngine(object):
                     height_px=480,
                     cell_size=20,
                     tick_ms=50,
-                    info_width_px=360):
+                    info_width_px=360,
+                    retained_grid=True,
+                    batch_tcl=True,
+                    backend="canvas",
+                    logic_ms=None,
+                    max_catchup_steps=5,
+                    show_timing=True,
+                    timing_log_ms=5000,
+                    event_driven=True,
+                    profile=False,
+                    profile_export=None):
 
         self.game_width_px = game_width_px
         self.height_px = height_px
@@ -26,10 +71,110 @@ class GameEngine(object):
         # Referencia al juego actual (objeto con on_key, update, draw)
         self._game = None
 
-        # Estado del loop
+        # Estado del loop. La lógica avanza en pasos fijos de logic_ms
+        # (por defecto tick_ms), independientes de cuándo se dibuja: si un
+        # frame llega tarde se ejecutan varios pasos seguidos, como mucho
+        # max_catchup_steps (el resto se descarta).
         self._running = False
-        self._last_time_ms = None
+        self.logic_ms = logic_ms or tick_ms
+        self.max_catchup_steps = max_catchup_steps
+        self._last_loop_ms = None       # inicio del _loop anterior (now_ms)
+        self._next_frame_ms = None      # cuándo debería empezar el próximo
+        self._logic_accum_ms = 0.0      # tiempo de lógica pendiente
+
+        # Loop por eventos: si el juego implementa next_due_ms(), el motor
+        # no se despierta cada tick_ms sino cuando el juego tiene algo que
+        # hacer o llega una tecla. Si next_due_ms() devuelve None el motor
+        # queda inactivo (sin after pendiente) hasta la próxima tecla.
+        self.event_driven = event_driven
+        self._after_id = None           # after() pendiente del loop
+        self._due_at_ms = None          # cuándo vence el próximo paso (None = inactivo)
+        # Retraso entre que vence un paso del juego y se dibuja su frame
+        self.step_lag = RollingStats()
+
+        # Jitter: periodo real entre frames. Se muestra en el panel de
+        # info (show_timing) y se imprime cada timing_log_ms.
+        self.frame_period = RollingStats()
+        self.show_timing = show_timing
+        self.timing_log_ms = timing_log_ms
+        self._timing_shown_ms = None
+        self._timing_logged_ms = None
+        self._timing_item = None        # texto de tiempos en el panel
+        self.timing_stats = {
+            "logic_steps": 0,
+            "dropped_steps": 0,     # pasos descartados por el tope
+            "late_frames": 0,       # frames que empezaron después de lo previsto
+            "wakeups": 0,           # veces que corrió el loop
+            "idle": 0,              # veces que quedó inactivo esperando una tecla
+        }
+
+        # Perfil por fases (perf.FrameProfiler): tiempo de update, clear,
+        # draw y flush de cada frame, ítems vivos y frames tarde. Con
+        # profiler=None (por defecto) el loop no mide nada. PROFILE_KEY lo
+        # muestra en el panel (y lo activa si hace falta); profile_export
+        # es el .csv/.jsonl que se escribe al cerrar (stop).
+        self.profile = bool(profile or profile_export)
+        self.profile_export = profile_export
+        self.show_profile = False
+        self.profiler = None
+        self._profile_counts = None     # late/dropped al cerrar el último frame
+        if self.profile:
+            self._new_profiler()
+
+        # Grilla retenida (un ítem por celda, ver render.py). Con
+        # retained_grid=False se usa el dibujo anterior: borrar todo y
+        # crear un rectángulo por ladrillo en cada frame.
+        self.retained_grid = retained_grid
+        self.grid = None
+
+        # Cómo se dibuja la grilla retenida: "canvas" (un rectángulo por
+        # celda), "image" (una PhotoImage, para tableros grandes) o "auto"
+        if backend not in BACKENDS:
+            raise ValueError("Backend desconocido: %r (usa %s)" % (
+                backend, ", ".join(BACKENDS)))
+        self.backend = backend
+
+        # Lote de comandos Tcl del frame (ver render.TclBatch): con
+        # batch_tcl=True todo el dibujo de un frame llega a Tcl en una
+        # sola llamada a eval al final de render(). _game_target e
+        # _info_target son los canvas (o sus BatchedCanvas) donde dibujan
+        # draw_text, draw_rect, etc.
+        self.batch_tcl = batch_tcl
+        self.batch = None
+        self._game_target = None
+        self._info_target = None
+
+        # Capa en la que dibujan draw_brick/draw_text/... en este momento,
+        # capas a redibujar en el próximo frame y cuántos ítems de Tk
+        # tiene cada una
+        self._layer = "dynamic"
+        self._invalid = set(LAYERS)
+        self._layer_items = dict((name, 0) for name in LAYERS)
+        # game.state_version del último frame dibujado (ver render)
+        self._drawn_version = None
+        # Textos del panel creados con set_info_text: clave -> [x, y, texto]
+        self._widgets = {}
+
+        # Contadores de render: frames dibujados y salteados (sin cambios
+        # de estado), capas redibujadas, ítems creados y borrados (texto,
+        # líneas y, sin grilla, ladrillos) y celdas de la grilla
+        # actualizadas con itemconfig.
+        self.render_stats = {
+            "frames": 0,
+            "skipped": 0,
+            "layers_drawn": 0,
+            "items_created": 0,
+            "items_deleted": 0,
+            "cells_updated": 0,
+        }
 
+        self._build_window()
+        self._init_render()
+
+    def _build_window(self):
+        """Crea la ventana de Tk, los canvas, las fuentes y los eventos."""
+        if tk is None:
+            raise RuntimeError("Tkinter no está disponible; usa headless.HeadlessEngine")
         # ---------- Tkinter ----------
         self.root = tk.Tk()
         self.root.title("Brick Game Engine (Python 2.7)")
@@ -76,6 +221,44 @@ class GameEngine(object):
         # Asegurar que la ventana reciba el foco de teclado
         self.game_canvas.focus_set()
 
+    def _init_render(self):
+        """Crea el lote de comandos Tcl y la grilla retenida."""
+        self._game_target = self.game_canvas
+        self._info_target = self.info_canvas
+        # Solo los canvas de Tkinter (con intérprete de Tcl) admiten lote
+        if self.batch_tcl and hasattr(self.game_canvas, "tk"):
+            self.batch = TclBatch(self.game_canvas.tk)
+            self._game_target = BatchedCanvas(self.game_canvas, self.batch)
+            if self.info_canvas is not None:
+                self._info_target = BatchedCanvas(self.info_canvas, self.batch)
+
+        if not self.retained_grid:
+            return
+        if self.backend == "auto":
+            cells = self.grid_width * self.grid_height
+            if cells >= IMAGE_BACKEND_MIN_CELLS:
+                self.backend = "image"
+            else:
+                self.backend = "canvas"
+        if self.backend == "image":
+            self.grid = ImageGrid(
+                self.game_canvas,
+                self.grid_width,
+                self.grid_height,
+                self.cell_size,
+                layers=(CELLS_LAYER,) + LAYERS,
+                background="#000000"     # el bg del canvas de juego
+            )
+        else:
+            self.grid = CanvasGrid(
+                self.game_canvas,
+                self.grid_width,
+                self.grid_height,
+                self.cell_size,
+                layers=(CELLS_LAYER,) + LAYERS,
+                batch=self.batch
+            )
+
     # ------------------------------------------------------------------
     # API pública del motor
     # ------------------------------------------------------------------
@@ -87,8 +270,15 @@ class GameEngine(object):
             - on_key(keysym)
             - update(dt_ms)
             - draw(engine)
+
+        Opcionalmente puede dibujar por capas implementando
+        draw_layer(engine, name) (ver invalidate); en ese caso draw()
+        no se usa en el loop.
         """
+        if game is not self._game:
+            self.clear_info_widgets()
         self._game = game
+        self.invalidate()
 
     def start(self):
         """
@@ -98,17 +288,112 @@ class GameEngine(object):
             raise RuntimeError("No hay juego asignado. Usa set_game(...) antes de start().")
 
         self._running = True
-        self._last_time_ms = int(round(time.time() * 1000))
+        now = now_ms()
+        self._last_loop_ms = now
+        self._next_frame_ms = now + self.tick_ms
+        self._logic_accum_ms = 0.0
+        self._timing_shown_ms = self._timing_logged_ms = now
 
-        # Arranca el loop del motor
-        self.root.after(self.tick_ms, self._loop)
+        # Arranca el loop del motor (por eventos: primer frame enseguida)
+        if self._is_event_driven():
+            self._due_at_ms = now
+            self._after_id = self.root.after(0, self._loop)
+        else:
+            self._after_id = self.root.after(self.tick_ms, self._loop)
         self.root.mainloop()
 
+    def run_frame(self, dt_ms, keysym=None):
+        """
+        Ejecuta un frame completo: game.update(dt_ms) y render().
+        keysym es una tecla llegada al final de esos dt_ms: se pasa a
+        game.on_key después de update y antes de dibujar.
+        """
+        if self._game is None:
+            return
+
+        # Lógica
+        self._timed("update", self._update_game, dt_ms, keysym)
+
+        self.render()
+        if self.profiler is not None:
+            self._end_profile_frame(dt_ms)
+
+    def _update_game(self, dt_ms, keysym):
+        if hasattr(self._game, "update"):
+            self._game.update(dt_ms)
+        if keysym is not None and hasattr(self._game, "on_key"):
+            self._game.on_key(keysym)
+
+    def render(self):
+        """
+        Dibuja el frame y envía los cambios de la grilla a Tk.
+
+        Si el juego implementa draw_layer(engine, name) solo se borran y
+        redibujan las capas invalidadas desde el frame anterior (y si no
+        hay ninguna no se hace nada). Si solo tiene draw(engine), se
+        trata como la capa "dynamic" y se redibuja en cada frame, salvo
+        que el juego tenga state_version (ver games/base_game.py) y no
+        haya cambiado desde el último frame dibujado.
+
+        Después de las capas se llama a game.draw_widgets(engine), si
+        existe, para actualizar los textos de set_info_text: un cambio de
+        state_version sin capas invalidadas solo corre ese paso.
+        Devuelve True si se dibujó algo.
+        """
+        game = self._game
+        layered = hasattr(game, "draw_layer")
+        version = getattr(game, "state_version", None)
+        if not self._invalid:
+            if version is None:
+                unchanged = layered
+            else:
+                unchanged = version == self._drawn_version
+            if unchanged:
+                self.render_stats["skipped"] += 1
+                return False
+        self._drawn_version = version
+
+        if layered:
+            layers = [name for name in LAYERS if name in self._invalid]
+            self._invalid.clear()
+            for name in layers:
+                self._timed("clear", self.clear_layer, name)
+                self._layer = name
+                self._timed("draw", game.draw_layer, self, name)
+            self._layer = "dynamic"
+            if layers:
+                self._restack(layers[0])
+            self.render_stats["layers_drawn"] += len(layers)
+        else:
+            self._invalid.clear()
+            self._timed("clear", self.clear)
+            # draw() puede usar engine.game_canvas directamente: el
+            # borrado tiene que llegar a Tk antes que sus ítems
+            if self.batch is not None:
+                self._timed("clear", self.batch.flush)
+            if hasattr(game, "draw"):
+                self._timed("draw", game.draw, self)
+            self.render_stats["layers_drawn"] += 1
+        if hasattr(game, "draw_widgets"):
+            self._timed("draw", game.draw_widgets, self)
+        self._timed("flush", self._flush)
+        return True
+
+    def invalidate(self, *layers):
+        """
+        Marca capas para redibujar en el próximo frame (sin argumentos:
+        todas). Los juegos la llaman cuando cambia lo que dibuja cada
+        capa; por ejemplo "static" solo al empezar o reiniciar.
+        """
+        self._invalid.update(layers or LAYERS)
+
     def stop(self):
         """
-        Detiene el motor y cierra la ventana.
+        Detiene el motor y cierra la ventana (antes guarda el perfil si
+        se pidió profile_export).
         """
         self._running = False
+        self.export_profile()
         try:
             self.root.destroy()
         except tk.TclError:
@@ -123,30 +408,126 @@ class GameEngine(object):
         """
         Borra todo lo dibujado en el frame actual,
         tanto en el área de juego como en el panel de info (si existe).
+
+        Con la grilla retenida los rectángulos de las celdas NO se
+        borran: solo se vacían las capas (el próximo _flush oculta las
+        celdas que no se vuelvan a dibujar). Lo pintado con set_cell se
+        conserva.
         """
-        self.game_canvas.delete("all")
-        if self.info_canvas is not None:
-            self.info_canvas.delete("all")
+        if self.grid is not None:
+            for name in LAYERS:
+                self.grid.clear_layer(name)
+        # Expresión de tags de Tk: todo menos la grilla (y los textos
+        # fijos del panel)
+        self._game_target.delete("!" + CanvasGrid.TAG)
+        if self._info_target is not None:
+            self._info_target.delete("!" + INFO_WIDGET_TAG)
+
+        for name in LAYERS:
+            self.render_stats["items_deleted"] += self._layer_items[name]
+            self._layer_items[name] = 0
+
+    def clear_layer(self, name):
+        """Borra los ladrillos y los ítems de Tk de una capa."""
+        tag = LAYER_TAG % name
+        self._game_target.delete(tag)
+        if self._info_target is not None:
+            self._info_target.delete(tag)
+        if self.grid is not None:
+            self.grid.clear_layer(name)
+
+        self.render_stats["items_deleted"] += self._layer_items[name]
+        self._layer_items[name] = 0
+
+    def _restack(self, lowest):
+        """
+        Los ítems recién creados de una capa quedan encima de todo; se
+        vuelven a subir, en orden, los de las capas superiores a 'lowest'.
+        """
+        for name in LAYERS[LAYERS.index(lowest) + 1:]:
+            if self._layer_items[name]:
+                tag = LAYER_TAG % name
+                self._game_target.tag_raise(tag)
+                if self._info_target is not None:
+                    self._info_target.tag_raise(tag)
 
     def draw_brick(self, grid_x, grid_y, color="#00ff00"):
         """
         Dibuja un ladrillo en coordenadas de grilla (grid_x, grid_y)
-        sobre el área de juego.
+        sobre el área de juego, en la capa que se está dibujando (sigue
+        visible hasta que esa capa se borre).
 
         grid_x, grid_y: enteros entre 0 y grid_width/grid_height - 1.
         """
+        if self.grid is not None:
+            self.grid.set_cell(grid_x, grid_y, color, self._layer)
+            return
+        self._create_brick(grid_x, grid_y, color, (LAYER_TAG % self._layer,))
+        self._count_item()
+
+    def draw_bricks(self, cells, color="#00ff00"):
+        """
+        Igual que draw_brick para cada (grid_x, grid_y) de 'cells', todos
+        del mismo color (paredes, cuerpo de la serpiente, una pieza).
+        """
+        if self.grid is not None:
+            self.grid.set_cells(cells, color, self._layer)
+            return
+        tags = (LAYER_TAG % self._layer,)
+        for grid_x, grid_y in cells:
+            self._create_brick(grid_x, grid_y, color, tags)
+            self._count_item()
+
+    def set_cell(self, grid_x, grid_y, color):
+        """
+        Pinta la celda (grid_x, grid_y) de forma persistente, debajo de
+        todas las capas: queda visible en los frames siguientes sin
+        volver a dibujarla. color=None la borra.
+        """
+        if self.grid is not None:
+            self.grid.set_cell(grid_x, grid_y, color, CELLS_LAYER)
+            return
+        tag = "cell_%d_%d" % (grid_x, grid_y)
+        self._game_target.delete(tag)
+        if color is not None:
+            self._create_brick(grid_x, grid_y, color, (CanvasGrid.TAG, tag))
+            self._game_target.tag_lower(tag)
+
+    def _create_brick(self, grid_x, grid_y, color, tags):
+        """Dibujo sin grilla retenida: un rectángulo nuevo por ladrillo."""
         cs = self.cell_size
         x0 = grid_x * cs
         y0 = grid_y * cs
         x1 = x0 + cs
         y1 = y0 + cs
 
-        self.game_canvas.create_rectangle(
+        self._game_target.create_rectangle(
             x0, y0, x1, y1,
             fill=color,
-            outline="gray20"
+            outline="gray20",
+            tags=tags
         )
 
+    def _count_item(self):
+        self.render_stats["items_created"] += 1
+        self._layer_items[self._layer] += 1
+
+    def _flush(self):
+        """
+        Cierra el frame: aplica a Tk los cambios de la grilla y envía el
+        lote de comandos del frame (una sola llamada a Tcl).
+        """
+        if self.grid is not None:
+            self.render_stats["cells_updated"] += self.grid.flush()
+        if self.batch is not None:
+            self.batch.flush()
+        self.render_stats["frames"] += 1
+
+    def _canvas_for(self, where):
+        if where == "info" and self._info_target is not None:
+            return self._info_target
+        return self._game_target
+
     def draw_text(self, x_px, y_px, text,
                   where="game",
                   anchor="nw",
@@ -162,35 +543,88 @@ class GameEngine(object):
         font:
             - objeto tkFont.Font o None para usar la fuente por defecto.
         """
-        if where == "info" and self.info_canvas is not None:
-            canvas = self.info_canvas
-        else:
-            canvas = self.game_canvas
-
-        canvas.create_text(
+        self._canvas_for(where).create_text(
             x_px, y_px,
             fill="white",
             text=text,
             anchor=anchor,
-            font=font
+            font=font,
+            tags=(LAYER_TAG % self._layer,)
         )
+        self._count_item()
+
+    def set_info_text(self, key, x_px, y_px, text, anchor="nw", font=None):
+        """
+        Texto del panel de info identificado por 'key' (título, etiquetas,
+        puntaje, avisos). Se crea la primera vez y después solo se envía
+        a Tk lo que cambió (texto o posición); no pertenece a ninguna
+        capa, así que no se borra al redibujarlas. text="" lo oculta;
+        anchor y font se fijan al crearlo. Sin panel de info no hace nada.
+        """
+        if self._info_target is None:
+            return
+        widget = self._widgets.get(key)
+        tag = WIDGET_TAG % key
+        if widget is None:
+            self._info_target.create_text(
+                x_px, y_px,
+                fill="white",
+                text=text,
+                anchor=anchor,
+                font=font,
+                tags=(INFO_WIDGET_TAG, tag)
+            )
+            self._widgets[key] = [x_px, y_px, text]
+            self.render_stats["items_created"] += 1
+            return
+        if widget[2] != text:
+            self._info_target.itemconfig(tag, text=text)
+            widget[2] = text
+        if widget[0] != x_px or widget[1] != y_px:
+            self._info_target.coords(tag, x_px, y_px)
+            widget[0] = x_px
+            widget[1] = y_px
+
+    def clear_info_widgets(self):
+        """Borra todos los textos de set_info_text."""
+        if self._info_target is not None:
+            for key in self._widgets:
+                self._info_target.delete(WIDGET_TAG % key)
+        self.render_stats["items_deleted"] += len(self._widgets)
+        self._widgets.clear()
+
+    def draw_rect(self, x0_px, y0_px, x1_px, y1_px, fill,
+                  outline="gray30", where="info"):
+        """
+        Dibuja un rectángulo en coordenadas de píxeles (por ejemplo las
+        previews de piezas o los indicadores de portales del panel).
+        """
+        self._canvas_for(where).create_rectangle(
+            x0_px, y0_px, x1_px, y1_px,
+            fill=fill,
+            outline=outline,
+            tags=(LAYER_TAG % self._layer,)
+        )
+        self._count_item()
 
     def draw_hline(self, y_px, where="game"):
         """
         Dibuja una línea horizontal decorativa dentro del canvas indicado.
         """
-        if where == "info" and self.info_canvas is not None:
-            canvas = self.info_canvas
+        if where == "info" and self._info_target is not None:
+            canvas = self._info_target
             width_px = self.info_width_px
         else:
-            canvas = self.game_canvas
+            canvas = self._game_target
             width_px = self.game_width_px
 
         canvas.create_line(
             10, y_px,
             width_px - 10, y_px,
-            fill="gray40"
+            fill="gray40",
+            tags=(LAYER_TAG % self._layer,)
         )
+        self._count_item()
 
     # ------------------------------------------------------------------
     # Internos del loop y teclado
@@ -200,39 +634,259 @@ class GameEngine(object):
         """
         Callback de Tkinter: se llama cuando se presiona una tecla.
         Pasa event.keysym al juego (por ejemplo 'Left', 'Right', 'Up',
-        'Down', 'space', 'p', etc.).
+        'Down', 'space', 'p', etc.). PROFILE_KEY la usa el motor.
         """
-        if self._game is not None and hasattr(self._game, "on_key"):
+        if event.keysym == PROFILE_KEY:
+            self.toggle_profile()
+            return
+        if self._game is None or not hasattr(self._game, "on_key"):
+            return
+        if self._running and self._is_event_driven():
+            self._wake(event.keysym)
+        else:
             self._game.on_key(event.keysym)
 
-    def _loop(self):
+    def _is_event_driven(self):
+        return self.event_driven and hasattr(self._game, "next_due_ms")
+
+    def _wake(self, keysym):
+        """
+        Tecla en el loop por eventos: corre un frame ya (el juego avanza
+        hasta ahora, recibe la tecla y se dibuja) en vez de esperar al after.
+        """
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self._due_at_ms is None:
+            # Estaba inactivo: ese tiempo no cuenta para la lógica
+            self._last_loop_ms = now_ms()
+        self._loop(keysym)
+
+    def _loop(self, keysym=None):
         """
         Un paso del game loop:
-            - Calcula dt (milisegundos desde el frame anterior)
-            - Llama game.update(dt)
-            - Limpia pantalla
-            - Llama game.draw(engine)
-            - Programa el siguiente tick con root.after
+            - Mide el tiempo desde el frame anterior (reloj monotónico)
+            - Llama game.update(logic_ms) una vez por cada paso de lógica
+              pendiente (como mucho max_catchup_steps)
+            - Dibuja el frame (render)
+            - Programa el siguiente frame con root.after, descontando el
+              tiempo que tomó este (sin deriva acumulada)
         """
+        self._after_id = None
         if not self._running:
             return
 
-        now_ms = int(round(time.time() * 1000))
-        dt_ms = now_ms - self._last_time_ms
-        self._last_time_ms = now_ms
+        start = now_ms()
+        elapsed = start - self._last_loop_ms
+        self._last_loop_ms = start
+        self.timing_stats["wakeups"] += 1
 
-        if self._game is not None:
-            # Lógica
-            if hasattr(self._game, "update"):
-                self._game.update(dt_ms)
+        if self._is_event_driven():
+            self._event_frame(start, elapsed, keysym)
+            return
+
+        self.frame_period.add(elapsed)
+        self._timed("update", self._step_logic, elapsed)
+        self._report_timing(start)
+        self.render()
 
-            # Render
-            self.clear()
-            if hasattr(self._game, "draw"):
-                self._game.draw(self)
+        # El próximo frame se agenda respecto del horario previsto, no de
+        # "ahora": el tiempo de update/draw no se suma al periodo. Si ya
+        # estamos atrasados, se agenda lo antes posible.
+        self._next_frame_ms += self.tick_ms
+        end = now_ms()
+        if self._next_frame_ms < end:
+            self.timing_stats["late_frames"] += 1
+            self._next_frame_ms = end
+        if self.profiler is not None:
+            self._end_profile_frame(elapsed)
+        self._after_id = self.root.after(int(round(self._next_frame_ms - end)),
+                                         self._loop)
 
-        # Agenda el siguiente frame
-        self.root.after(self.tick_ms, self._loop)
+    def _event_frame(self, start, elapsed, keysym=None):
+        """
+        Frame del loop por eventos: avanza el juego el tiempo real
+        transcurrido, dibuja y agenda el próximo despertar para cuando
+        venza game.next_due_ms() (o ninguno si el juego está inactivo).
+        """
+        if keysym is None and self._due_at_ms is not None:
+            lag = max(0.0, start - self._due_at_ms)
+            self.step_lag.add(lag)
+            if lag > self.logic_ms:
+                # Se despertó más de un paso de lógica tarde
+                self.timing_stats["late_frames"] += 1
+
+        # Como en el loop fijo, tras un bloqueo largo no se recuperan más
+        # de max_catchup_steps pasos de lógica además del intervalo previsto
+        limit = self.max_catchup_steps * self.logic_ms
+        if self._due_at_ms is not None:
+            limit += self._due_at_ms - (start - elapsed)
+        if elapsed > limit:
+            self.timing_stats["dropped_steps"] += int((elapsed - limit) // self.logic_ms)
+            elapsed = limit
+        self._report_timing(start)
+        self.run_frame(elapsed, keysym)
+
+        due = self._game.next_due_ms()
+        if due is None:
+            self._due_at_ms = None
+            self.timing_stats["idle"] += 1
+            return
+        self._due_at_ms = start + due
+        delay = int(math.ceil(self._due_at_ms - now_ms()))
+        self._after_id = self.root.after(max(0, delay), self._loop)
+
+    def _step_logic(self, elapsed_ms):
+        """Ejecuta los pasos fijos de lógica que corresponden a elapsed_ms."""
+        game = self._game
+        step = self.logic_ms
+        self._logic_accum_ms += elapsed_ms
+        steps = 0
+        while self._logic_accum_ms >= step:
+            if steps == self.max_catchup_steps:
+                # Muy atrasados (ventana arrastrada, GC, ...): en vez de
+                # acelerar el juego para alcanzar, se descarta el resto
+                dropped = int(self._logic_accum_ms // step)
+                self.timing_stats["dropped_steps"] += dropped
+                self._logic_accum_ms -= dropped * step
+                break
+            if hasattr(game, "update"):
+                game.update(step)
+            self._logic_accum_ms -= step
+            steps += 1
+        self.timing_stats["logic_steps"] += steps
+
+    def timing_summary(self):
+        """
+        Texto con el periodo real entre frames (p50/p99) o, en el loop por
+        eventos, el retraso entre que vence un paso y se dibuja.
+        """
+        if self._is_event_driven():
+            p50, p99 = self.step_lag.percentiles(50, 99)
+            if p50 is None:
+                return "Retraso: sin datos"
+            return "Retraso p50 %.1f ms  p99 %.1f ms" % (p50, p99)
+        p50, p99 = self.frame_period.percentiles(50, 99)
+        if p50 is None:
+            return "Periodo: sin datos"
+        return "Periodo p50 %.1f ms  p99 %.1f ms (objetivo %d ms)" % (
+            p50, p99, self.tick_ms)
+
+    def _report_timing(self, now):
+        """Actualiza el texto de tiempos (1 vez por segundo) y el log."""
+        if (self.show_timing or self.show_profile) and \
+                now - self._timing_shown_ms >= 1000:
+            self._timing_shown_ms = now
+            self._update_timing_hud()
+
+        if self.timing_log_ms and now - self._timing_logged_ms >= self.timing_log_ms:
+            self._timing_logged_ms = now
+            print("[engine] %s | despertares %d, inactivo %d, pasos de lógica %d, "
+                  "descartados %d, frames tarde %d, dibujados %d, salteados %d" % (
+                      self.timing_summary(),
+                      self.timing_stats["wakeups"],
+                      self.timing_stats["idle"],
+                      self.timing_stats["logic_steps"],
+                      self.timing_stats["dropped_steps"],
+                      self.timing_stats["late_frames"],
+                      self.render_stats["frames"],
+                      self.render_stats["skipped"]))
+            if self.profiler is not None:
+                for line in self.profiler.summary_lines():
+                    print("[perf] %s" % line)
+
+    def _update_timing_hud(self):
+        """Texto de tiempos (y perfil, con show_profile) del panel de info."""
+        canvas = self.info_canvas
+        if canvas is None:
+            return
+        lines = []
+        if self.show_timing:
+            lines.append(self.timing_summary())
+        if self.show_profile and self.profiler is not None:
+            lines.extend(self.profiler.summary_lines() or ["Perfil: sin datos"])
+        # Directo al canvas (no al lote): un render sin capas
+        # invalidadas no envía el lote
+        if not self._timing_item:
+            if not lines:
+                return
+            self._timing_item = canvas.create_text(
+                10, self.height_px - 2,
+                anchor="sw",
+                fill="gray60",
+                font=self.font_hint,
+                tags=(INFO_WIDGET_TAG, TIMING_TAG)
+            )
+        canvas.itemconfig(TIMING_TAG, text="\n".join(lines),
+                          font=PROFILE_FONT if self.show_profile else self.font_hint)
+
+    # ------------------------------------------------------------------
+    # Perfil por fases
+    # ------------------------------------------------------------------
+
+    def _timed(self, phase, func, *args):
+        """func(*args), sumando su duración a 'phase' si hay profiler."""
+        profiler = self.profiler
+        if profiler is None:
+            return func(*args)
+        t0 = now_ms()
+        result = func(*args)
+        profiler.add(phase, now_ms() - t0)
+        return result
+
+    def _new_profiler(self):
+        self.profiler = FrameProfiler()
+        self._profile_counts = (self.timing_stats["late_frames"],
+                                self.timing_stats["dropped_steps"])
+
+    def _end_profile_frame(self, period_ms):
+        """Cierra el frame en el profiler con los frames tarde/pasos descartados nuevos."""
+        late, dropped = self._profile_counts
+        self._profile_counts = (self.timing_stats["late_frames"],
+                                self.timing_stats["dropped_steps"])
+        self.profiler.end_frame(now_ms(), period_ms, self.live_items(),
+                                self._profile_counts[0] - late,
+                                self._profile_counts[1] - dropped)
+
+    def live_items(self):
+        """
+        Ítems de Tk vivos en los dos canvas según la contabilidad del
+        motor: los de las capas, los de la grilla retenida, los textos del
+        panel y el de tiempos (las celdas de set_cell sin grilla no se
+        cuentan).
+        """
+        items = sum(self._layer_items.values()) + len(self._widgets)
+        if self.grid is not None:
+            items += self.grid.stats["items"]
+        if self._timing_item:
+            items += 1
+        return items
+
+    def toggle_profile(self):
+        """
+        Muestra u oculta el perfil en el panel de info (PROFILE_KEY). Si
+        el motor no se creó con profile, mostrarlo activa el profiler y
+        ocultarlo lo vuelve a apagar.
+        """
+        self.show_profile = not self.show_profile
+        if self.show_profile and self.profiler is None:
+            self._new_profiler()
+        elif not self.show_profile and not self.profile:
+            self.profiler = None
+        self._update_timing_hud()
+
+    def export_profile(self, path=None):
+        """
+        Guarda las filas del profiler en path (por defecto
+        profile_export): CSV si termina en .csv, si no JSONL. Devuelve
+        cuántos frames se escribieron.
+        """
+        path = path or self.profile_export
+        if self.profiler is None or not path:
+            return 0
+        count = self.profiler.export(path)
+        print("[engine] perfil de %d frames guardado en %s" % (count, path))
+        return count
 
 
 # ----------------------------------------------------------------------
@@ -259,6 +913,8 @@ class MovingBrickDemo(object):
 
         self.color = "#00ff00"  # Verde
         self.move_count = 0     # Para el puntaje y estadísticas
+        # Cambia con cada movimiento: el motor solo redibuja si cambió
+        self.state_version = 0
 
     def on_key(self, keysym):
         """
@@ -291,6 +947,7 @@ class MovingBrickDemo(object):
 
         if moved:
             self.move_count += 1
+            self.state_version += 1
 
     def update(self, dt_ms):
         """
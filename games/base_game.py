@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from render import LAYERS
+
 
 class BaseGame(object):
     """
@@ -8,11 +10,27 @@ class BaseGame(object):
       - on_key(keysym): manejar teclas (event.keysym de Tk)
       - update(dt_ms): actualizar lógica en función del tiempo (milisegundos)
       - draw(engine): dibujar en el engine (celdas, texto, etc.)
+
+    Opcionalmente puede dibujar por capas ("static", "board", "dynamic",
+    "overlay") implementando draw_layer(engine, name) y llamando a
+    invalidate(...) cuando cambia lo que dibuja cada capa: el motor solo
+    redibuja las capas invalidadas.
+
+    También opcional: next_due_ms(), los milisegundos hasta el próximo
+    cambio de estado que depende del tiempo (o None si nada cambiará
+    hasta la próxima tecla). Con él el motor duerme hasta entonces en
+    lugar de despertarse cada tick_ms; sin él se usa el tick fijo.
+
+    state_version cuenta los cambios de estado visibles: invalidate() y
+    mark_changed() lo incrementan y el motor no dibuja los frames en que
+    no cambió (los cuenta en render_stats["skipped"]). Un juego que solo
+    implementa draw(engine) y nunca lo incrementa se dibuja una vez.
     """
 
     def __init__(self, engine, symbols):
         self.engine = engine      # referencia al GameEngine
         self.symbols = symbols    # dict de la tabla de símbolos .brik
+        self.state_version = 0    # cambios de estado visibles
 
     def on_key(self, keysym):
         """Se llama cuando el usuario presiona una tecla."""
@@ -23,5 +41,19 @@ class BaseGame(object):
         pass
 
     def draw(self, engine):
-        """Se llama en cada frame para dibujar el juego."""
-        pass
+        """
+        Se llama en cada frame para dibujar el juego. Si el juego dibuja
+        por capas (draw_layer), por defecto dibuja todas en orden.
+        """
+        if hasattr(self, "draw_layer"):
+            for name in LAYERS:
+                self.draw_layer(engine, name)
+
+    def mark_changed(self):
+        """Marca que el estado visible cambió: el próximo frame se dibuja."""
+        self.state_version += 1
+
+    def invalidate(self, *layers):
+        """Pide al motor redibujar esas capas (sin argumentos: todas)."""
+        self.state_version += 1
+        self.engine.invalidate(*layers)
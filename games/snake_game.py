@@ -35,19 +35,77 @@ TABLA DE CONTENIDOS:
         - move_snake() - Movimiento
         - check_collisions() - Detección de colisiones
     7. Rendering (líneas 500-549)
-        - draw() - Dibuja todo el juego
-        - draw_board()
-        - draw_ui()
+        - draw_layer() - Dibuja una capa (static/board/dynamic)
+        - draw_widgets() - Textos del panel que cambian (puntaje, avisos)
+        - _draw_static(), _draw_portals(), _draw_snake(), _draw_status()
 
 ==========================================
 """
 from __future__ import print_function
 
+import heapq
 import random
+from collections import deque
 
+from dsl.packed import matrix_shape, iter_nonzero
 from games.base_game import BaseGame
 from runtime import sym_int, sym_str, sym_bool, sym_get
 
+# Tipos de celda de SnakeGame.cells (un byte por celda, índice
+# y * board_w + x). CELL_PORTAL es un bit aparte porque la snake puede
+# estar encima de un portal; CELL_KIND quita ese bit.
+CELL_EMPTY = 0
+CELL_WALL = 1
+CELL_BODY = 2
+CELL_FOOD = 3
+CELL_KIND = 3
+CELL_PORTAL = 4
+
+# Direcciones de la tabla de movimiento (SnakeGame._next): la entrada
+# idx * 4 + DIR_INDEX[(dx, dy)] es la celda a la que se llega desde idx.
+# NO_CELL indica que el paso sale del tablero (sin wrap).
+DIRS = ((1, 0), (-1, 0), (0, -1), (0, 1))
+DIR_INDEX = dict((d, i) for i, d in enumerate(DIRS))
+NO_CELL = -1
+
+
+class FreeCells(object):
+    """
+    Conjunto de celdas libres con elección al azar en O(1): una lista
+    densa de celdas y la posición de cada una en la lista. Para quitar
+    una celda se mueve la última al hueco (swap-remove).
+    """
+
+    def __init__(self, cells=()):
+        self._cells = list(cells)
+        self._pos = dict((cell, i) for i, cell in enumerate(self._cells))
+
+    def __len__(self):
+        return len(self._cells)
+
+    def __contains__(self, cell):
+        return cell in self._pos
+
+    def add(self, cell):
+        if cell not in self._pos:
+            self._pos[cell] = len(self._cells)
+            self._cells.append(cell)
+
+    def discard(self, cell):
+        i = self._pos.pop(cell, None)
+        if i is None:
+            return
+        last = self._cells.pop()
+        if i < len(self._cells):
+            self._cells[i] = last
+            self._pos[last] = i
+
+    def choice(self):
+        """Una celda libre al azar (módulo random), o None si no hay."""
+        if not self._cells:
+            return None
+        return self._cells[int(random.random() * len(self._cells))]
+
 
 class SnakeGame(BaseGame):
     """
@@ -111,11 +169,13 @@ class SnakeGame(BaseGame):
             symbols, 'rules_speed_progression.min_tick_ms', self.tick_ms_cfg
         )
 
-        # Reglas de aparición de manzanas (por ahora, muy sencillas)
+        # Reglas de aparición de manzanas: hasta max_apples a la vez y
+        # cada manzana comida reaparece apple_respawn_ticks pasos después
+        # (0: enseguida)
         self.apple_respawn_ticks = sym_int(
             symbols, 'rules_spawning.apple_respawn_ticks', 0
         )
-        self.max_apples = sym_int(symbols, 'rules_spawning.max_apples', 1)
+        self.max_apples = max(1, sym_int(symbols, 'rules_spawning.max_apples', 1))
 
         # ------------------------------------------------------------------
         # Paredes a partir de level.grid
@@ -160,10 +220,38 @@ class SnakeGame(BaseGame):
         self.apples_eaten = 0
         self._growth_pending = 0
 
-        # Snake y comida
-        self.snake = []
-        self.snake_set = set()
-        self.food = None
+        # Snake y comida. El cuerpo es una deque de índices de celda
+        # (y * board_w + x, cabeza en body[0]): agregar la cabeza y quitar
+        # la cola son O(1) aunque la serpiente sea muy larga. head() y
+        # snake_cells() dan las celdas como tuplas (x, y).
+        self.body = deque()
+
+        # Manzanas: índices de celda con comida (en la grilla son
+        # CELL_FOOD, así que comer sigue siendo la misma lectura en _step).
+        # _respawns es un heap con el paso en que reaparece cada manzana
+        # comida; _ticks cuenta los pasos de la snake.
+        self.apples = set()
+        self._respawns = []
+        self._ticks = 0
+
+        # Tipo de cada celda (CELL_*): un paso de la snake lee una sola
+        # celda en vez de consultar walls, portals y el cuerpo.
+        self.cells = bytearray(self.board_w * self.board_h)
+
+        # Nivel armado por _build_level: paredes y portales en
+        # _level_cells y la tabla de movimiento _next (vecino de cada
+        # celda en cada dirección con wrap, bordes y portales resueltos).
+        # Solo se rearma si cambian los portales (_level_dirty).
+        self._level_cells = bytearray()
+        self._next = []
+        self._level_dirty = True
+
+        # Celdas de piso de la zona jugable (sin paredes ni portales) y,
+        # de ellas, las libres (sin snake ni comida) para elegir dónde
+        # aparecen la cabeza y la comida. Se reconstruyen en
+        # _init_snake_and_food y _step mantiene las libres.
+        self._floor = set()
+        self._free = FreeCells()
         
         # ------------------ Portales ------------------
         self.portals = {}
@@ -288,6 +376,9 @@ class SnakeGame(BaseGame):
             
             self.portal_pairs.append((a, b, color))
 
+        self._level_dirty = True
+        self.invalidate("board")
+
 
     # ======================================================================
     #  Construcción de paredes a partir de level.grid
@@ -299,34 +390,27 @@ class SnakeGame(BaseGame):
         La orilla (primera/última fila/columna) la ignoramos porque el marco
         externo lo construimos aparte para que sea único y cubra todo el board.
         """
-        h = len(grid)
-        if h == 0:
-            return
-
-        w = len(grid[0])
-        if w == 0:
+        h, w = matrix_shape(grid)
+        if h == 0 or w == 0:
             return
 
         # Escala para encajar level.grid en el board
         sx = max(1, self.board_w // w)
         sy = max(1, self.board_h // h)
 
-        # Obstáculos internos (ignoramos la orilla del grid)
-        for gy in range(h):
-            row = grid[gy]
-            for gx in range(len(row)):
-                if not row[gx]:
-                    continue
-
-                # Saltamos borde del grid: primera/última fila/columna
-                if gy == 0 or gy == h - 1 or gx == 0 or gx == w - 1:
-                    continue
+        # Obstáculos internos (ignoramos la orilla del grid). grid puede
+        # ser una lista de listas o un PackedMatrix; solo recorremos las
+        # celdas con valor distinto de 0.
+        for gx, gy in iter_nonzero(grid):
+            # Saltamos borde del grid: primera/última fila/columna
+            if gy == 0 or gy == h - 1 or gx == 0 or gx == w - 1:
+                continue
 
-                # Solo celdas internas llegan aquí
-                for y in range(gy * sy, (gy + 1) * sy):
-                    for x in range(gx * sx, (gx + 1) * sx):
-                        if 0 <= x < self.board_w and 0 <= y < self.board_h:
-                            self.walls.add((x, y))
+            # Solo celdas internas llegan aquí
+            for y in range(gy * sy, (gy + 1) * sy):
+                for x in range(gx * sx, (gx + 1) * sx):
+                    if 0 <= x < self.board_w and 0 <= y < self.board_h:
+                        self.walls.add((x, y))
 
         # --- ÚNICO marco externo en TODO el borde del tablero ---
         # Lados superior e inferior
@@ -343,53 +427,163 @@ class SnakeGame(BaseGame):
     #  Inicialización de snake + comida
     # ======================================================================
 
+    def _build_level(self):
+        """
+        Arma la grilla de paredes y portales, las celdas de piso y la
+        tabla de movimiento _next. Se llama solo cuando cambian las
+        paredes o los portales, no en cada reinicio.
+        """
+        w = self.board_w
+        h = self.board_h
+        cells = bytearray(w * h)
+        for (x, y) in self.walls:
+            cells[y * w + x] = CELL_WALL
+        portal_to = {}
+        for (ax, ay), (bx, by) in self.portals.items():
+            portal_to[ay * w + ax] = by * w + bx
+            cells[ay * w + ax] |= CELL_PORTAL
+        self._level_cells = cells
+
+        self._floor = set(
+            y * w + x
+            for y in range(self.wall_min_y + 1, self.wall_max_y)
+            for x in range(self.wall_min_x + 1, self.wall_max_x)
+            if cells[y * w + x] == CELL_EMPTY
+        )
+
+        # Vecino de cada celda en cada dirección: el wrap y los portales
+        # ya resueltos, NO_CELL si el paso sale del tablero
+        table = [NO_CELL] * (w * h * len(DIRS))
+        pos = 0
+        for y in range(h):
+            for x in range(w):
+                for dx, dy in DIRS:
+                    nx = x + dx
+                    ny = y + dy
+                    if self.wrap:
+                        nx %= w
+                        ny %= h
+                    if 0 <= nx < w and 0 <= ny < h:
+                        idx = ny * w + nx
+                        table[pos] = portal_to.get(idx, idx)
+                    pos += 1
+        self._next = table
+        self._level_dirty = False
+
     def _init_snake_and_food(self):
+        if self._level_dirty:
+            self._build_level()
+
+        # Las manzanas de la partida anterior se borran del tablero
+        w = self.board_w
+        for idx in self.apples:
+            self.engine.set_cell(idx % w, idx // w, None)
+        self.apples = set()
+        self._respawns = []
+        self._ticks = 0
+
+        # Grilla de tipos de celda: el nivel más la snake y la comida
+        cells = bytearray(self._level_cells)
+        self.cells = cells
+        self._free = FreeCells(self._floor)
+
         # Posición de la cabeza
         if self.spawn_mode == 'random':
-            head = self._random_empty_cell()
+            head = self._free.choice()
         else:
-            head = (self.board_w // 2, self.board_h // 2)
-            if head in self.walls:
-                head = self._random_empty_cell()
+            head = (self.board_h // 2) * w + self.board_w // 2
+            if cells[head] & CELL_KIND == CELL_WALL:
+                head = self._free.choice()
+        if head is None:
+            # Tablero sin ninguna celda libre: no hay dónde empezar
+            self.game_over = True
+            return
 
-        self.snake = [head]
-        self.snake_set = set(self.snake)
+        self.body = deque([head])
+        cells[head] |= CELL_BODY
+        self._free.discard(head)
 
         # Cuerpo inicial extendido en dirección opuesta al movimiento
         dx, dy = self.current_dir
         for i in range(1, self.initial_length):
-            x = head[0] - dx * i
-            y = head[1] - dy * i
+            x = head % w - dx * i
+            y = head // w - dy * i
             if x < 0 or x >= self.board_w or y < 0 or y >= self.board_h:
                 break
-            if (x, y) in self.walls:
+            idx = y * w + x
+            if cells[idx] & CELL_KIND == CELL_WALL:
                 break
-            self.snake.append((x, y))
-            self.snake_set.add((x, y))
+            self.body.append(idx)
+            cells[idx] |= CELL_BODY
+            self._free.discard(idx)
 
-        # Colocamos comida
-        self._spawn_food()
+        # Colocamos las manzanas (las que no entran se reintentan en el
+        # próximo paso)
+        for _ in range(self.max_apples):
+            if not self._spawn_apple():
+                self._schedule_apple(1)
 
-    def _random_empty_cell(self):
+    def snake_cells(self):
         """
-        Retorna una celda vacía DENTRO del rectángulo de paredes,
-        sin paredes, snake ni portales.
+        Copia del cuerpo como lista de (x, y), cabeza primero. Es O(largo)
+        en cada llamada (se arma desde body): para compatibilidad, no para
+        usar en un loop; la cabeza sale de head() y las consultas de
+        ocupación de cells.
         """
-        while True:
-            x = random.randint(self.wall_min_x + 1, self.wall_max_x - 1)
-            y = random.randint(self.wall_min_y + 1, self.wall_max_y - 1)
-            pos = (x, y)
+        w = self.board_w
+        return [(idx % w, idx // w) for idx in self.body]
 
-            if pos in self.snake_set:
-                continue
-            if pos in self.walls:
-                continue
-            if pos in self.portal_cells:
-                continue
-            return pos
+    def head(self):
+        """Celda (x, y) de la cabeza."""
+        idx = self.body[0]
+        return (idx % self.board_w, idx // self.board_w)
 
-    def _spawn_food(self):
-        self.food = self._random_empty_cell()
+    def _random_empty_cell(self):
+        """
+        Retorna una celda vacía DENTRO del rectángulo de paredes,
+        sin paredes, snake, portales ni comida (None si no queda ninguna).
+        """
+        idx = self._free.choice()
+        if idx is None:
+            return None
+        return (idx % self.board_w, idx // self.board_w)
+
+    @property
+    def food_cells(self):
+        """Celdas (x, y) con manzana (vista de apples)."""
+        w = self.board_w
+        return set((idx % w, idx // w) for idx in self.apples)
+
+    def _spawn_apple(self):
+        """
+        Pone una manzana en una celda libre al azar. Retorna False si no
+        queda ninguna (la snake llenó el tablero).
+        """
+        idx = self._free.choice()
+        if idx is None:
+            return False
+        self._free.discard(idx)
+        self.cells[idx] = CELL_FOOD
+        self.apples.add(idx)
+        # Las manzanas se pintan con set_cell: solo se dibujan al aparecer
+        # y al comerlas, no en cada redibujo de la capa dynamic
+        self.engine.set_cell(idx % self.board_w, idx // self.board_w,
+                             self.color_apple)
+        return True
+
+    def _schedule_apple(self, ticks):
+        """Agenda una manzana nueva para dentro de 'ticks' pasos."""
+        heapq.heappush(self._respawns, self._ticks + ticks)
+
+    def _respawn_apples(self):
+        """Repone las manzanas cuyo paso de reaparición ya llegó."""
+        respawns = self._respawns
+        while respawns and respawns[0] <= self._ticks:
+            heapq.heappop(respawns)
+            if not self._spawn_apple():
+                # Sin lugar: se vuelve a intentar en el próximo paso
+                self._schedule_apple(1)
+        self.mark_changed()
 
     # ======================================================================
     #  API esperada por el GameEngine
@@ -410,14 +604,17 @@ class SnakeGame(BaseGame):
         self.apples_eaten = 0
         self._growth_pending = 0
 
-        self.snake = []
-        self.snake_set = set()
-        self.food = None
-        self._init_snake_and_food()
+        self.body = deque()
 
+        # Los portales primero: _init_snake_and_food arma las celdas
+        # libres sin ellos
         if self.portal_random:
             self._spawn_random_portals()
 
+        self._init_snake_and_food()
+
+        self.invalidate()
+
 
     def on_key(self, keysym):
         k = keysym.lower()
@@ -426,6 +623,7 @@ class SnakeGame(BaseGame):
         if k == self.key_pause:
             if not self.game_over:
                 self.paused = not self.paused
+                self.mark_changed()
             return
 
         # Reinicio
@@ -446,7 +644,7 @@ class SnakeGame(BaseGame):
             return
 
         # Evitar giro de 180° si la snake tiene longitud > 1
-        if len(self.snake) > 1:
+        if len(self.body) > 1:
             if (new_dir[0] == -self.current_dir[0] and
                     new_dir[1] == -self.current_dir[1]):
                 return
@@ -463,58 +661,70 @@ class SnakeGame(BaseGame):
             self.accum_ms -= self.tick_ms
             self._step()
 
+    def next_due_ms(self):
+        """
+        Milisegundos hasta el próximo paso de la serpiente; None en pausa o
+        tras el game over (nada cambia hasta que se presione una tecla).
+        """
+        if self.game_over or self.paused:
+            return None
+        return max(0, self.tick_ms - self.accum_ms)
+
     def _step(self):
+        # Manzanas que tocan reaparecer en este paso
+        self._ticks += 1
+        if self._respawns and self._respawns[0] <= self._ticks:
+            self._respawn_apples()
+
         # Aplicar dirección pendiente
         self.current_dir = self.pending_dir
 
-        head_x, head_y = self.snake[0]
-        dx, dy = self.current_dir
-        nx = head_x + dx
-        ny = head_y + dy
-
-        # Wrap-around opcional
-        if self.wrap:
-            nx %= self.board_w
-            ny %= self.board_h
-
-        out_of_bounds = not (0 <= nx < self.board_w and 0 <= ny < self.board_h)
-        new_head = (nx, ny)
-
-        new_head = (nx, ny)
-
-        # Portal
-        if new_head in self.portals:
-            new_head = self.portals[new_head]
-
+        # Celda destino con wrap, bordes y portales ya resueltos
+        idx = self._next[self.body[0] * 4 + DIR_INDEX[self.current_dir]]
 
         # Fuera de los límites (sin wrap)
-        if out_of_bounds:
+        if idx == NO_CELL:
             if self.rule_out_of_bounds == 'end':
                 self.game_over = True
+                self.mark_changed()
             return
 
+        # Una sola lectura de la grilla decide el paso
+        cells = self.cells
+        cell = cells[idx]
+        kind = cell & CELL_KIND
         # Contra pared
-        if new_head in self.walls:
+        if kind == CELL_WALL:
             if self.rule_wall_collision == 'end':
                 self.game_over = True
+                self.mark_changed()
             return
 
         # Contra sí misma
-        if new_head in self.snake_set:
+        if kind == CELL_BODY:
             if self.rule_self_collision == 'end':
                 self.game_over = True
+                self.mark_changed()
             return
 
         # Avanzar snake
-        self.snake.insert(0, new_head)
-        self.snake_set.add(new_head)
+        self.body.appendleft(idx)
+        cells[idx] = (cell & CELL_PORTAL) | CELL_BODY
+        self._free.discard(idx)
+        self.invalidate("dynamic")
 
         # Comer manzana
-        if self.food is not None and new_head == self.food:
+        if kind == CELL_FOOD:
+            self.apples.discard(idx)
+            self.engine.set_cell(idx % self.board_w, idx // self.board_w, None)
             self.score += self.apple_points
             self.apples_eaten += 1
             self._growth_pending += self.growth_per_apple
-            self._spawn_food()
+            if self.apple_respawn_ticks > 0:
+                self._schedule_apple(self.apple_respawn_ticks)
+            elif not self._spawn_apple():
+                self._schedule_apple(1)
+            self.mark_changed()
 
             # Progresión de velocidad
             if (self.speedup_after_apple > 0 and
@@ -528,133 +738,159 @@ class SnakeGame(BaseGame):
             if self._growth_pending > 0:
                 self._growth_pending -= 1
             else:
-                tail = self.snake.pop()
-                self.snake_set.remove(tail)
+                tail = self.body.pop()
+                cells[tail] &= CELL_PORTAL
+                # La cabeza puede haber quedado sobre un portal (o, sin
+                # paredes, en el borde): solo se liberan celdas de piso
+                if tail in self._floor:
+                    self._free.add(tail)
                 
                 
-    def draw(self, engine):
+    def draw_layer(self, engine, name):
         """
-        Dibuja paredes, snake y manzana usando el API de dibujo del engine.
+        Dibuja una capa usando el API de dibujo del engine:
+          - static:  paredes y textos fijos del panel
+          - board:   portales (cambian al reiniciar si son aleatorios)
+          - dynamic: snake
+        Las manzanas no están en ninguna capa: se pintan con
+        engine.set_cell al aparecer y se borran al comerlas. El puntaje
+        y los avisos de pausa/fin son textos del panel que se actualizan
+        en draw_widgets.
         """
-
+        if name == "static":
+            self._draw_static(engine)
+        elif name == "board":
+            self._draw_portals(engine)
+        elif name == "dynamic":
+            self._draw_snake(engine)
+
+    def draw_widgets(self, engine):
+        """Puntaje, manzanas comidas y avisos de pausa/fin (solo si cambian)."""
+        self._draw_status(engine)
+
+    def _draw_static(self, engine):
         # Paredes
-        for (x, y) in self.walls:
-            engine.draw_brick(x, y, color=self.color_walls)
-
-        # Portales con colores individuales
-        for (x, y) in self.portal_cells:
-            color = self.portal_colors.get((x, y), "#FFD700")  # Fallback a dorado
-            engine.draw_brick(x, y, color=color)
-
-        # Snake
-        for (x, y) in self.snake:
-            engine.draw_brick(x, y, color=self.color_snake)
-
-        # Comida
-        if self.food is not None:
-            fx, fy = self.food
-            engine.draw_brick(fx, fy, color=self.color_apple)
+        engine.draw_bricks(self.walls, color=self.color_walls)
 
         # ---------------- Panel de info (derecha) ----------------
         if engine.info_canvas is not None:
             center_x = engine.info_width_px // 2
 
-            engine.draw_text(
+            # Textos fijos: se crean una sola vez (ver set_info_text)
+            engine.set_info_text(
+                "title",
                 center_x, 30,
                 "Snake",
-                where="info",
                 anchor="n",
                 font=engine.font_title
             )
 
             engine.draw_hline(60, where="info")
 
-            engine.draw_text(
+            engine.set_info_text(
+                "score_label",
                 20, 80,
                 "Score:",
-                where="info",
                 anchor="nw",
                 font=engine.font_label
             )
 
+            engine.draw_hline(190, where="info")
+
+    def _draw_portals(self, engine):
+        # Portales con colores individuales
+        for (x, y) in self.portal_cells:
+            color = self.portal_colors.get((x, y), "#FFD700")  # Fallback a dorado
+            engine.draw_brick(x, y, color=color)
+
+        # Mostrar información de portales
+        if engine.info_canvas is not None and len(self.portal_pairs) > 0:
             engine.draw_text(
-                20, 100,
-                str(self.score),
+                20, 210,
+                "Portales:",
                 where="info",
                 anchor="nw",
-                font=engine.font_value
+                font=engine.font_label
             )
             
-            engine.draw_text(
-                20, 160,
-                "Manzanas comidas: %d" % self.apples_eaten,
-                where="info",
-                anchor="nw",
-                font=engine.font_hint
-            )
-
-            engine.draw_hline(190, where="info")
-            
-            # Mostrar información de portales
-            if len(self.portal_pairs) > 0:
-                engine.draw_text(
-                    20, 210,
-                    "Portales:",
-                    where="info",
-                    anchor="nw",
-                    font=engine.font_label
-                )
-                
-                y_offset = 230
-                for idx, (a, b, color) in enumerate(self.portal_pairs):
-                    # Dibujar indicador de color para el par de portales
-                    if hasattr(engine.info_canvas, 'create_rectangle'):
-                        x_start = 20
-                        # Portal A
-                        engine.info_canvas.create_rectangle(
-                            x_start, y_offset, x_start + 15, y_offset + 15,
-                            fill=color, outline="white"
-                        )
-                        # Flecha bidireccional
-                        engine.info_canvas.create_text(
-                            x_start + 20, y_offset + 7,
-                            text="<->",
-                            fill="white",
-                            anchor="w",
-                            font=engine.font_hint
-                        )
-                        # Portal B (mismo color)
-                        engine.info_canvas.create_rectangle(
-                            x_start + 45, y_offset, x_start + 60, y_offset + 15,
-                            fill=color, outline="white"
-                        )
-                    y_offset += 20
-                
-                engine.draw_hline(y_offset + 10, where="info")
-            else:
-                # Si no hay portales, usar posición por defecto
-                y_offset = 200
-
-            if self.game_over:
-                engine.draw_text(
-                    center_x, y_offset + 40,
-                    "GAME OVER",
-                    where="info",
-                    anchor="n",
-                    font=engine.font_title
+            y_offset = 230
+            for idx, (a, b, color) in enumerate(self.portal_pairs):
+                # Dibujar indicador de color para el par de portales
+                x_start = 20
+                # Portal A
+                engine.draw_rect(
+                    x_start, y_offset, x_start + 15, y_offset + 15,
+                    fill=color, outline="white"
                 )
+                # Flecha bidireccional
                 engine.draw_text(
-                    center_x, y_offset + 70,
-                    "Pulsa %s para reiniciar" % self.key_restart.upper(),
+                    x_start + 20, y_offset + 7,
+                    "<->",
                     where="info",
-                    anchor="n",
+                    anchor="w",
                     font=engine.font_hint
                 )
-            elif self.paused:
-                engine.draw_text(
-                    center_x, y_offset + 40,
-                    "PAUSA",
-                    where="info",
-                    anchor="n",
-                    font=engine.font_title
+                # Portal B (mismo color)
+                engine.draw_rect(
+                    x_start + 45, y_offset, x_start + 60, y_offset + 15,
+                    fill=color, outline="white"
                 )
+                y_offset += 20
+            
+            engine.draw_hline(y_offset + 10, where="info")
+
+    def _draw_snake(self, engine):
+        # Snake
+        w = self.board_w
+        engine.draw_bricks(((idx % w, idx // w) for idx in self.body),
+                           color=self.color_snake)
+
+    def _draw_status(self, engine):
+        if engine.info_canvas is None:
+            return
+        center_x = engine.info_width_px // 2
+
+        engine.set_info_text(
+            "score",
+            20, 100,
+            str(self.score),
+            anchor="nw",
+            font=engine.font_value
+        )
+        
+        engine.set_info_text(
+            "apples",
+            20, 160,
+            "Manzanas comidas: %d" % self.apples_eaten,
+            anchor="nw",
+            font=engine.font_hint
+        )
+
+        # Debajo de la lista de portales (ver _draw_portals)
+        if len(self.portal_pairs) > 0:
+            y_offset = 230 + 20 * len(self.portal_pairs)
+        else:
+            # Si no hay portales, usar posición por defecto
+            y_offset = 200
+
+        # Aviso de fin o de pausa ("" mientras se juega)
+        banner = hint = ""
+        if self.game_over:
+            banner = "GAME OVER"
+            hint = "Pulsa %s para reiniciar" % self.key_restart.upper()
+        elif self.paused:
+            banner = "PAUSA"
+        engine.set_info_text(
+            "banner",
+            center_x, y_offset + 40,
+            banner,
+            anchor="n",
+            font=engine.font_title
+        )
+        engine.set_info_text(
+            "banner_hint",
+            center_x, y_offset + 70,
+            hint,
+            anchor="n",
+            font=engine.font_hint
+        )
@@ -43,10 +43,10 @@ TABLA DE CONTENIDOS:
         - on_key() - Manejo de teclas
         - update() - Game loop principal
     9. Rendering (líneas 650-668)
-        - draw() - Dibuja todo el juego
-        - draw_ghost_piece() - Proyección
-        - draw_next_queue() - Preview piezas
-        - draw_ui() - Panel de información
+        - draw_layer() - Dibuja una capa (static/board/dynamic/overlay)
+        - _draw_current_piece() - Ghost piece y pieza actual
+        - draw_widgets() - Textos del panel que cambian (puntaje, avisos)
+        - _draw_previews() - Preview de las próximas piezas
 
 ==========================================
 """
@@ -54,6 +54,7 @@ from __future__ import print_function
 
 import random
 
+from dsl.packed import iter_nonzero
 from games.base_game import BaseGame
 from runtime import sym_int, sym_str, sym_bool, sym_float, sym_get
 
@@ -273,15 +274,11 @@ class TetrisGame(BaseGame):
             rotations_cells = []
 
             if mats is not None:
-                # mats es algo como: [mat0, mat1, mat2, mat3]
+                # mats es algo como: [mat0, mat1, mat2, mat3]; cada mat es
+                # una lista de listas o un PackedMatrix.
                 for mat in mats:
-                    cells = []
-                    for y, row in enumerate(mat):
-                        for x, val in enumerate(row):
-                            if val:
-                                # cualquier valor distinto de 0 lo consideramos bloque
-                                cells.append((x, y))
-                    rotations_cells.append(cells)
+                    # cualquier valor distinto de 0 lo consideramos bloque
+                    rotations_cells.append(list(iter_nonzero(mat)))
 
             # Si no hay mats en el .brik, hacemos fallback a TETROMINO_SHAPES
             if not rotations_cells:
@@ -310,12 +307,7 @@ class TetrisGame(BaseGame):
                 rotations_cells = []
                 if mats is not None:
                     for mat in mats:
-                        cells = []
-                        for y, row in enumerate(mat):
-                            for x, val in enumerate(row):
-                                if val:
-                                    cells.append((x, y))
-                        rotations_cells.append(cells)
+                        rotations_cells.append(list(iter_nonzero(mat)))
                 
                 if rotations_cells:
                     piece_shapes[suffix] = rotations_cells
@@ -359,6 +351,7 @@ class TetrisGame(BaseGame):
         # Inicializar la cola de próximas piezas y spawnear la primera
         self._refill_next_queue(full=True)
         self._spawn_new_piece()
+        self.invalidate()
 
 
         # self.next_piece_kind = self._random_piece_kind()
@@ -395,8 +388,7 @@ class TetrisGame(BaseGame):
         centrada horizontalmente y comenzando en la coordenada Y dada
         (en píxeles dentro del panel de info).
         """
-        canvas = engine.info_canvas
-        if canvas is None:
+        if engine.info_canvas is None:
             return
 
         # Usamos la rotación 0 para la preview
@@ -426,7 +418,7 @@ class TetrisGame(BaseGame):
             y0 = start_y + (gy - min_y) * cell
             x1 = x0 + cell
             y1 = y0 + cell
-            canvas.create_rectangle(
+            engine.draw_rect(
                 x0, y0, x1, y1,
                 fill=color,
                 outline="gray30"
@@ -457,6 +449,9 @@ class TetrisGame(BaseGame):
 
         piece = Piece(kind, x, y, rotation)
 
+        # Cambian la pieza actual y la cola de previews
+        self.invalidate("dynamic", "overlay")
+
         if not self._can_place(piece, x, y, rotation):
             # No hay espacio para nueva pieza -> game over
             self.game_over = True
@@ -500,6 +495,10 @@ class TetrisGame(BaseGame):
     def _lock_piece(self):
         if self.current_piece is None:
             return
+
+        # Cambian los bloques fijos y el puntaje (la cola de previews
+        # cambia en _spawn_new_piece)
+        self.invalidate("board", "dynamic")
         
         # Verificar si la pieza es una bomba
         is_bomb = "bomb" in self.current_piece.kind.lower()
@@ -639,6 +638,7 @@ class TetrisGame(BaseGame):
         if k == self.key_pause:
             if not self.game_over:
                 self.paused = not self.paused
+                self.mark_changed()
             return
 
         if k == self.key_restart:
@@ -661,6 +661,7 @@ class TetrisGame(BaseGame):
             if moved:
                 # pequeño bonus por caída suave, opcional
                 self.score += 1
+                self.mark_changed()
         elif k == self.key_rotate:
             self._rotate_piece()
         elif k == self.key_drop:
@@ -681,6 +682,7 @@ class TetrisGame(BaseGame):
         if self._can_place(self.current_piece, new_x, new_y, self.current_piece.rotation):
             self.current_piece.x = new_x
             self.current_piece.y = new_y
+            self.invalidate("dynamic")
             return True
         else:
             # si estamos intentando mover hacia abajo y no se puede,
@@ -696,6 +698,7 @@ class TetrisGame(BaseGame):
         # intento de rotación simple; si choca, se cancela
         if self._can_place(self.current_piece, self.current_piece.x, self.current_piece.y, new_rot):
             self.current_piece.rotation = new_rot
+            self.invalidate("dynamic")
 
     def update(self, dt_ms):
         if self.game_over or self.paused:
@@ -711,6 +714,15 @@ class TetrisGame(BaseGame):
             else:
                 self._move_piece(0, 1)
 
+    def next_due_ms(self):
+        """
+        Milisegundos hasta el próximo paso de caída de la pieza; None en pausa o
+        tras el game over (nada cambia hasta que se presione una tecla).
+        """
+        if self.game_over or self.paused:
+            return None
+        return max(0, self.tick_ms - self.accum_ms)
+
     def _compute_ghost_cells(self):
         """
         Calcula la posición de la 'ghost piece' (sombra) para la pieza actual.
@@ -738,108 +750,140 @@ class TetrisGame(BaseGame):
         # Calculamos las celdas finales en (x, y) encontrado.
         return self._piece_cells(piece, x=x, y=y, rotation=rotation)
 
-    def draw(self, engine):
-
+    def draw_layer(self, engine, name):
+        """
+        Dibuja una capa:
+          - static:  fondo del pozo y textos fijos del panel
+          - board:   bloques fijos (incluye las paredes del pozo)
+          - dynamic: ghost piece y pieza actual
+          - overlay: previews de las próximas piezas (solo se invalida
+            cuando cambia next_queue)
+        El puntaje y los avisos de pausa/fin son textos del panel que se
+        actualizan en draw_widgets.
+        """
+        if name == "static":
+            self._draw_static(engine)
+        elif name == "board":
+            self._draw_board(engine)
+        elif name == "dynamic":
+            self._draw_current_piece(engine)
+        elif name == "overlay":
+            self._draw_previews(engine)
+
+    def draw_widgets(self, engine):
+        """Puntaje y avisos de pausa/fin (solo si cambian)."""
+        self._draw_status(engine)
+
+    def _draw_static(self, engine):
         # Fondo
-        for y in range(self.board_h):
-            for x in range(self.board_w):
-                engine.draw_brick(x, y, color=self.color_bg)
-
-        # Tablero fijo
-        for y in range(self.board_h):
-            for x in range(self.board_w):
-                color = self.board[y][x]
-                if color is not None:
-                    engine.draw_brick(x, y, color=color)
-        
-        # ---------- GHOST PIECE (sombra) ----------
-        ghost_cells = self._compute_ghost_cells()
-        if ghost_cells is not None:
-            for (gx, gy) in ghost_cells:
-                # Solo dibujamos en celdas vacías para no tapar bloques fijos
-                if 0 <= gx < self.board_w and 0 <= gy < self.board_h:
-                    if self.board[gy][gx] is None:
-                        engine.draw_brick(gx, gy, color=self.ghost_color)
-
-        # Pieza actual
-        if self.current_piece is not None:
-            color = self.piece_colors.get(self.current_piece.kind, "#ffffff")
-            for cx, cy in self._piece_cells(self.current_piece):
-                if 0 <= cx < self.board_w and 0 <= cy < self.board_h:
-                    engine.draw_brick(cx, cy, color=color)
+        engine.draw_bricks(
+            [(x, y) for y in range(self.board_h) for x in range(self.board_w)],
+            color=self.color_bg
+        )
 
-        # ---------- Panel de info ----------
         if engine.info_canvas is not None:
             center_x = engine.info_width_px // 2
 
-            # Título
-            engine.draw_text(
+            # Título (los textos fijos se crean una sola vez, ver
+            # set_info_text)
+            engine.set_info_text(
+                "title",
                 center_x, 30,
                 "Tetris",
-                where="info",
                 anchor="n",
                 font=engine.font_title
             )
 
             engine.draw_hline(70, where="info")
 
-            # Score / nivel / líneas, etc. (lo que ya tenías)
-            engine.draw_text(
+            engine.set_info_text(
+                "score_label",
                 20, 90,
                 "Score:",
-                where="info",
                 anchor="nw",
                 font=engine.font_label
             )
-            engine.draw_text(
-                20, 110,
-                str(self.score),
-                where="info",
-                anchor="nw",
-                font=engine.font_value
-            )
-
-            # ... más stats si quieres ...
 
             engine.draw_hline(180, where="info")
 
             # Cola de próximas piezas
-            engine.draw_text(
+            engine.set_info_text(
+                "next_label",
                 20, 190,
                 "Next pieces:",
-                where="info",
                 anchor="nw",
                 font=engine.font_label
             )
 
-            # dibujamos hasta next_queue_length previews
-            y0 = 215
-            spacing = 60  # separación vertical entre previews
-            for i, kind in enumerate(self.next_queue[:self.next_queue_length]):
-                top_y = y0 + i * spacing
-                self._draw_preview_piece(engine, kind, top_y_px=top_y)
-
-
-            if self.game_over:
-                engine.draw_text(
-                    center_x, 420,
-                    "GAME OVER",
-                    where="info",
-                    anchor="n",
-                    font=engine.font_title
-                )
-                engine.draw_text(
-                    center_x, 450,
-                    "Pulsa %s para reiniciar" % self.key_restart.upper(),
-                    where="info",
-                    anchor="n",
-                    font=engine.font_hint
-                )
-            elif self.paused:
-                engine.draw_text(
-                    center_x, 420,
-                    "PAUSA",
-                    where="info",
-                    anchor="n",
-                    font=engine.font_title
-                )
+    def _draw_board(self, engine):
+        # Tablero fijo
+        for y in range(self.board_h):
+            for x in range(self.board_w):
+                color = self.board[y][x]
+                if color is not None:
+                    engine.draw_brick(x, y, color=color)
+
+    def _draw_current_piece(self, engine):
+        # ---------- GHOST PIECE (sombra) ----------
+        ghost_cells = self._compute_ghost_cells()
+        if ghost_cells is not None:
+            # Solo dibujamos en celdas vacías para no tapar bloques fijos
+            engine.draw_bricks(
+                [(gx, gy) for (gx, gy) in ghost_cells
+                 if 0 <= gx < self.board_w and 0 <= gy < self.board_h
+                 and self.board[gy][gx] is None],
+                color=self.ghost_color
+            )
+
+        # Pieza actual
+        if self.current_piece is not None:
+            color = self.piece_colors.get(self.current_piece.kind, "#ffffff")
+            engine.draw_bricks(
+                [(cx, cy) for cx, cy in self._piece_cells(self.current_piece)
+                 if 0 <= cx < self.board_w and 0 <= cy < self.board_h],
+                color=color
+            )
+
+    def _draw_previews(self, engine):
+        # dibujamos hasta next_queue_length previews
+        y0 = 215
+        spacing = 60  # separación vertical entre previews
+        for i, kind in enumerate(self.next_queue[:self.next_queue_length]):
+            top_y = y0 + i * spacing
+            self._draw_preview_piece(engine, kind, top_y_px=top_y)
+
+    def _draw_status(self, engine):
+        # ---------- Panel de info ----------
+        if engine.info_canvas is None:
+            return
+        center_x = engine.info_width_px // 2
+
+        engine.set_info_text(
+            "score",
+            20, 110,
+            str(self.score),
+            anchor="nw",
+            font=engine.font_value
+        )
+
+        # Aviso de fin o de pausa ("" mientras se juega)
+        banner = hint = ""
+        if self.game_over:
+            banner = "GAME OVER"
+            hint = "Pulsa %s para reiniciar" % self.key_restart.upper()
+        elif self.paused:
+            banner = "PAUSA"
+        engine.set_info_text(
+            "banner",
+            center_x, 420,
+            banner,
+            anchor="n",
+            font=engine.font_title
+        )
+        engine.set_info_text(
+            "banner_hint",
+            center_x, 450,
+            hint,
+            anchor="n",
+            font=engine.font_hint
+        )
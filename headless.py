@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+headless.py
+
+GameEngine sin ventana: para correr Snake/Tetris en un servidor o en CI,
+simular partidas más rápido que en tiempo real y medir el rendimiento
+del juego sin Tk.
+
+HeadlessEngine tiene la misma interfaz pública que GameEngine
+(grid_width, grid_height, draw_brick, draw_text, font_*, set_game, ...)
+pero:
+
+    - no crea tk.Tk(): los canvas son objetos de Python que no dibujan
+      y las fuentes son strings;
+    - el tiempo es un reloj virtual: advance(ms) y run(frames) llaman a
+      update(dt_ms) y render() tan rápido como se pueda;
+    - press(keysym) simula una tecla;
+    - con record=True guarda cada llamada de dibujo en draw_calls.
+
+Ejemplo:
+
+    engine = make_engine_from_symbols(symbols, HeadlessEngine)
+    game = SnakeGame(engine, symbols)
+    engine.set_game(game)
+    engine.press("Up")
+    engine.run(1000)
+    print(engine.now_ms, game.score, engine.visible_cells())
+"""
+from __future__ import print_function
+
+from engine import GameEngine, PROFILE_KEY
+
+
+class HeadlessCanvas(object):
+    """Canvas que no dibuja: devuelve ids crecientes y cuenta las llamadas."""
+
+    def __init__(self):
+        self.calls = 0
+        self._next_id = 0
+
+    def _create(self, *args, **kw):
+        self.calls += 1
+        self._next_id += 1
+        return self._next_id
+
+    create_rectangle = create_text = create_line = create_image = _create
+
+    def _call(self, *args, **kw):
+        self.calls += 1
+
+    itemconfig = coords = delete = tag_raise = tag_lower = _call
+
+
+class HeadlessEngine(GameEngine):
+    """
+    GameEngine sin Tk con reloj virtual. Acepta los mismos argumentos que
+    GameEngine más record (guardar las llamadas de dibujo en draw_calls).
+    """
+
+    def __init__(self, *args, **kw):
+        self.record = kw.pop("record", False)
+        # (frame, método, args) de cada llamada de dibujo si record=True
+        self.draw_calls = []
+        self.now_ms = 0         # reloj virtual
+        self.frame = 0          # frames ejecutados
+        self._last_frame_ms = 0 # reloj virtual del último frame
+        GameEngine.__init__(self, *args, **kw)
+
+    def _build_window(self):
+        self.root = None
+        self.game_canvas = HeadlessCanvas()
+        self.info_canvas = HeadlessCanvas() if self.info_width_px > 0 else None
+        # Mismos nombres que en GameEngine; como strings valen para Tk
+        self.font_title = "Helvetica 16 bold"
+        self.font_label = "Helvetica 10 bold"
+        self.font_value = "Helvetica 10"
+        self.font_hint = "Helvetica 9"
+
+    def _init_render(self):
+        # Sin Tk no hay PhotoImage: la grilla siempre es la de canvas
+        self.backend = "canvas"
+        GameEngine._init_render(self)
+
+    # ------------------------------------------------------------------
+    # Reloj virtual y teclado
+    # ------------------------------------------------------------------
+
+    def start(self, frames=None):
+        """
+        Equivalente headless del mainloop: ejecuta frames de tick_ms
+        hasta que se llame a stop() (o hasta 'frames' frames).
+        """
+        if self._game is None:
+            raise RuntimeError("No hay juego asignado. Usa set_game(...) antes de start().")
+        self._running = True
+        count = 0
+        while self._running and (frames is None or count < frames):
+            self.step()
+            count += 1
+        self._running = False
+
+    def stop(self):
+        """
+        Detiene start() al terminar el frame actual y, como GameEngine,
+        guarda el perfil si se pidió profile_export.
+        """
+        self._running = False
+        self.export_profile()
+
+    def step(self, dt_ms=None):
+        """Avanza el reloj dt_ms (por defecto tick_ms) y ejecuta un frame."""
+        if dt_ms is None:
+            dt_ms = self.tick_ms
+        self.now_ms += dt_ms
+        self._frame(dt_ms)
+
+    def _frame(self, dt_ms, keysym=None):
+        self._last_frame_ms = self.now_ms
+        self.run_frame(dt_ms, keysym)
+        self.frame += 1
+
+    def run(self, frames):
+        """Ejecuta 'frames' frames de tick_ms."""
+        for _ in range(frames):
+            self.step()
+
+    def advance(self, ms):
+        """
+        Avanza el reloj virtual 'ms' milisegundos. Como el loop de
+        GameEngine: si el juego implementa next_due_ms() solo se ejecutan
+        los frames en que vence algo (y ninguno mientras está inactivo);
+        si no, frames de tick_ms.
+        """
+        target = self.now_ms + ms
+        if not self._is_event_driven():
+            while self.now_ms + self.tick_ms <= target:
+                self.step()
+            if self.now_ms < target:
+                self.step(target - self.now_ms)
+            return
+
+        self._first_frame()
+        while True:
+            due = self._game.next_due_ms()
+            if due is None:
+                # Inactivo hasta la próxima tecla: ese tiempo no cuenta
+                self.now_ms = self._last_frame_ms = target
+                return
+            due_at = self._last_frame_ms + max(due, 0)
+            if due_at > target:
+                # El tiempo pasa sin frames; lo recibe el próximo update
+                self.now_ms = target
+                return
+            self.now_ms = due_at
+            self._frame(due_at - self._last_frame_ms)
+
+    def press(self, keysym):
+        """
+        Simula una tecla ('Left', 'Up', 'space', 'p', ...). En el loop por
+        eventos la tecla dibuja su frame enseguida, como en GameEngine.
+        """
+        if keysym == PROFILE_KEY:
+            self.toggle_profile()
+            return
+        if self._game is None or not hasattr(self._game, "on_key"):
+            return
+        if self._is_event_driven():
+            self._first_frame()
+            self._frame(self.now_ms - self._last_frame_ms, keysym)
+        else:
+            self._game.on_key(keysym)
+
+    def _first_frame(self):
+        """
+        En el loop por eventos GameEngine.start dibuja un frame enseguida;
+        aquí se dibuja la primera vez que se usa advance() o press().
+        """
+        if self.frame == 0:
+            self._frame(0)
+
+    def visible_cells(self):
+        """
+        {(x, y): color} de las celdas visibles de la grilla tras el último
+        frame (solo con retained_grid=True).
+        """
+        cells = {}
+        if self.grid is None:
+            return cells
+        cols = self.grid.cols
+        for idx, color in enumerate(self.grid._shown):
+            if color is not None:
+                cells[(idx % cols, idx // cols)] = color
+        return cells
+
+    # ------------------------------------------------------------------
+    # Registro de llamadas de dibujo
+    # ------------------------------------------------------------------
+
+    def _record(self, name, *args):
+        self.draw_calls.append((self.frame, name, args))
+
+    def draw_brick(self, grid_x, grid_y, color="#00ff00"):
+        if self.record:
+            self._record("draw_brick", grid_x, grid_y, color)
+        GameEngine.draw_brick(self, grid_x, grid_y, color)
+
+    def draw_bricks(self, cells, color="#00ff00"):
+        if self.record:
+            cells = list(cells)
+            self._record("draw_bricks", cells, color)
+        GameEngine.draw_bricks(self, cells, color)
+
+    def set_cell(self, grid_x, grid_y, color):
+        if self.record:
+            self._record("set_cell", grid_x, grid_y, color)
+        GameEngine.set_cell(self, grid_x, grid_y, color)
+
+    def draw_text(self, x_px, y_px, text, where="game", anchor="nw", font=None):
+        if self.record:
+            self._record("draw_text", x_px, y_px, text, where, anchor, font)
+        GameEngine.draw_text(self, x_px, y_px, text, where, anchor, font)
+
+    def draw_rect(self, x0_px, y0_px, x1_px, y1_px, fill,
+                  outline="gray30", where="info"):
+        if self.record:
+            self._record("draw_rect", x0_px, y0_px, x1_px, y1_px, fill, outline, where)
+        GameEngine.draw_rect(self, x0_px, y0_px, x1_px, y1_px, fill, outline, where)
+
+    def draw_hline(self, y_px, where="game"):
+        if self.record:
+            self._record("draw_hline", y_px, where)
+        GameEngine.draw_hline(self, y_px, where)
+
+    def set_info_text(self, key, x_px, y_px, text, anchor="nw", font=None):
+        if self.record:
+            self._record("set_info_text", key, x_px, y_px, text, anchor, font)
+        GameEngine.set_info_text(self, key, x_px, y_px, text, anchor, font)
@@ -3,7 +3,7 @@ from __future__ import print_function
 
 import sys
 
-from runtime import load_symbols_from_brik, sym_int
+from runtime import load_symbols_from_brik, sym_int, sym_str
 from engine import GameEngine
 from games.snake_game import SnakeGame
 from games.tetris_game import TetrisGame
@@ -12,17 +12,26 @@ MAX_WIN_W = 640   # ancho total de la ventana (juego + info)
 MAX_WIN_H = 480   # alto total de la ventana
 
 
-def make_engine_from_symbols(symbols):
+def make_engine_from_symbols(symbols, engine_cls=GameEngine, **options):
     """
     Construye el GameEngine usando los parámetros de 'board' del .brik,
     forzando que la ventana completa sea 640x480.
 
     El canvas de juego tendrá ancho = board.width * cell_size,
     y el resto hasta 640 px será el panel de información.
+
+    engine_cls y options (p. ej. retained_grid=False) permiten construir
+    otra variante del motor con las mismas medidas.
+
+    board.backend elige cómo se dibuja la grilla: "canvas" (defecto),
+    "image" o "auto" (imagen para tableros grandes); options["backend"]
+    tiene prioridad.
     """
     board_w = sym_int(symbols, "board.width", 20)
     board_h = sym_int(symbols, "board.height", 20)
     cell    = sym_int(symbols, "board.cell_size", 20)
+    if "backend" not in options:
+        options["backend"] = sym_str(symbols, "board.backend", "canvas").lower()
 
     # Cell máximo que permite que el board quepa en 640x480
     max_cell_x = MAX_WIN_W // board_w if board_w > 0 else cell
@@ -46,12 +55,13 @@ def make_engine_from_symbols(symbols):
     # en tus .brik para no tener franjas negras arriba/abajo).
     height_px = MAX_WIN_H
 
-    engine = GameEngine(
+    engine = engine_cls(
         game_width_px=game_width_px,
         height_px=height_px,
         cell_size=cell,
         tick_ms=50,
         info_width_px=info_width_px,
+        **options
     )
 
     return engine
@@ -64,7 +74,7 @@ def choose_game():
     python main.py snake
     python main.py tetris
     """
-    if len(sys.argv) >= 2:
+    if len(sys.argv) >= 2 and not sys.argv[1].startswith("--"):
         choice = sys.argv[1].strip().lower()
     else:
         print("Selecciona juego: snake / tetris")
@@ -77,6 +87,32 @@ def choose_game():
     return choice
 
 
+def parse_engine_options(args):
+    """
+    Opciones del motor en la línea de comandos:
+        --profile               mide update/clear/draw/flush de cada frame
+                                (F3 muestra el perfil en el panel)
+        --profile-out ARCHIVO   además lo guarda al cerrar (.csv o .jsonl)
+    """
+    options = {}
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "--profile":
+            options["profile"] = True
+        elif arg == "--profile-out":
+            if i + 1 >= len(args):
+                print("ERROR: falta el archivo de --profile-out")
+                sys.exit(1)
+            options["profile_export"] = args[i + 1]
+            i += 1
+        elif arg.startswith("--"):
+            print("Opción desconocida: %s" % arg)
+            sys.exit(1)
+        i += 1
+    return options
+
+
 def main():
     choice = choose_game()
 
@@ -91,7 +127,7 @@ def main():
     symbols = load_symbols_from_brik(brik_path)
 
     # 2) Creamos el motor a partir de esos símbolos
-    engine = make_engine_from_symbols(symbols)
+    engine = make_engine_from_symbols(symbols, **parse_engine_options(sys.argv[1:]))
 
     # 3) Creamos el juego correspondiente
     game = GameClass(engine, symbols)
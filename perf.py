@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+perf.py
+
+Reloj y estadísticas de tiempos para el game loop del GameEngine.
+
+now_ms() usa un reloj monotónico de alta resolución (no salta si se
+cambia la hora del sistema; en Python 2.7, clock_gettime con ctypes o
+time.clock en Windows); RollingStats guarda las últimas N muestras
+de una medida (p. ej. el periodo real entre frames) y calcula sus
+percentiles para mostrar el jitter. FrameProfiler junta, por frame,
+el tiempo de cada fase del motor (update, clear, draw, flush) y puede
+exportar las filas a CSV o JSONL.
+"""
+from __future__ import print_function
+
+import json
+import sys
+import time
+from collections import deque
+
+
+def _posix_monotonic():
+    """
+    clock_gettime(CLOCK_MONOTONIC) con ctypes, para Python 2.7 en Linux y
+    macOS. Devuelve la función reloj (segundos) o None si no está.
+    """
+    try:
+        import ctypes
+        import ctypes.util
+    except ImportError:
+        return None
+
+    class timespec(ctypes.Structure):
+        _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+    clock_id = 6 if sys.platform == "darwin" else 1     # CLOCK_MONOTONIC
+    clock_gettime = None
+    # glibc >= 2.17 y macOS lo tienen en la libc; antes estaba en librt
+    for name in (None, ctypes.util.find_library("rt")):
+        try:
+            clock_gettime = getattr(ctypes.CDLL(name, use_errno=True), "clock_gettime")
+            break
+        except (OSError, AttributeError):
+            continue
+    if clock_gettime is None:
+        return None
+    clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(timespec)]
+    clock_gettime.restype = ctypes.c_int
+    ts = timespec()
+    ref = ctypes.byref(ts)
+    if clock_gettime(clock_id, ref) != 0:
+        return None
+
+    def clock():
+        clock_gettime(clock_id, ref)
+        return ts.tv_sec + ts.tv_nsec * 1e-9
+    return clock
+
+
+# MONOTONIC indica si _clock es de verdad monotónico (solo no lo es en
+# Python 2.7 sin clock_gettime ni Windows, donde queda time.time)
+MONOTONIC = True
+try:
+    from time import monotonic as _clock        # Python 3.3+
+except ImportError:
+    if sys.platform == "win32":
+        _clock = time.clock                     # QueryPerformanceCounter
+    else:
+        _clock = _posix_monotonic()
+        if _clock is None:
+            _clock = time.time
+            MONOTONIC = False
+
+
+def now_ms():
+    """Milisegundos (float) de un reloj monotónico; solo sirven las diferencias."""
+    return _clock() * 1000.0
+
+
+class RollingStats(object):
+    """Ventana de las últimas 'size' muestras con percentiles."""
+
+    def __init__(self, size=240):
+        self.size = size
+        self._samples = []
+        self._pos = 0
+        self.count = 0          # muestras agregadas en total
+
+    def add(self, value):
+        if len(self._samples) < self.size:
+            self._samples.append(value)
+        else:
+            self._samples[self._pos] = value
+            self._pos = (self._pos + 1) % self.size
+        self.count += 1
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentiles(self, *ps):
+        """Percentiles (0-100, rango más cercano) de la ventana actual."""
+        if not self._samples:
+            return [None] * len(ps)
+        ordered = sorted(self._samples)
+        last = len(ordered) - 1
+        return [ordered[min(last, int(round(p / 100.0 * last)))] for p in ps]
+
+    def max(self):
+        return max(self._samples) if self._samples else None
+
+
+class FrameProfiler(object):
+    """
+    Tiempos por fase de cada frame del GameEngine. El motor suma con
+    add(fase, ms) lo que tarda cada fase y cierra el frame con
+    end_frame(...): los totales pasan a un RollingStats por fase y se
+    guarda una fila (como mucho las últimas 'keep') para export().
+    """
+
+    PHASES = ("update", "clear", "draw", "flush")
+    # Columnas de cada fila exportada
+    COLUMNS = ("frame", "t_ms", "period_ms") + tuple(p + "_ms" for p in PHASES) + \
+        ("total_ms", "items", "late", "dropped")
+
+    def __init__(self, size=240, keep=100000):
+        self.stats = dict((name, RollingStats(size)) for name in self.PHASES + ("total",))
+        self.items = RollingStats(size)
+        self.rows = deque(maxlen=keep)
+        self.frames = 0
+        self._phase_ms = dict.fromkeys(self.PHASES, 0.0)
+        self._start_ms = None
+
+    def add(self, phase, ms):
+        self._phase_ms[phase] += ms
+
+    def end_frame(self, now, period_ms, items, late=0, dropped=0):
+        """Cierra el frame que empezó hace period_ms (now es now_ms())."""
+        if self._start_ms is None:
+            self._start_ms = now
+        phase_ms = self._phase_ms
+        total = 0.0
+        row = [self.frames, round(now - self._start_ms, 3), round(period_ms, 3)]
+        for name in self.PHASES:
+            ms = phase_ms[name]
+            self.stats[name].add(ms)
+            row.append(round(ms, 4))
+            total += ms
+            phase_ms[name] = 0.0
+        self.stats["total"].add(total)
+        self.items.add(items)
+        row.extend((round(total, 4), items, late, dropped))
+        self.rows.append(row)
+        self.frames += 1
+
+    def summary_lines(self):
+        """Una línea por fase: p50/p95/p99 y máximo de la ventana, en ms."""
+        lines = []
+        for name in self.PHASES + ("total",):
+            stats = self.stats[name]
+            if not len(stats):
+                continue
+            p50, p95, p99 = stats.percentiles(50, 95, 99)
+            lines.append("%-6s %6.2f %6.2f %6.2f %6.2f" % (
+                name, p50, p95, p99, stats.max()))
+        if lines:
+            lines.insert(0, "fase     p50    p95    p99    max")
+            lines.append("items %d (max %d)" % (self.items.percentiles(50)[0],
+                                                self.items.max()))
+        return lines
+
+    def export(self, path):
+        """
+        Escribe las filas guardadas en 'path': CSV si termina en .csv,
+        si no JSONL (un objeto JSON por frame). Devuelve cuántas filas.
+        """
+        with open(path, "w") as f:
+            if path.lower().endswith(".csv"):
+                f.write(",".join(self.COLUMNS) + "\n")
+                for row in self.rows:
+                    f.write(",".join(str(v) for v in row) + "\n")
+            else:
+                for row in self.rows:
+                    f.write(json.dumps(dict(zip(self.COLUMNS, row)), sort_keys=True) + "\n")
+        return len(self.rows)
@@ -0,0 +1,449 @@
+# -*- coding: utf-8 -*-
+"""
+render.py
+
+Dibujo en modo retenido para el GameEngine.
+
+En lugar de borrar el canvas y crear un rectángulo por ladrillo en cada
+frame, CanvasGrid crea UNA vez un rectángulo por celda de la grilla y en
+cada frame solo cambia (itemconfig) las celdas cuyo color es distinto
+al que ya se ve en pantalla.
+
+Además, todo lo que el motor manda al canvas en un frame (cambios de
+celdas, texto, líneas, borrado de capas) puede juntarse en un TclBatch
+y enviarse al intérprete de Tcl con una sola llamada a eval, en vez de
+una llamada Python -> Tkinter -> Tcl por ítem.
+
+Para tableros grandes, ImageGrid dibuja la grilla como una sola imagen
+(un píxel por celda, ampliado) en vez de un rectángulo por celda.
+
+Las celdas se pintan por capas (de abajo hacia arriba, p. ej. "static",
+"board", "dynamic", "overlay"): cada capa guarda su propio mapa de
+celdas y el color visible de una celda es el de la capa más alta que la
+pinta. Borrar una capa (clear_layer) solo revisa las celdas que esa capa
+tenía pintadas.
+"""
+from __future__ import print_function
+
+import re
+
+try:
+    import Tkinter as tk          # Python 2.7
+except ImportError:
+    try:
+        import tkinter as tk      # Python 3
+    except ImportError:
+        tk = None                 # sin Tk: ImageGrid no está disponible
+
+try:
+    string_types = basestring     # Python 2.7 (str y unicode)
+except NameError:
+    string_types = str            # Python 3
+
+# Capas de dibujo del GameEngine, de abajo hacia arriba. Cada capa se
+# borra y redibuja por separado (ver GameEngine.invalidate); los
+# ladrillos de una capa tapan a los de las capas inferiores.
+LAYERS = ("static", "board", "dynamic", "overlay")
+# Celdas pintadas con set_cell: debajo de todas las capas, nunca se borran
+CELLS_LAYER = "cells"
+# Tag de Tk de los ítems (texto, líneas, rectángulos) de cada capa
+LAYER_TAG = "layer_%s"
+
+
+# ----------------------------------------------------------------------
+# Comandos Tcl en lote
+# ----------------------------------------------------------------------
+
+# Palabras que Tcl lee tal cual, sin comillas (números, colores, tags)
+_TCL_PLAIN_RE = re.compile(r'^[\w#.:+-]+\Z')
+_TCL_SPECIAL_RE = re.compile(r'([\\\[\]{}$";\s])')
+
+
+# Los mismos colores, tags y textos se repiten frame a frame
+_TCL_WORD_CACHE = {}
+_TCL_WORD_CACHE_MAX = 4096
+
+
+def tcl_word(value):
+    """Convierte 'value' en una palabra de un script Tcl (con escapes)."""
+    try:
+        return _TCL_WORD_CACHE[value]
+    except (KeyError, TypeError):
+        pass
+    word = _tcl_word(value)
+    if len(_TCL_WORD_CACHE) >= _TCL_WORD_CACHE_MAX:
+        _TCL_WORD_CACHE.clear()
+    try:
+        _TCL_WORD_CACHE[value] = word
+    except TypeError:
+        pass            # listas: no son hasheables
+    return word
+
+
+def _tcl_word(value):
+    if not isinstance(value, string_types):
+        if isinstance(value, (tuple, list)):
+            # Listas de Tcl, p. ej. tags=("grid", "layer_static")
+            value = " ".join(tcl_word(v) for v in value)
+        else:
+            value = str(value)
+    if _TCL_PLAIN_RE.match(value):
+        return value
+    if not value:
+        return "{}"
+    # \n explícito: una barra seguida de salto de línea es continuación
+    return _TCL_SPECIAL_RE.sub(r'\\\1', value).replace("\\\n", "\\n")
+
+
+class TclBatch(object):
+    """
+    Buffer de los comandos Tcl de un frame. flush() los envía todos al
+    intérprete con una sola llamada a tk.eval (se ejecutan en orden).
+    """
+
+    def __init__(self, tk):
+        self.tk = tk
+        self._commands = []
+        self.stats = {"evals": 0, "commands": 0}
+
+    def add(self, command):
+        """Agrega un comando ya formado (ver tcl_word)."""
+        self._commands.append(command)
+
+    def flush(self):
+        commands = self._commands
+        if not commands:
+            return 0
+        self._commands = []
+        script = "\n".join(commands)
+        if not isinstance(script, str):
+            # Python 2.7: eval solo acepta str (bytes); Tcl espera UTF-8
+            script = script.encode("utf-8")
+        self.tk.eval(script)
+        self.stats["evals"] += 1
+        self.stats["commands"] += len(commands)
+        return len(commands)
+
+
+class BatchedCanvas(object):
+    """
+    Imita los métodos de dibujo de un canvas de Tkinter (create_*,
+    itemconfig, coords, delete, tag_raise, tag_lower) pero en lugar de llamar a
+    Tcl agrega el comando equivalente a un TclBatch. Los create_* no
+    devuelven id: los ítems se manejan por tags.
+    """
+
+    def __init__(self, canvas, batch):
+        self.canvas = canvas
+        self.batch = batch
+        self.path = canvas._w
+
+    def _command(self, words, options):
+        for key in sorted(options):
+            value = options[key]
+            if value is None:
+                continue    # como Tkinter: las opciones None no se envían
+            words.append("-" + key)
+            words.append(tcl_word(value))
+        self.batch.add(" ".join(words))
+
+    def _create(self, kind, coords, options):
+        words = [self.path, "create", kind]
+        words.extend(map(str, coords))
+        self._command(words, options)
+
+    def create_rectangle(self, *coords, **options):
+        self._create("rectangle", coords, options)
+
+    def create_text(self, *coords, **options):
+        self._create("text", coords, options)
+
+    def create_line(self, *coords, **options):
+        self._create("line", coords, options)
+
+    def itemconfig(self, tag_or_id, **options):
+        self._command([self.path, "itemconfigure", tcl_word(tag_or_id)], options)
+
+    def coords(self, tag_or_id, *coords):
+        self.batch.add("%s coords %s %s" % (self.path, tcl_word(tag_or_id),
+                                            " ".join(map(str, coords))))
+
+    def delete(self, tag_or_id):
+        self.batch.add("%s delete %s" % (self.path, tcl_word(tag_or_id)))
+
+    def tag_raise(self, tag_or_id):
+        self.batch.add("%s raise %s" % (self.path, tcl_word(tag_or_id)))
+
+    def tag_lower(self, tag_or_id):
+        self.batch.add("%s lower %s" % (self.path, tcl_word(tag_or_id)))
+
+
+# ----------------------------------------------------------------------
+# Grilla retenida
+# ----------------------------------------------------------------------
+
+class _LayeredCells(object):
+    """
+    Capas de celdas de una grilla de cols x rows y el color visible de
+    cada celda. Las subclases llevan a Tk (flush) las celdas devueltas
+    por _changed().
+    """
+
+    TAG = "grid"
+
+    def __init__(self, cols, rows, layers):
+        self.cols = cols
+        self.rows = rows
+        n = cols * rows
+        self._shown = [None] * n    # color visible de cada celda (None = vacía)
+        # capa -> {índice: color}; _top_down en orden de prioridad
+        self._layers = dict((name, {}) for name in layers)
+        self._top_down = [self._layers[name] for name in reversed(layers)]
+        self._touched = set()       # índices a revisar en el próximo flush
+
+    def _index(self, x, y):
+        if 0 <= x < self.cols and 0 <= y < self.rows:
+            return y * self.cols + x
+        return None
+
+    def clear_layer(self, layer):
+        """Borra todas las celdas pintadas en 'layer'."""
+        cells = self._layers[layer]
+        if cells:
+            self._touched.update(cells)
+            cells.clear()
+
+    def set_cell(self, x, y, color, layer):
+        """Pinta la celda (x, y) en 'layer'; color=None la borra de esa capa."""
+        idx = self._index(x, y)
+        if idx is None:
+            return
+        if color is None:
+            self._layers[layer].pop(idx, None)
+        else:
+            self._layers[layer][idx] = color
+        self._touched.add(idx)
+
+    def set_cells(self, cells, color, layer):
+        """set_cell(x, y, color, layer) para cada (x, y) de 'cells'."""
+        cols = self.cols
+        rows = self.rows
+        target = self._layers[layer]
+        touched = self._touched
+        if color is None:
+            for x, y in cells:
+                if 0 <= x < cols and 0 <= y < rows:
+                    idx = y * cols + x
+                    target.pop(idx, None)
+                    touched.add(idx)
+        else:
+            for x, y in cells:
+                if 0 <= x < cols and 0 <= y < rows:
+                    idx = y * cols + x
+                    target[idx] = color
+                    touched.add(idx)
+
+    def _changed(self):
+        """
+        Recalcula el color visible de las celdas tocadas desde el último
+        flush y devuelve los índices cuyo color cambió.
+        """
+        top_down = self._top_down
+        shown = self._shown
+
+        changed = []
+        for idx in self._touched:
+            color = None
+            for cells in top_down:
+                color = cells.get(idx)
+                if color is not None:
+                    break
+            if shown[idx] != color:
+                shown[idx] = color
+                changed.append(idx)
+        self._touched = set()
+        return changed
+
+
+class CanvasGrid(_LayeredCells):
+    """
+    Grilla de cols x rows rectángulos retenidos sobre un canvas de Tk.
+    Las celdas sin color quedan ocultas (se ve el fondo del canvas).
+    """
+
+    def __init__(self, canvas, cols, rows, cell_size, layers=("base",),
+                 outline="gray20", batch=None):
+        _LayeredCells.__init__(self, cols, rows, layers)
+        self.canvas = canvas
+        # Con un TclBatch, flush() agrega los itemconfigure al lote del
+        # frame en vez de llamar a canvas.itemconfig por cada celda
+        self.batch = batch
+        self.cell_size = cell_size
+
+        # Un ítem por celda, en orden fila a fila (índice = y * cols + x).
+        # Se crean antes que cualquier otro ítem, así quedan debajo del
+        # texto y las líneas de cada frame.
+        self.items = []
+        cs = cell_size
+        for y in range(rows):
+            for x in range(cols):
+                x0 = x * cs
+                y0 = y * cs
+                self.items.append(canvas.create_rectangle(
+                    x0, y0, x0 + cs, y0 + cs,
+                    fill="",
+                    outline=outline,
+                    state="hidden",
+                    tags=(self.TAG,)
+                ))
+
+        # Contadores de actividad en Tk
+        self.stats = {"items": cols * rows, "updates": 0, "flushes": 0}
+
+    def flush(self):
+        """
+        Lleva a Tk solo las celdas cuyo color visible cambió.
+        Devuelve la cantidad de itemconfig realizados.
+        """
+        changed = self._changed()
+        shown = self._shown
+        items = self.items
+        if self.batch is not None:
+            add = self.batch.add
+            path = self.canvas._w
+            for idx in changed:
+                color = shown[idx]
+                if color is None:
+                    add("%s itemconfigure %d -state hidden" % (path, items[idx]))
+                else:
+                    add("%s itemconfigure %d -fill %s -state normal" % (
+                        path, items[idx], tcl_word(color)))
+        else:
+            itemconfig = self.canvas.itemconfig
+            for idx in changed:
+                color = shown[idx]
+                if color is None:
+                    itemconfig(items[idx], state="hidden")
+                else:
+                    itemconfig(items[idx], fill=color, state="normal")
+
+        updates = len(changed)
+        self.stats["updates"] += updates
+        self.stats["flushes"] += 1
+        return updates
+
+
+class ImageGrid(_LayeredCells):
+    """
+    Grilla dibujada como imagen: un buffer RGB (bytearray, 3 bytes por
+    celda) que se copia a una PhotoImage de cols x rows píxeles y se
+    muestra ampliada cell_size veces en un único ítem del canvas.
+
+    Sirve para tableros grandes, donde CanvasGrid necesitaría un
+    rectángulo por celda (200x200 = 40000 ítems). En cada flush solo se
+    envían a Tk las filas con celdas cambiadas. Las celdas no tienen
+    borde: las vacías se ven del color 'background'.
+    """
+
+    def __init__(self, canvas, cols, rows, cell_size, layers=("base",),
+                 background="black"):
+        _LayeredCells.__init__(self, cols, rows, layers)
+        self.canvas = canvas
+        self.cell_size = cell_size
+        self._rgb_cache = {}
+        self._empty = self._rgb(background)
+
+        # 'base' tiene un píxel por celda; 'image' es la que se ve
+        self.base = tk.PhotoImage(master=canvas, width=cols, height=rows)
+        self.image = tk.PhotoImage(master=canvas, width=cols * cell_size,
+                                   height=rows * cell_size)
+        canvas.create_image(0, 0, image=self.image, anchor="nw",
+                            tags=(self.TAG,))
+
+        self.buffer = bytearray(self._empty * (cols * rows))
+        # El fondo se pinta en el primer flush
+        self._dirty_rows = set(range(rows))
+        # PPM binario cuando Tkinter pasa bytes a Tcl como bytes
+        # (Python 3); si no, filas de colores "#rrggbb"
+        self._use_ppm = bytes is not str
+
+        self.stats = {"items": 1, "updates": 0, "flushes": 0, "rows": 0}
+
+    def _rgb(self, color):
+        """Color de Tk ("#rrggbb", "#rgb", "red", ...) -> 3 bytes RGB."""
+        rgb = self._rgb_cache.get(color)
+        if rgb is None:
+            if color.startswith("#") and len(color) in (4, 7, 13):
+                digits = (len(color) - 1) // 3
+                rgb = bytearray(
+                    int(color[1 + i * digits:1 + (i + 1) * digits], 16) * 255 //
+                    (16 ** digits - 1)
+                    for i in range(3))
+            else:
+                rgb = bytearray(v >> 8 for v in self.canvas.winfo_rgb(color))
+            rgb = bytes(rgb)
+            self._rgb_cache[color] = rgb
+        return rgb
+
+    def flush(self):
+        """
+        Actualiza el buffer con las celdas cuyo color visible cambió y
+        envía a Tk las filas modificadas. Devuelve la cantidad de celdas
+        actualizadas.
+        """
+        changed = self._changed()
+        shown = self._shown
+        buf = self.buffer
+        cols = self.cols
+        dirty = self._dirty_rows
+        empty = self._empty
+        for idx in changed:
+            color = shown[idx]
+            rgb = empty if color is None else self._rgb(color)
+            buf[idx * 3:idx * 3 + 3] = rgb
+            dirty.add(idx // cols)
+
+        if dirty:
+            # Filas contiguas van juntas: un put y un copy por bloque
+            rows = sorted(dirty)
+            start = prev = rows[0]
+            for y in rows[1:]:
+                if y != prev + 1:
+                    self._push_rows(start, prev + 1)
+                    start = y
+                prev = y
+            self._push_rows(start, prev + 1)
+            self.stats["rows"] += len(rows)
+            self._dirty_rows = set()
+
+        updates = len(changed)
+        self.stats["updates"] += updates
+        self.stats["flushes"] += 1
+        return updates
+
+    def _push_rows(self, y0, y1):
+        """Copia las filas [y0, y1) del buffer a la imagen visible."""
+        call = self.canvas.tk.call
+        cols = self.cols
+        data = self.buffer[y0 * cols * 3:y1 * cols * 3]
+        if self._use_ppm:
+            header = ("P6\n%d %d\n255\n" % (cols, y1 - y0)).encode("ascii")
+            try:
+                call(self.base, "put", bytes(header + data),
+                     "-format", "ppm", "-to", 0, y0)
+            except tk.TclError:
+                # Tk sin PPM desde datos: filas de colores
+                self._use_ppm = False
+        if not self._use_ppm:
+            hexdata = " ".join(
+                "{%s}" % " ".join(
+                    "#%02x%02x%02x" % (data[i], data[i + 1], data[i + 2])
+                    for i in range(row * cols * 3, (row + 1) * cols * 3, 3))
+                for row in range(y1 - y0))
+            call(self.base, "put", hexdata, "-to", 0, y0)
+
+        cs = self.cell_size
+        call(self.image, "copy", self.base,
+             "-from", 0, y0, cols, y1,
+             "-to", 0, y0 * cs,
+             "-zoom", cs, cs)
@@ -2,9 +2,17 @@
 # -*- coding: utf-8 -*-
 
 import os
+import hashlib
+import mmap
+
+try:
+    import cPickle as pickle     # Python 2.7
+except ImportError:
+    import pickle
 
 from dsl.brik_parser import parse_file
 from dsl.symbols import build_symbol_table
+from dsl import artifact
 
 
 class BrikError(Exception):
@@ -12,18 +20,137 @@ class BrikError(Exception):
     pass
 
 
-def load_symbols_from_brik(path):
+# ----------------------------------------------------------------------
+# Caché en disco de tablas de símbolos
+# ----------------------------------------------------------------------
+# Cada .brik analizado deja su tabla de símbolos serializada con pickle
+# en <carpeta del .brik>/.brikcache/. La entrada guarda la ruta, tamaño,
+# mtime y hash (sha1) del fuente; solo se usa si todos coinciden.
+
+CACHE_DIRNAME = ".brikcache"
+CACHE_VERSION = 1     # subir si cambia el formato o el parser
+
+_cache_stats = {"hits": 0, "misses": 0, "stale": 0, "errors": 0}
+
+
+def cache_stats():
+    """
+    Contadores del caché desde el inicio (o el último reset):
+      - hits:   tabla devuelta desde el caché
+      - misses: hubo que analizar el .brik (sin entrada o entrada vieja)
+      - stale:  de los misses, cuántos tenían una entrada desactualizada
+      - errors: entradas ilegibles o que no se pudieron escribir
+    """
+    return dict(_cache_stats)
+
+
+def reset_cache_stats():
+    for key in _cache_stats:
+        _cache_stats[key] = 0
+
+
+def cache_path_for(path, cache_dir=None):
+    """Ruta del archivo de caché que corresponde al .brik 'path'."""
+    src = os.path.abspath(path)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(src), CACHE_DIRNAME)
+    # El hash de la ruta completa evita choques entre .brik homónimos
+    key = src if isinstance(src, bytes) else src.encode("utf-8")
+    tag = hashlib.sha1(key).hexdigest()[:12]
+    return os.path.join(cache_dir, "%s.%s.symcache" % (os.path.basename(src), tag))
+
+
+def _source_stamp(path):
+    """(ruta absoluta, tamaño, mtime, sha1 del contenido) del .brik."""
+    st = os.stat(path)
+    f = open(path, "rb")
+    try:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    finally:
+        f.close()
+    return (os.path.abspath(path), st.st_size, st.st_mtime, digest)
+
+
+def _read_cache(cache_file, stamp):
+    """Devuelve los símbolos cacheados o None si no hay entrada válida."""
+    if not os.path.exists(cache_file):
+        return None
+    try:
+        f = open(cache_file, "rb")
+        try:
+            entry = pickle.load(f)
+        finally:
+            f.close()
+    except Exception:
+        _cache_stats["errors"] += 1
+        return None
+    if not isinstance(entry, dict):
+        _cache_stats["errors"] += 1
+        return None
+    if entry.get("version") != CACHE_VERSION or entry.get("stamp") != stamp:
+        _cache_stats["stale"] += 1
+        return None
+    return entry["symbols"]
+
+
+def _write_cache(cache_file, stamp, symbols):
+    """Escribe la entrada de forma atómica; los errores no son fatales."""
+    tmp = "%s.%d.tmp" % (cache_file, os.getpid())
+    try:
+        cache_dir = os.path.dirname(cache_file)
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        f = open(tmp, "wb")
+        try:
+            pickle.dump({"version": CACHE_VERSION, "stamp": stamp, "symbols": symbols},
+                        f, pickle.HIGHEST_PROTOCOL)
+        finally:
+            f.close()
+        if os.path.exists(cache_file):
+            os.remove(cache_file)      # Windows no reemplaza con rename
+        os.rename(tmp, cache_file)
+    except (IOError, OSError, pickle.PicklingError):
+        _cache_stats["errors"] += 1
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def load_symbols_from_brik(path, use_cache=True, cache_dir=None):
     """
     Carga un archivo .brik, lo analiza y devuelve la tabla de símbolos
     como un diccionario plano: { "board.width": 10, "snake.tick_ms": 200, ... }.
     Lanza BrikError si hay problemas.
+
+    Con use_cache=True primero busca la tabla en el caché en disco (ver
+    cache_path_for) y solo analiza el .brik si no hay entrada o si el
+    fuente cambió; en ese caso actualiza el caché.
     """
     if not os.path.exists(path):
         raise BrikError("Archivo .brik no encontrado: %s" % path)
 
+    if not use_cache:
+        return _parse_symbols(path)
+
+    stamp = _source_stamp(path)
+    cache_file = cache_path_for(path, cache_dir)
+    symbols = _read_cache(cache_file, stamp)
+    if symbols is not None:
+        _cache_stats["hits"] += 1
+        return symbols
+
+    _cache_stats["misses"] += 1
+    symbols = _parse_symbols(path)
+    _write_cache(cache_file, stamp, symbols)
+    return symbols
+
+
+def _parse_symbols(path):
+    """Analiza el .brik y construye la tabla de símbolos (sin caché)."""
     # Ya NO leemos el archivo aquí; eso lo hace parse_file internamente.
+    # Las matrices (rotaciones, level.grid) llegan como PackedMatrix: con
+    # el TokenBuffer sus celdas nunca pasan por objetos Token ni listas.
     try:
-        ast = parse_file(path)   # aquí va la RUTA, no el texto
+        ast = parse_file(path, mode='buffer', iterative=True, packed=True)
     except Exception as e:
         raise BrikError("Error de parseo en %s: %s" % (path, e))
 
@@ -34,6 +161,33 @@ def load_symbols_from_brik(path):
 
     return symbols
 
+def load_symbols_from_compiled(path, use_mmap=False):
+    """
+    Carga la tabla de símbolos desde un artefacto binario .brikc generado
+    con "python compiler.py --format bin". No hay lexer ni parser: solo
+    se recorre la cabecera y las entradas (ver dsl/artifact.py).
+
+    Con use_mmap=True el archivo se mapea en memoria en lugar de leerse
+    completo; las matrices se copian a sus arrays al decodificarlas.
+    Lanza BrikError si el archivo no existe o no es un .brikc válido.
+    """
+    if not os.path.exists(path):
+        raise BrikError("Artefacto .brikc no encontrado: %s" % path)
+
+    f = open(path, "rb")
+    try:
+        if use_mmap and os.path.getsize(path) > 0:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                return artifact.load_symbols(data)[1]
+            finally:
+                data.close()
+        return artifact.load_symbols(f.read())[1]
+    except artifact.ArtifactError as e:
+        raise BrikError("Error leyendo %s: %s" % (path, e))
+    finally:
+        f.close()
+
 # ----------------------------------------------------------------------
 # Helpers para leer valores tipados desde la tabla de símbolos
 # ----------------------------------------------------------------------